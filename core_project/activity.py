@@ -0,0 +1,70 @@
+import calendar
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField, Value
+from django.db.models.functions import Trunc
+
+from .caching import activity_key
+from .models import TextualItem
+
+# Event name -> the date column that records it.
+EVENTS = {
+    'started': 'start_date',
+    'completed': 'completion_date',
+    'dnf': 'dnf_date',
+}
+BUCKETS = ('day', 'week', 'month')
+
+
+def bucket_layout(year, bucket):
+    """First bucket's start date, bucket count and a date -> index function."""
+    first = date(year, 1, 1)
+    if bucket == 'day':
+        return first, 366 if calendar.isleap(year) else 365, lambda day: (day - first).days
+    if bucket == 'week':
+        # Weeks start on Monday, so the first one may begin in December.
+        first -= timedelta(days=first.weekday())
+        return first, (date(year, 12, 31) - first).days // 7 + 1, lambda day: (day - first).days // 7
+    return first, 12, lambda day: day.month - 1
+
+
+def compute_activity(reader_id, year, bucket='day'):
+    """Count a reader's reading events in one year, bucketed by the database.
+
+    Each event column is truncated and grouped in SQL, and the three
+    groupings are combined with UNION ALL into a single query. The result
+    has one dense array of counts per event, aligned to ``start``.
+    """
+    items = TextualItem.objects.filter(project__reader_id=reader_id, project__deleted_at__isnull=True)
+    queries = [
+        items.filter(**{f'{field}__year': year})
+        .annotate(event=Value(event), bucket=Trunc(field, bucket, output_field=DateField()))
+        .values('event', 'bucket')
+        .annotate(count=Count('pk'))
+        .order_by()
+        for event, field in EVENTS.items()
+    ]
+    first, size, index = bucket_layout(year, bucket)
+    counts = {event: [0] * size for event in EVENTS}
+    for row in queries[0].union(*queries[1:], all=True):
+        counts[row['event']][index(row['bucket'])] += row['count']
+
+    return {
+        'year': year,
+        'bucket': bucket,
+        'start': first,
+        'total': [sum(values) for values in zip(*counts.values())],
+        **counts,
+    }
+
+
+def reader_activity(reader_id, year, bucket='day'):
+    """Cached ``compute_activity``; dropped whenever the reader's items change."""
+    key = activity_key(reader_id, year, bucket)
+    activity = cache.get(key)
+    if activity is None:
+        activity = compute_activity(reader_id, year, bucket)
+        cache.set(key, activity, getattr(settings, 'ACTIVITY_CACHE_TIMEOUT', 24 * 60 * 60))
+    return activity
@@ -1,3 +1,271 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-# Register your models here.
+from . import recommendations
+from .caching import forget_user_reader, invalidate_reader
+from .deletion import soft_delete_project, soft_delete_reader
+from .isbn import to_isbn13
+from .models import Reader, ReadingProject, ReadingStatus, Tag, TextualItem
+from .outbox import record_completions
+from .tagging import release_items
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the size of large unfiltered tables.
+
+    ``SELECT COUNT(*)`` scans the whole table; for an unfiltered changelist
+    the database's own row estimate is used instead once it is above
+    ``exact_below``. Filtered querysets are counted exactly.
+    """
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = self.estimate(self.object_list.model)
+            if estimate is not None and estimate >= self.exact_below:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def estimate(model):
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            elif connection.vendor == 'sqlite':
+                # The largest rowid is read from the end of the b-tree.
+                cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+            else:
+                return None
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_search_results(self, request, queryset, search_term):
+        # Searches only use indexed equality lookups, never LIKE scans.
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(self.search_filter(term)), False
+
+    def search_filter(self, term):
+        if term.isdigit():
+            return models.Q(pk=int(term))
+        return models.Q(pk__in=[])
+
+
+def bump_and_invalidate(items, **values):
+    """Apply ``values`` to the selected items with one UPDATE and drop cached reader data."""
+    with transaction.atomic():
+        reader_ids = list(
+            ReadingProject.all_objects.filter(pk__in=items.values('project_id'))
+            .values_list('reader_id', flat=True).distinct()
+        )
+        updated = items.update(version=models.F('version') + 1, **values)
+        for reader_id in reader_ids:
+            invalidate_reader(reader_id)
+    return updated
+
+
+def counted_deletion(objs, related):
+    """``get_deleted_objects()`` result that counts ``related`` querysets instead of collecting them.
+
+    Readers and projects are deleted in the background, so the confirmation
+    page only needs a summary, not every row the cascade will reach.
+    """
+    objs = list(objs)
+    model_count = {objs[0]._meta.verbose_name_plural: len(objs)} if objs else {}
+    summary = [str(obj) for obj in objs]
+    for queryset in related:
+        name, count = queryset.model._meta.verbose_name_plural, queryset.count()
+        model_count[name] = count
+        if count:
+            summary.append(f"{count} {name}")
+    return summary, model_count, set(), []
+
+
+@admin.register(Reader)
+class ReaderAdmin(LargeTableAdmin):
+    list_display = ['id', 'name', 'user', 'active_project', 'deleted_at']
+    list_select_related = ['user', 'active_project']
+    list_filter = [('deleted_at', admin.EmptyFieldListFilter)]
+    search_fields = ['user__username']
+    search_help_text = "Search by reader id or exact username."
+    raw_id_fields = ['user', 'active_project']
+    actions = ['soft_delete']
+
+    def get_queryset(self, request):
+        return Reader.all_objects.all()
+
+    def search_filter(self, term):
+        return super().search_filter(term) | models.Q(user__username=term)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def save_model(self, request, obj, form, change):
+        if change and 'user' in form.changed_data:
+            forget_user_reader(form.initial.get('user'))
+        super().save_model(request, obj, form, change)
+
+    def get_deleted_objects(self, objs, request):
+        readers = [reader.pk for reader in objs]
+        return counted_deletion(objs, [
+            ReadingProject.all_objects.filter(reader_id__in=readers),
+            TextualItem.objects.filter(project__reader_id__in=readers),
+        ])
+
+    def delete_model(self, request, obj):
+        soft_delete_reader(obj)
+
+    @admin.action(description="Delete selected readers in the background")
+    def soft_delete(self, request, queryset):
+        readers = list(queryset.filter(deleted_at__isnull=True))
+        for reader in readers:
+            soft_delete_reader(reader)
+        self.message_user(request, f"Queued deletion of {len(readers)} reader(s).")
+
+
+@admin.register(ReadingProject)
+class ReadingProjectAdmin(LargeTableAdmin):
+    list_display = ['id', 'name', 'reader__name', 'created_at', 'deleted_at']
+    list_select_related = ['reader']
+    list_filter = [('deleted_at', admin.EmptyFieldListFilter)]
+    search_fields = ['reader__id']
+    search_help_text = "Search by project id or reader id."
+    raw_id_fields = ['reader']
+    actions = ['soft_delete']
+
+    def get_queryset(self, request):
+        return ReadingProject.all_objects.all()
+
+    def search_filter(self, term):
+        if term.isdigit():
+            return models.Q(pk=int(term)) | models.Q(reader_id=int(term))
+        return super().search_filter(term)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        return counted_deletion(objs, [TextualItem.objects.filter(project_id__in=[project.pk for project in objs])])
+
+    def delete_model(self, request, obj):
+        soft_delete_project(obj)
+
+    @admin.action(description="Delete selected projects in the background")
+    def soft_delete(self, request, queryset):
+        projects = list(queryset.filter(deleted_at__isnull=True))
+        for project in projects:
+            soft_delete_project(project)
+        self.message_user(request, f"Queued deletion of {len(projects)} project(s).")
+
+
+@admin.register(TextualItem)
+class TextualItemAdmin(LargeTableAdmin):
+    list_display = ['id', 'title', 'author', 'isbn13', 'project__name', 'status', 'progress_percent', 'rating']
+    list_select_related = ['project']
+    list_filter = ['status']
+    search_fields = ['isbn13']
+    search_help_text = "Search by ISBN-10/13 or item id."
+    raw_id_fields = ['project']
+    readonly_fields = ['isbn13', 'version']
+    actions = ['mark_completed', 'reset_progress']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('changelist'):
+            queryset = queryset.defer('notes')
+        return queryset
+
+    # The admin edits items directly, so it keeps the recommendation index
+    # and cached reader data in step the way the item API does.
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old = TextualItem.objects.select_related('project').get(pk=obj.pk) if change else None
+            super().save_model(request, obj, form, change)
+            if old is None:
+                recommendations.item_added(obj)
+            else:
+                recommendations.item_changed(old, obj)
+                invalidate_reader(project=old.project)
+            invalidate_reader(project=obj.project)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            recommendations.item_removed(obj)
+            super().delete_model(request, obj)
+            invalidate_reader(project=obj.project)
+
+    def delete_queryset(self, request, queryset):
+        items = list(queryset.select_related('project'))
+        with transaction.atomic():
+            for item in items:
+                recommendations.item_removed(item)
+            release_items(queryset)
+            super().delete_queryset(request, queryset)
+            for reader_id in {item.project.reader_id for item in items}:
+                invalidate_reader(reader_id)
+
+    def search_filter(self, term):
+        isbn13 = to_isbn13(term)
+        if isbn13:
+            return models.Q(isbn13=isbn13)
+        return super().search_filter(term)
+
+    @admin.action(description="Mark selected items as completed")
+    def mark_completed(self, request, queryset):
+        items = queryset.filter(total_pages__gt=0).exclude(status=ReadingStatus.COMPLETED)
+        today = timezone.localdate()
+        with transaction.atomic():
+            # Webhook events are written from the rows as they are before the update.
+            record_completions(items, today)
+            updated = bump_and_invalidate(
+                items,
+                status=ReadingStatus.COMPLETED,
+                current_page=models.F('total_pages'),
+                completion_date=Coalesce('completion_date', models.Value(today)),
+            )
+        self.message_user(request, f"Marked {updated} item(s) as completed.")
+
+    @admin.action(description="Reset progress of selected items")
+    def reset_progress(self, request, queryset):
+        updated = bump_and_invalidate(
+            queryset,
+            status=ReadingStatus.NOT_STARTED,
+            current_page=0,
+            start_date=None,
+            completion_date=None,
+            dnf_date=None,
+        )
+        self.message_user(request, f"Reset progress of {updated} item(s).")
+
+
+@admin.register(Tag)
+class TagAdmin(LargeTableAdmin):
+    list_display = ['id', 'name', 'reader', 'item_count']
+    list_select_related = ['reader']
+    search_fields = ['reader__id']
+    search_help_text = "Search by tag id or reader id."
+    raw_id_fields = ['reader']
+    readonly_fields = ['item_count']
+
+    def search_filter(self, term):
+        if term.isdigit():
+            return models.Q(pk=int(term)) | models.Q(reader_id=int(term))
+        return super().search_filter(term)
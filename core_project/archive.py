@@ -0,0 +1,95 @@
+import json
+import zlib
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from . import recommendations
+from .caching import invalidate_reader
+from .deletion import soft_delete_project
+from .models import ArchivedProject, ReadingProject, ReadingStatus, TextualItem
+
+
+def item_fields():
+    return [
+        field for field in TextualItem._meta.concrete_fields
+        if not field.primary_key and field.name != 'project' and not field.generated
+    ]
+
+
+def pack_items(project):
+    fields = item_fields()
+    rows = list(
+        TextualItem.objects.filter(project=project).order_by('pk').values_list(*[f.attname for f in fields])
+    )
+    document = {'fields': [f.attname for f in fields], 'rows': rows}
+    return zlib.compress(json.dumps(document, cls=DjangoJSONEncoder, separators=(',', ':')).encode()), len(rows)
+
+
+def unpack_items(blob):
+    document = json.loads(zlib.decompress(bytes(blob)))
+    known = {f.attname: f for f in item_fields()}
+    columns = document['fields']
+    items = []
+    for row in document['rows']:
+        # Columns dropped from the live table since archiving are ignored.
+        items.append({
+            name: known[name].to_python(value)
+            for name, value in zip(columns, row) if name in known
+        })
+    return items
+
+
+def archive_project(project):
+    """Move a project into the archive tier.
+
+    The items are packed into one compressed document and the live project
+    is soft-deleted in the same transaction, so it leaves the active tables
+    at once; its rows are then removed in chunks by the background deletion
+    job.
+    """
+    with transaction.atomic():
+        blob, count = pack_items(project)
+        archived = ArchivedProject.objects.create(
+            reader_id=project.reader_id,
+            original_id=project.pk,
+            name=project.name,
+            created_at=project.created_at,
+            item_count=count,
+            items_blob=blob,
+        )
+        soft_delete_project(project)
+    return archived
+
+
+def restore_project(archived, batch_size=500):
+    """Recreate an archived project and its items in the live tables."""
+    with transaction.atomic():
+        project = ReadingProject.objects.create(name=archived.name, reader_id=archived.reader_id)
+        ReadingProject.objects.filter(pk=project.pk).update(created_at=archived.created_at)
+        project.created_at = archived.created_at
+        items = TextualItem.objects.bulk_create(
+            [TextualItem(project=project, **values) for values in unpack_items(archived.items_blob)],
+            batch_size=batch_size,
+        )
+        recommendations.project_added(project.pk, items, batch_size=batch_size)
+        archived.delete()
+        invalidate_reader(archived.reader_id)
+    return project
+
+
+def archivable_projects(completed=True, older_than_days=None, reader_id=None):
+    """Projects whose items are all completed, or created before the cutoff."""
+    queryset = ReadingProject.objects.all()
+    if reader_id is not None:
+        queryset = queryset.filter(reader_id=reader_id)
+
+    criteria = models.Q(pk__in=[])
+    if completed:
+        unfinished = TextualItem.objects.filter(project=models.OuterRef('pk')).exclude(status=ReadingStatus.COMPLETED)
+        criteria |= models.Q(models.Exists(TextualItem.objects.filter(project=models.OuterRef('pk'))), ~models.Exists(unfinished))
+    if older_than_days is not None:
+        criteria |= models.Q(created_at__lt=timezone.now() - timedelta(days=older_than_days))
+    return queryset.filter(criteria)
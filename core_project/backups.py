@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+SNAPSHOT_PREFIX = 'db-'
+SNAPSHOT_SUFFIX = '.sqlite3'
+
+
+class BackupError(Exception):
+    pass
+
+
+def setting(name, default):
+    return getattr(settings, f'BACKUP_{name}', default)
+
+
+def read_only(path):
+    return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def copy_database(source, target, pages=None, pause=None, max_restarts=None):
+    """Copy the SQLite file ``source`` onto ``target`` with the online backup API.
+
+    The copy runs ``pages`` pages per step and sleeps ``pause`` seconds
+    between steps. In WAL mode it holds one read transaction throughout:
+    writers are never blocked by readers, and the copy is a consistent
+    snapshot of the moment it started. In rollback-journal mode a held read
+    lock would block writers, so the lock is released between steps instead;
+    a write from another connection then restarts the copy, and BackupError
+    is raised after ``max_restarts`` restarts rather than chasing a busy
+    database forever.
+    """
+    pages = pages or setting('STEP_PAGES', 256)
+    pause = setting('STEP_PAUSE', 0.01) if pause is None else pause
+    max_restarts = setting('MAX_RESTARTS', 10) if max_restarts is None else max_restarts
+    stats = {'steps': 0, 'restarts': 0}
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining
+        stats['steps'] += 1
+        if last_remaining is not None and remaining > last_remaining:
+            stats['restarts'] += 1
+            if stats['restarts'] > max_restarts:
+                raise BackupError(
+                    f"The database changed during the copy {stats['restarts']} times; "
+                    "switch it to WAL mode to back it up under write load"
+                )
+        last_remaining = remaining
+        if remaining and pause:
+            time.sleep(pause)
+
+    started = time.monotonic()
+    src = read_only(source)
+    dst = sqlite3.connect(target)
+    try:
+        stats['journal_mode'] = src.execute("PRAGMA journal_mode").fetchone()[0]
+        if stats['journal_mode'] == 'wal':
+            src.execute("BEGIN")
+            src.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        src.backup(dst, pages=pages, progress=progress)
+        page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+        stats['pages'] = dst.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+    stats['seconds'] = time.monotonic() - started
+    stats['bytes'] = stats['pages'] * page_size
+    return stats
+
+
+def verify(path):
+    """Run SQLite's integrity check on a snapshot; returns the problems found."""
+    conn = read_only(path)
+    try:
+        rows = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    return [] if rows == ['ok'] else rows
+
+
+def snapshots(directory):
+    """Snapshot files in ``directory``, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def rotate(directory, keep):
+    """Delete all but the newest ``keep`` snapshots; returns the deleted paths."""
+    expired = snapshots(directory)[:-keep] if keep > 0 else []
+    for path in expired:
+        os.remove(path)
+    return expired
+
+
+def snapshot(source, directory, keep=None, check=True, **copy_options):
+    """Back ``source`` up to a new timestamped file in ``directory`` and rotate old ones.
+
+    The copy is written to a ``.partial`` file and only renamed into place
+    once complete (and, with ``check``, verified), so the directory never
+    holds a torn snapshot.
+    """
+    keep = setting('KEEP', 7) if keep is None else keep
+    os.makedirs(directory, exist_ok=True)
+    name = f"{SNAPSHOT_PREFIX}{timezone.now():%Y%m%dT%H%M%S.%fZ}{SNAPSHOT_SUFFIX}"
+    path = os.path.join(directory, name)
+    partial = f"{path}.partial"
+    try:
+        stats = copy_database(source, partial, **copy_options)
+        if check:
+            problems = verify(partial)
+            if problems:
+                raise BackupError(f"Integrity check failed: {'; '.join(problems[:5])}")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    stats['path'] = path
+    stats['rotated'] = rotate(directory, keep)
+    return stats
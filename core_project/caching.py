@@ -0,0 +1,62 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+def forecast_key(reader_id, day):
+    return f"forecast:{reader_id}:{day.isoformat()}"
+
+
+def activity_generation_key(reader_id):
+    return f"activity-generation:{reader_id}"
+
+
+def generation(key):
+    """The token stored at ``key``, starting a new one if there is none.
+
+    A missing token is never assumed to be the first one, so an evicted key
+    retires everything cached under it instead of reviving stale entries.
+    """
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, time.time_ns(), None)
+        token = cache.get(key)
+    return token
+
+
+def activity_key(reader_id, year, bucket):
+    # Activity is cached for any number of years and bucket sizes, so it is
+    # keyed by a per-reader generation that invalidation simply replaces.
+    return f"activity:{reader_id}:{generation(activity_generation_key(reader_id))}:{year}:{bucket}"
+
+
+def reader_generation_key(user_id):
+    return f"reader-generation:{user_id}"
+
+
+def reader_generation(user_id):
+    """Token that changes whenever ``user_id`` loses the reader id cached in their sessions."""
+    return generation(reader_generation_key(user_id))
+
+
+def forget_user_reader(user_id):
+    """Retire the reader id cached in ``user_id``'s sessions once the current transaction commits."""
+    if user_id is None:
+        return
+    transaction.on_commit(lambda: cache.set(reader_generation_key(user_id), time.time_ns(), None))
+
+
+def invalidate_reader(reader_id=None, project=None):
+    """Drop a reader's cached derived data once the current transaction commits.
+
+    Pass ``project`` instead of ``reader_id`` when only the project is at
+    hand; its reader is looked up after commit.
+    """
+    def forget():
+        reader = reader_id or project.reader_id
+        cache.delete(forecast_key(reader, timezone.localdate()))
+        cache.set(activity_generation_key(reader), time.time_ns(), None)
+
+    transaction.on_commit(forget)
@@ -0,0 +1,57 @@
+from django.db import connection, transaction
+
+from . import recommendations
+from .caching import invalidate_reader
+from .models import ReadingProject, ReadingStatus, TextualItem
+
+# Columns overwritten when a clone starts the reading list afresh.
+RESET_VALUES = {
+    'current_page': 0,
+    'status': ReadingStatus.NOT_STARTED,
+    'start_date': None,
+    'completion_date': None,
+    'dnf_date': None,
+}
+
+
+def clone_project(project, name=None, reset_progress=False):
+    """Copy a project and all of its items with a single INSERT ... SELECT.
+
+    Returns the new project and the number of items copied. With
+    ``reset_progress`` the copies start unread: progress, status and
+    reading dates are cleared while titles, page counts, ratings and
+    notes are kept.
+    """
+    meta = TextualItem._meta
+    quote = connection.ops.quote_name
+
+    with transaction.atomic():
+        clone = ReadingProject.objects.create(name=name or f"{project.name} (copy)", reader_id=project.reader_id)
+        overrides = {'project_id': clone.pk, 'version': 1}
+        if reset_progress:
+            overrides.update(RESET_VALUES)
+
+        columns, selects, params = [], [], []
+        for field in meta.concrete_fields:
+            if field.primary_key or field.generated:
+                continue
+            columns.append(quote(field.column))
+            if field.attname in overrides:
+                selects.append('%s')
+                params.append(field.get_db_prep_save(overrides[field.attname], connection))
+            else:
+                selects.append(quote(field.column))
+
+        sql = "INSERT INTO {table} ({columns}) SELECT {selects} FROM {table} WHERE {project} = %s ORDER BY {pk}".format(
+            table=quote(meta.db_table),
+            columns=", ".join(columns),
+            selects=", ".join(selects),
+            project=quote(meta.get_field('project').column),
+            pk=quote(meta.pk.column),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, project.pk])
+            count = cursor.rowcount
+        recommendations.project_copied(project.pk, clone.pk)
+        invalidate_reader(project.reader_id)
+    return clone, count
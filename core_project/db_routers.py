@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from . import identity
+
+
+class RoutingState:
+    def __init__(self):
+        self.replica_reads = False
+        self.pinned = False
+
+
+_state = ContextVar('just_read_routing_state', default=None)
+
+
+def current_state():
+    return _state.get()
+
+
+@contextmanager
+def routing_scope():
+    """Give the enclosed block (usually one request) its own routing state."""
+    token = _state.set(RoutingState())
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """Allow reads in the enclosed block to go to the read replica.
+
+    Reads stay on the primary once anything in the same routing scope has
+    written, so a request always sees its own writes.
+    """
+    state = _state.get()
+    if state is None:
+        with routing_scope():
+            with replica_reads():
+                yield
+        return
+
+    previous = state.replica_reads
+    state.replica_reads = True
+    try:
+        yield
+    finally:
+        state.replica_reads = previous
+
+
+def replica_alias():
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', None)
+    if getattr(settings, 'USE_READ_REPLICA', False) and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+class IdentityMapRouter:
+    """Drop rows from the current identity map when they are written.
+
+    Every write asks the routers for a database, so listing this router
+    first sees all of them; it never picks a database itself.
+    """
+
+    def db_for_write(self, model, **hints):
+        identity.written(model, hints.get('instance'))
+        return None
+
+
+class ReadReplicaRouter:
+    """Send safe reads to ``READ_REPLICA_ALIAS`` and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        # Sessions and auth rows are written constantly; keep them on the primary.
+        if model._meta.app_label != 'core_project':
+            return None
+        state = _state.get()
+        if state is None or not state.replica_reads or state.pinned:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', getattr(settings, 'READ_REPLICA_ALIAS', None)}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary file, never migrated directly.
+        if db == getattr(settings, 'READ_REPLICA_ALIAS', None):
+            return False
+        return None
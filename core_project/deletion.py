@@ -0,0 +1,79 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import jobs, recommendations
+from .caching import forget_user_reader, invalidate_reader
+from .models import Reader, ReadingProject, TextualItem
+from .readers import forget_anonymous_reader
+from .tagging import release_items
+
+
+def chunk_size():
+    return getattr(settings, 'DELETE_CHUNK_SIZE', 1000)
+
+
+def soft_delete_project(project, reader_id=None):
+    """Hide a project immediately and enqueue removal of its rows."""
+    with transaction.atomic():
+        ReadingProject.all_objects.filter(pk=project.pk).update(deleted_at=timezone.now())
+        Reader.all_objects.filter(active_project_id=project.pk).update(active_project=None)
+        # Hidden items leave their shelves now rather than when purged.
+        release_items(TextualItem.objects.filter(project_id=project.pk))
+        invalidate_reader(project.reader_id)
+        return jobs.enqueue('delete_project', {'project_id': project.pk}, reader_id=reader_id or project.reader_id)
+
+
+def soft_delete_reader(reader):
+    """Hide a reader and all of their projects and enqueue removal of their rows."""
+    now = timezone.now()
+    with transaction.atomic():
+        forget_user_reader(reader.user_id)
+        if reader.user_id is None:
+            transaction.on_commit(forget_anonymous_reader)
+        # Detach the user so they can be given a fresh reader straight away.
+        Reader.all_objects.filter(pk=reader.pk).update(deleted_at=now, user=None, active_project=None)
+        ReadingProject.all_objects.filter(reader_id=reader.pk, deleted_at__isnull=True).update(deleted_at=now)
+        return jobs.enqueue('delete_reader', {'reader_id': reader.pk})
+
+
+def delete_items_in_chunks(queryset, size=None):
+    """Delete the rows of ``queryset`` in primary key order, one short transaction per chunk.
+
+    Each chunk is a single indexed ``DELETE ... WHERE id IN (...)`` so the
+    write lock is only held briefly and other writers can interleave.
+    """
+    size = size or chunk_size()
+    pause = getattr(settings, 'DELETE_CHUNK_PAUSE', 0)
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            count, _ = queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += count
+        jobs.heartbeat()
+        if pause:
+            time.sleep(pause)
+
+
+def purge_project(project_id, size=None):
+    recommendations.project_removed(project_id)
+    release_items(TextualItem.objects.filter(project_id=project_id))
+    deleted = delete_items_in_chunks(TextualItem.objects.filter(project_id=project_id), size)
+    with transaction.atomic():
+        count, _ = ReadingProject.all_objects.filter(pk=project_id).delete()
+    return deleted + count
+
+
+def purge_reader(reader_id, size=None):
+    deleted = 0
+    project_ids = ReadingProject.all_objects.filter(reader_id=reader_id).values_list('pk', flat=True)
+    for project_id in list(project_ids):
+        deleted += purge_project(project_id, size)
+    with transaction.atomic():
+        count, _ = Reader.all_objects.filter(pk=reader_id).delete()
+    return deleted + count
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+
+class Subscription:
+    """A single SSE client's bounded view of the hub.
+
+    Events are handed over from whichever thread published them onto the
+    subscriber's own event loop. When the queue is full the oldest event is
+    dropped so a slow client never blocks writers; the number of dropped
+    events is reported to the client so it can refetch.
+    """
+
+    def __init__(self, hub, reader_id, loop, maxsize):
+        self.hub = hub
+        self.reader_id = reader_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, event):
+        if self.closed:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's loop has gone away without unsubscribing.
+            self.hub.unsubscribe(self)
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped > self.hub.max_dropped:
+                self.close()
+                return
+        self.queue.put_nowait(event)
+
+    def take_dropped(self):
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.hub.unsubscribe(self)
+            # Wake the consumer so it notices the subscription has ended.
+            if self.queue.full():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class ProgressHub:
+    """In-process pub/sub of TextualItem changes, keyed by reader id."""
+
+    def __init__(self, queue_size=100, max_dropped=1000):
+        self.queue_size = queue_size
+        self.max_dropped = max_dropped
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, reader_id):
+        subscription = Subscription(self, reader_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(reader_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.reader_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.reader_id]
+
+    def subscriber_count(self, reader_id=None):
+        with self._lock:
+            if reader_id is None:
+                return sum(len(subs) for subs in self._subscribers.values())
+            return len(self._subscribers.get(reader_id, ()))
+
+    def publish(self, reader_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(reader_id, ()))
+        for subscription in subscribers:
+            subscription.offer(event)
+        return len(subscribers)
+
+
+hub = ProgressHub(
+    queue_size=getattr(settings, 'PROGRESS_STREAM_QUEUE_SIZE', 100),
+    max_dropped=getattr(settings, 'PROGRESS_STREAM_MAX_DROPPED', 1000),
+)
+
+
+def item_event(item):
+    return {
+        'id': item.id,
+        'project': item.project_id,
+        'current_page': item.current_page,
+        'total_pages': item.total_pages,
+        'progress_percent': str(item.progress_percent),
+        'status': item.status,
+        'rating': None if item.rating is None else str(item.rating),
+    }
+
+
+def publish_item_change(item, reader_id=None):
+    """Publish an item's state to its reader's subscribers once the write commits."""
+    event = item_event(item)
+
+    def send():
+        if hub.subscriber_count():
+            hub.publish(reader_id or item.project.reader_id, event)
+
+    transaction.on_commit(send)
+
+
+def format_sse(data, event=None):
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(subscription, heartbeat):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await subscription.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if event is None:
+                break
+            dropped = subscription.take_dropped()
+            if dropped:
+                yield format_sse({'dropped': dropped}, event='overflow')
+            yield format_sse(event, event='item')
+    finally:
+        subscription.hub.unsubscribe(subscription)
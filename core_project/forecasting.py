@@ -0,0 +1,65 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import forecast_key
+from .models import ReadingStatus, TextualItem
+
+# Days of the reader's overall pace blended into each item's own pace, so a
+# book started yesterday does not get a wild forecast from one sitting.
+PRIOR_DAYS = 7
+
+
+def compute_forecasts(reader_id, today=None):
+    """Forecast finish dates for all of a reader's in-progress items.
+
+    Every started item of the reader is fetched in one query; completed
+    and in-progress items both feed the reader's overall pace, which is
+    then blended with each in-progress item's own pace in a single pass.
+    """
+    today = today or timezone.localdate()
+    rows = list(
+        TextualItem.objects
+        .filter(project__reader_id=reader_id, project__deleted_at__isnull=True, start_date__isnull=False)
+        .values_list('id', 'status', 'start_date', 'completion_date', 'current_page', 'total_pages')
+    )
+
+    pages_read = 0
+    days_read = 0
+    in_progress = []
+    for item_id, status, start, completed, current, total in rows:
+        if status == ReadingStatus.COMPLETED and completed and total:
+            pages_read += total
+            days_read += max((completed - start).days + 1, 1)
+        elif status == ReadingStatus.IN_PROGRESS and total:
+            elapsed = max((today - start).days + 1, 1)
+            pages_read += current
+            days_read += elapsed
+            in_progress.append((item_id, current, total, elapsed))
+
+    reader_pace = pages_read / days_read if days_read else 0
+    forecasts = {}
+    for item_id, current, total, elapsed in in_progress:
+        pace = (current + reader_pace * PRIOR_DAYS) / (elapsed + PRIOR_DAYS)
+        remaining = max(total - current, 0)
+        forecasts[item_id] = {
+            'pages_per_day': round(pace, 2),
+            'remaining_pages': remaining,
+            'projected_finish': today + timedelta(days=math.ceil(remaining / pace)) if pace > 0 else None,
+        }
+    return {'reader_pages_per_day': round(reader_pace, 2), 'items': forecasts}
+
+
+def reader_forecasts(reader_id, today=None):
+    """Cached ``compute_forecasts``; dropped whenever the reader's progress changes."""
+    today = today or timezone.localdate()
+    key = forecast_key(reader_id, today)
+    forecasts = cache.get(key)
+    if forecasts is None:
+        forecasts = compute_forecasts(reader_id, today)
+        cache.set(key, forecasts, getattr(settings, 'FORECAST_CACHE_TIMEOUT', 24 * 60 * 60))
+    return forecasts
+
@@ -0,0 +1,122 @@
+import functools
+import hashlib
+import json
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+
+def request_hash(request):
+    body = json.dumps(request.data, cls=JSONEncoder, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f"{request.method}\n{request.path}\n{body}".encode()).hexdigest()
+
+
+def pack_body(data):
+    return zlib.compress(json.dumps(data, cls=JSONEncoder, separators=(',', ':')).encode())
+
+
+def unpack_body(blob):
+    return json.loads(zlib.decompress(bytes(blob)))
+
+
+def replay(record, fingerprint):
+    if not record.status_code:
+        # The key's first request has not finished; nothing to replay yet.
+        return Response(
+            {'detail': f"A request with this {HEADER} is still in progress."},
+            status=status.HTTP_409_CONFLICT,
+        )
+    if record.request_hash != fingerprint:
+        return Response(
+            {'detail': f"{HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(unpack_body(record.response_body), status=record.status_code)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(handler):
+    """Make a write handler replay its stored response when the client retries.
+
+    The handler runs in the same transaction as the insert of its key row,
+    so a concurrent retry with the same key blocks on the unique constraint
+    until the first request commits and then replays its response. Server
+    errors are rolled back and not stored, so they can be retried.
+    """
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or getattr(request, '_idempotency_key', None) == key:
+            # No key, or an idempotent handler is already running for this
+            # request (e.g. partial_update calling update).
+            return handler(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'detail': f"{HEADER} must be at most 255 characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+        reader_id = self.reader_id
+        fingerprint = request_hash(request)
+        now = timezone.now()
+        stored = IdempotencyKey.objects.filter(reader_id=reader_id, key=key, expires_at__gt=now).first()
+        if stored is not None:
+            return replay(stored, fingerprint)
+
+        request._idempotency_key = key
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.filter(reader_id=reader_id, key=key, expires_at__lte=now).delete()
+                record = IdempotencyKey(reader_id=reader_id, key=key, request_hash=fingerprint, status_code=0, expires_at=now + ttl())
+                try:
+                    with transaction.atomic():
+                        record.save(force_insert=True)
+                except IntegrityError:
+                    return replay(IdempotencyKey.objects.get(reader_id=reader_id, key=key), fingerprint)
+
+                try:
+                    response = handler(self, request, *args, **kwargs)
+                except Exception as exc:
+                    # Validation and other API errors are stored like any other
+                    # response; anything else propagates and rolls back.
+                    response = self.handle_exception(exc)
+                if response.status_code >= 500:
+                    transaction.set_rollback(True)
+                    return response
+                record.status_code = response.status_code
+                record.response_body = pack_body(response.data)
+                record.save(update_fields=['status_code', 'response_body'])
+                return response
+        finally:
+            request._idempotency_key = None
+
+    return wrapper
+
+
+class IdempotentWritesMixin:
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @idempotent
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    # partial_update goes through update, which handles the key.
+
+
+def purge_expired(now=None):
+    return IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()[0]
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+
+
+class IdentityMap:
+    """Rows loaded in one scope (usually a request), one instance per model and primary key."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def get(self, model, pk):
+        return self.objects.get((model._meta.concrete_model, pk))
+
+    def add(self, obj):
+        self.objects[(obj._meta.concrete_model, obj.pk)] = obj
+
+    def discard(self, model, pk=None):
+        model = model._meta.concrete_model
+        if pk is not None:
+            self.objects.pop((model, pk), None)
+            return
+        for key in [key for key in self.objects if key[0] is model]:
+            del self.objects[key]
+
+
+_map = ContextVar('just_read_identity_map', default=None)
+
+
+def current_map():
+    return _map.get()
+
+
+@contextmanager
+def identity_scope():
+    """Share Reader and ReadingProject instances across the enclosed block."""
+    token = _map.set(IdentityMap())
+    try:
+        yield _map.get()
+    finally:
+        _map.reset(token)
+
+
+def remember(obj):
+    identity_map = _map.get()
+    if identity_map is not None and obj is not None and obj.pk is not None:
+        identity_map.add(obj)
+    return obj
+
+
+def cached(model, pk):
+    """The instance already loaded in this scope, or None."""
+    identity_map = _map.get()
+    if identity_map is None:
+        return None
+    try:
+        pk = model._meta.pk.to_python(pk)
+    except ValidationError:
+        return None
+    return identity_map.get(model, pk)
+
+
+def written(model, instance=None):
+    """Drop rows a write may have changed: the saved instance, or every row of ``model``."""
+    identity_map = _map.get()
+    if identity_map is None:
+        return
+    if isinstance(instance, model):
+        # Inserts have no pk yet and cannot have been loaded.
+        if instance.pk is not None:
+            identity_map.discard(model, instance.pk)
+    else:
+        identity_map.discard(model)
+
+
+class IdentityMappedDescriptor(ForwardManyToOneDescriptor):
+    def get_object(self, instance):
+        pk = getattr(instance, self.field.attname)
+        obj = cached(self.field.related_model, pk)
+        if obj is None:
+            obj = remember(super().get_object(instance))
+        return obj
+
+
+class IdentityMappedForeignKey(models.ForeignKey):
+    """A ForeignKey whose lazy lookups go through the current identity map."""
+    forward_related_accessor_class = IdentityMappedDescriptor
+
+    def deconstruct(self):
+        # Migrations see a plain ForeignKey; only the Python accessor differs.
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.ForeignKey', args, kwargs
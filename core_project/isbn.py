@@ -0,0 +1,32 @@
+import re
+
+
+def clean(value):
+    return re.sub(r'[^0-9X]', '', (value or '').upper())
+
+
+def isbn10_is_valid(digits):
+    if not re.fullmatch(r'[0-9]{9}[0-9X]', digits):
+        return False
+    total = sum((10 - i) * (10 if c == 'X' else int(c)) for i, c in enumerate(digits))
+    return total % 11 == 0
+
+
+def isbn13_check_digit(first12):
+    total = sum(int(c) * (1 if i % 2 == 0 else 3) for i, c in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def isbn13_is_valid(digits):
+    return bool(re.fullmatch(r'[0-9]{13}', digits)) and isbn13_check_digit(digits[:12]) == digits[12]
+
+
+def to_isbn13(value):
+    """Return the canonical ISBN-13 for an ISBN-10/13 in any formatting, or '' if invalid."""
+    digits = clean(value)
+    if len(digits) == 13 and isbn13_is_valid(digits):
+        return digits
+    if len(digits) == 10 and isbn10_is_valid(digits):
+        first12 = '978' + digits[:9]
+        return first12 + isbn13_check_digit(first12)
+    return ''
@@ -0,0 +1,59 @@
+from django.core.exceptions import ValidationError
+from rest_framework import serializers
+
+from .models import TextualItem
+from .tagging import tagged_item_ids
+
+# Query parameter -> (model field, lookup). Every field here leads with
+# project in an index on TextualItem, so any combination is answered by
+# index searches within the reader's projects rather than a table scan.
+FILTERS = {
+    'status__in': ('status', 'in'),
+    'rating__gte': ('rating', 'gte'),
+    'rating__lte': ('rating', 'lte'),
+    'author': ('author', 'exact'),
+    'start_date__gte': ('start_date', 'gte'),
+    'start_date__lte': ('start_date', 'lte'),
+    'completion_date__gte': ('completion_date', 'gte'),
+    'completion_date__lte': ('completion_date', 'lte'),
+}
+
+# Sortable fields, each read in order from its (project, field) index.
+ORDERING_FIELDS = ['title', 'progress_percent', 'start_date', 'completion_date']
+ORDERINGS = {
+    **{field: [field, 'pk'] for field in ORDERING_FIELDS},
+    **{f'-{field}': [f'-{field}', '-pk'] for field in ORDERING_FIELDS},
+}
+
+
+def parse_value(param, field_name, lookup, raw):
+    field = TextualItem._meta.get_field(field_name)
+    if lookup == 'in':
+        choices = [choice for choice, _ in field.choices]
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        if not values or not set(values) <= set(choices):
+            raise serializers.ValidationError({param: [f"Give a comma-separated list from: {', '.join(choices)}."]})
+        return values
+    try:
+        return field.to_python(raw)
+    except ValidationError as exc:
+        raise serializers.ValidationError({param: exc.messages})
+
+
+def filter_items(queryset, params, reader_id):
+    """Apply the item list's filter and ordering query parameters to ``queryset``."""
+    tag = params.get('tag')
+    if tag is not None:
+        queryset = queryset.filter(pk__in=tagged_item_ids(reader_id, tag))
+
+    for param, (field_name, lookup) in FILTERS.items():
+        raw = params.get(param)
+        if raw is not None:
+            queryset = queryset.filter(**{f'{field_name}__{lookup}': parse_value(param, field_name, lookup, raw)})
+
+    ordering = params.get('ordering')
+    if ordering:
+        if ordering not in ORDERINGS:
+            raise serializers.ValidationError({'ordering': [f"Choose one of: {', '.join(ORDERINGS)}."]})
+        queryset = queryset.order_by(*ORDERINGS[ordering])
+    return queryset
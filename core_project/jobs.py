@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, models
+from django.utils import timezone
+
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+# The job the current thread is running, for heartbeat().
+_running = threading.local()
+
+
+def job(name):
+    """Register the decorated function as the handler for jobs called ``name``."""
+    def register(func):
+        registry[name] = func
+        return func
+    return register
+
+
+def enqueue(name, payload=None, reader_id=None):
+    if name not in registry:
+        raise ValueError(f"Unknown job: {name}")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        reader_id=reader_id,
+        max_attempts=getattr(settings, 'JOB_MAX_ATTEMPTS', 5),
+    )
+
+
+def backoff(attempts):
+    base = getattr(settings, 'JOB_RETRY_BACKOFF', 2)
+    cap = getattr(settings, 'JOB_RETRY_BACKOFF_MAX', 300)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def claim_job(worker_id):
+    """Claim the next runnable job for ``worker_id``, or return None.
+
+    Claiming is a conditional UPDATE on the job's QUEUED status, so two
+    workers racing for the same row cannot both win it.
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects
+        .filter(status=JobStatus.QUEUED, run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = Job.objects.filter(pk=job_id, status=JobStatus.QUEUED).update(
+            status=JobStatus.RUNNING,
+            attempts=models.F('attempts') + 1,
+            locked_by=worker_id,
+            locked_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    handler = registry.get(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{job.name}'")
+        _running.job = job
+        try:
+            result = handler(**job.payload)
+        finally:
+            _running.job = None
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = JobStatus.QUEUED
+            job.run_after = timezone.now() + backoff(job.attempts)
+        else:
+            job.status = JobStatus.FAILED
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.name, job.attempts)
+    else:
+        job.status = JobStatus.SUCCEEDED
+        job.result = result
+        job.last_error = ''
+    job.locked_by = ''
+    job.locked_at = None
+    for attempt in range(3):
+        try:
+            job.save(update_fields=['status', 'result', 'last_error', 'run_after', 'locked_by', 'locked_at', 'updated_at'])
+            break
+        except OperationalError:
+            # Usually SQLite reporting a lock held by another writer. If it
+            # persists the job stays RUNNING until requeue_stale() frees it.
+            logger.warning("Could not record the outcome of job %s", job.id, exc_info=True)
+            time.sleep(0.1 * 2 ** attempt)
+    return job
+
+
+def heartbeat():
+    """Renew the lease of the job running in this thread.
+
+    Handlers that can outlast ``JOB_LOCK_TIMEOUT`` call this between units of
+    work so requeue_stale() does not hand their job to another worker. It
+    writes at most once per ``JOB_HEARTBEAT_INTERVAL`` seconds and does
+    nothing outside a job.
+    """
+    job = getattr(_running, 'job', None)
+    if job is None or job.locked_at is None:
+        return
+    now = timezone.now()
+    if now - job.locked_at < timedelta(seconds=getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 30)):
+        return
+    renewed = Job.objects.filter(pk=job.pk, status=JobStatus.RUNNING, locked_by=job.locked_by).update(locked_at=now)
+    if not renewed:
+        logger.warning("Job %s (%s) lost its lease to requeue_stale()", job.id, job.name)
+    job.locked_at = now
+
+
+def requeue_stale(timeout=None):
+    """Return RUNNING jobs whose worker died to the queue."""
+    timeout = timeout or getattr(settings, 'JOB_LOCK_TIMEOUT', 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(status=JobStatus.RUNNING, locked_at__lt=cutoff).update(
+        status=JobStatus.QUEUED,
+        locked_by='',
+        locked_at=None,
+    )
+
+
+def run_pending(worker_id='inline', limit=None):
+    """Run runnable jobs until the queue is empty or ``limit`` jobs have run."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_job(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+def work(worker_id, stop, poll_interval=1.0, once=False):
+    """Worker loop used by ``manage.py run_workers``.
+
+    Every ``JOB_REQUEUE_INTERVAL`` seconds the worker also requeues jobs
+    whose worker died, so a long-running pool does not leave them RUNNING.
+    """
+    ran = 0
+    requeue_interval = getattr(settings, 'JOB_REQUEUE_INTERVAL', 60)
+    next_requeue = time.monotonic()
+    while not stop.is_set():
+        close_old_connections()
+        try:
+            if time.monotonic() >= next_requeue:
+                requeue_stale()
+                next_requeue = time.monotonic() + requeue_interval
+            job = claim_job(worker_id)
+        except OperationalError:
+            # Usually SQLite reporting a lock held by another writer.
+            logger.warning("Worker %s could not claim a job, retrying", worker_id, exc_info=True)
+            stop.wait(poll_interval)
+            continue
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+        ran += 1
+    close_old_connections()
+    return ran
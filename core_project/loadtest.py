@@ -0,0 +1,259 @@
+import asyncio
+import json
+import math
+import random
+import time
+from urllib.parse import urlsplit
+
+# Route name -> relative weight of the default read/write mix.
+DEFAULT_MIX = {
+    'list_projects': 4,
+    'get_project': 2,
+    'list_items': 6,
+    'get_item': 6,
+    'create_item': 1,
+    'patch_item': 1,
+}
+
+
+def parse_mix(value):
+    """Parse ``name=weight,name=weight`` into a mix dict."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in value.split(','))):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown route '{name}'; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    if not mix or not any(mix.values()):
+        raise ValueError("The mix must give at least one route a positive weight")
+    return mix
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Connection:
+    """A minimal keep-alive HTTP/1.1 client connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.cookies = {}
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            await self.open()
+        payload = json.dumps(body).encode() if body is not None else b''
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+            f"Content-Length: {len(payload)}",
+        ]
+        if body is not None:
+            headers.append("Content-Type: application/json")
+        if self.cookies:
+            headers.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        try:
+            self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + payload)
+            await self.writer.drain()
+            return await self.read_response()
+        except (OSError, asyncio.IncompleteReadError, HTTPError):
+            await self.close()
+            raise
+
+    async def read_response(self):
+        status_line = await self.reader.readuntil(b"\r\n")
+        parts = status_line.decode('latin-1').split(' ', 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise HTTPError(f"Malformed status line: {status_line!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            if name == 'set-cookie':
+                cookie = value.split(';', 1)[0]
+                key, _, cookie_value = cookie.partition('=')
+                self.cookies[key.strip()] = cookie_value.strip()
+            headers[name] = value
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b"\r\n")
+                    break
+                body += await self.reader.readexactly(size + 2)
+                body = body[:-2]
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            await self.close()
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+
+    def record(self, latency, ok):
+        self.latencies.append(latency)
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+            'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': ms(percentile(latencies, 50)),
+            'p95_ms': ms(percentile(latencies, 95)),
+            'p99_ms': ms(percentile(latencies, 99)),
+            'max_ms': ms(latencies[-1] if latencies else None),
+        }
+
+
+class LoadTest:
+    """Drive the reading-project and textual-item routes from a pool of async clients."""
+
+    def __init__(self, base_url, project_ids, item_ids, mix=None, concurrency=10,
+                 requests=None, duration=None, seed=0):
+        url = urlsplit(base_url)
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip('/')
+        self.project_ids = list(project_ids)
+        self.item_ids = list(item_ids)
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.rng = random.Random(seed)
+        self.stats = {name: RouteStats() for name in self.mix}
+        self.issued = 0
+
+        if not self.project_ids:
+            raise ValueError("At least one project is needed to generate load")
+        if not self.item_ids:
+            # Only writes that create items are possible without existing items.
+            self.mix = {name: weight for name, weight in self.mix.items() if name in ('list_projects', 'get_project', 'list_items', 'create_item')}
+
+    def next_request(self):
+        names = list(self.mix)
+        name = self.rng.choices(names, weights=[self.mix[n] for n in names])[0]
+        project = self.rng.choice(self.project_ids)
+        item = self.rng.choice(self.item_ids) if self.item_ids else None
+        prefix = self.prefix
+        if name == 'list_projects':
+            return name, 'GET', f"{prefix}/api/reading-projects/", None
+        if name == 'get_project':
+            return name, 'GET', f"{prefix}/api/reading-projects/{project}/", None
+        if name == 'list_items':
+            return name, 'GET', f"{prefix}/api/textual-items/?project={project}", None
+        if name == 'get_item':
+            return name, 'GET', f"{prefix}/api/textual-items/{item}/", None
+        if name == 'create_item':
+            n = self.rng.randrange(1_000_000)
+            body = {'title': f"Load test {n}", 'isbn': f"{n:07d}", 'author': "Load Tester", 'project': project}
+            return name, 'POST', f"{prefix}/api/textual-items/", body
+        return name, 'PATCH', f"{prefix}/api/textual-items/{item}/", {'total_pages': self.rng.randint(100, 900)}
+
+    def has_budget(self, started):
+        if self.requests is not None and self.issued >= self.requests:
+            return False
+        if self.duration is not None and time.perf_counter() - started >= self.duration:
+            return False
+        return True
+
+    async def client(self, started):
+        connection = Connection(self.host, self.port)
+        try:
+            while self.has_budget(started):
+                self.issued += 1
+                name, method, path, body = self.next_request()
+                sent = time.perf_counter()
+                try:
+                    status, _ = await connection.request(method, path, body)
+                    ok = status < 400
+                except (OSError, asyncio.IncompleteReadError, HTTPError):
+                    ok = False
+                self.stats.setdefault(name, RouteStats()).record(time.perf_counter() - sent, ok)
+        finally:
+            await connection.close()
+
+    async def run(self):
+        if self.requests is None and self.duration is None:
+            raise ValueError("Give a request count or a duration")
+        started = time.perf_counter()
+        await asyncio.gather(*(self.client(started) for _ in range(self.concurrency)))
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        routes = {name: stats.summary(elapsed) for name, stats in sorted(self.stats.items()) if stats.latencies}
+        total = RouteStats()
+        for stats in self.stats.values():
+            total.latencies.extend(stats.latencies)
+            total.errors += stats.errors
+        return {
+            'concurrency': self.concurrency,
+            'elapsed_s': round(elapsed, 3),
+            'routes': routes,
+            'total': total.summary(elapsed),
+        }
+
+
+def format_report(report):
+    """Render a report as a fixed-width table that diffs cleanly between runs."""
+    columns = ['requests', 'errors', 'error_rate', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    rows = [(name, summary) for name, summary in report['routes'].items()] + [('TOTAL', report['total'])]
+    width = max(len(name) for name, _ in rows)
+    lines = [
+        f"concurrency={report['concurrency']} elapsed_s={report['elapsed_s']}",
+        " ".join([f"{'route':<{width}}"] + [f"{c:>14}" for c in columns]),
+    ]
+    for name, summary in rows:
+        lines.append(" ".join([f"{name:<{width}}"] + [f"{'-' if summary[c] is None else summary[c]!s:>14}" for c in columns]))
+    return "\n".join(lines)
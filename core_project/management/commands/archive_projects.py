@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core_project.archive import archivable_projects, archive_project
+
+
+class Command(BaseCommand):
+    help = "Move completed or old reading projects into the archive tier."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None, help="Also archive projects created before this many days ago.")
+        parser.add_argument('--skip-completed', action='store_true', help="Do not archive projects just because every item is completed.")
+        parser.add_argument('--reader', type=int, default=None, help="Only archive this reader's projects.")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        projects = archivable_projects(
+            completed=not options['skip_completed'],
+            older_than_days=options['older_than_days'],
+            reader_id=options['reader'],
+        )
+        archived = 0
+        for project in projects.iterator():
+            if not options['dry_run']:
+                archive_project(project)
+            archived += 1
+        verb = "Would archive" if options['dry_run'] else "Archived"
+        self.stdout.write(f"{verb} {archived} project(s)")
@@ -0,0 +1,47 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core_project.backups import BackupError, setting, snapshot
+
+
+class Command(BaseCommand):
+    help = "Snapshot the SQLite database while it is in use, rotating old snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=None, help="Database file to back up; defaults to the default database.")
+        parser.add_argument('--dir', default=None, help="Snapshot directory; defaults to BACKUP_DIR.")
+        parser.add_argument('--keep', type=int, default=None, help="Number of snapshots to keep.")
+        parser.add_argument('--pages', type=int, default=None, help="Pages copied per backup step.")
+        parser.add_argument('--pause', type=float, default=None, help="Seconds to yield to writers between steps.")
+        parser.add_argument('--no-verify', action='store_true', help="Skip the integrity check of the snapshot.")
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        if options['source'] is None and database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("backup_db only backs up SQLite databases.")
+        source = str(options['source'] or database['NAME'])
+        directory = str(options['dir'] or setting('DIR', settings.BASE_DIR / 'backups'))
+        if options['keep'] is not None and options['keep'] < 1:
+            raise CommandError("--keep must be at least 1.")
+
+        try:
+            stats = snapshot(
+                source, directory,
+                keep=options['keep'],
+                check=not options['no_verify'],
+                pages=options['pages'],
+                pause=options['pause'],
+            )
+        except (BackupError, sqlite3.Error) as exc:
+            raise CommandError(f"Backup of {source} failed: {exc}")
+
+        mb = stats['bytes'] / 1024 / 1024
+        rate = mb / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(
+            f"Backed up {source} -> {stats['path']}: {stats['pages']} pages ({mb:.1f} MiB) "
+            f"in {stats['seconds']:.2f}s, {rate:.1f} MiB/s, {stats['steps']} steps, {stats['restarts']} restarts"
+        )
+        for path in stats['rotated']:
+            self.stdout.write(f"Removed old snapshot {path}")
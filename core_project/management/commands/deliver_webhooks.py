@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+
+from core_project.webhooks import ConnectionPool, deliver_pending, purge_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver outbox events to webhook endpoints in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when nothing is due.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Events per request; defaults to WEBHOOK_BATCH_SIZE.")
+        parser.add_argument('--once', action='store_true', help="Exit once nothing is due.")
+
+    def handle(self, *args, **options):
+        pool = ConnectionPool()
+        delivered = 0
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    sent = deliver_pending(pool, options['batch_size'])
+                except OperationalError:
+                    sent = 0
+                delivered += sent
+                if not sent:
+                    purge_outbox()
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.close()
+        self.stdout.write(f"Delivered {delivered} event(s)")
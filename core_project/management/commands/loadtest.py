@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core_project.loadtest import DEFAULT_MIX, LoadTest, format_report, parse_mix
+from core_project.models import ReadingProject, TextualItem
+from core_project.readers import anonymous_reader_id
+
+
+class Command(BaseCommand):
+    help = "Generate concurrent HTTP load against a running server and report latency per route."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the server under test.")
+        parser.add_argument('--concurrency', type=int, default=10, help="Number of concurrent clients.")
+        parser.add_argument('--requests', type=int, default=None, help="Total requests to send.")
+        parser.add_argument('--duration', type=float, default=None, help="Seconds to run for.")
+        parser.add_argument(
+            '--mix', type=parse_mix, default=DEFAULT_MIX,
+            help="Route weights, e.g. list_items=6,get_item=6,create_item=1. Routes: " + ", ".join(DEFAULT_MIX),
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+        parser.add_argument('--output', default=None, help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        if min(options['concurrency'], options['requests'] or 1, options['duration'] or 1) <= 0:
+            raise CommandError("Counts and durations must be positive.")
+        if options['requests'] is None and options['duration'] is None:
+            options['requests'] = 1000
+
+        # Requests are unauthenticated, so they see the anonymous reader's
+        # library; ids come from the database since the API does not expose them.
+        reader_id = anonymous_reader_id()
+        project_ids = list(ReadingProject.objects.filter(reader_id=reader_id).values_list('id', flat=True))
+        if not project_ids:
+            raise CommandError(
+                "The anonymous reader has no projects to load test; create some or run `seed_library --anonymous` first."
+            )
+        item_ids = list(TextualItem.objects.filter(project_id__in=project_ids).values_list('id', flat=True))
+
+        load_test = LoadTest(
+            options['url'], project_ids, item_ids,
+            mix=options['mix'],
+            concurrency=options['concurrency'],
+            requests=options['requests'],
+            duration=options['duration'],
+            seed=options['seed'],
+        )
+        report = asyncio.run(load_test.run())
+
+        output = json.dumps(report, indent=2, sort_keys=True) if options['json'] else format_report(report)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + "\n")
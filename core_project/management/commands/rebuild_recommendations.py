@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core_project import recommendations
+from core_project.models import BookCoOccurrence, BookIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuild the author/ISBN index and book co-occurrence table from scratch."
+
+    def handle(self, *args, **options):
+        recommendations.rebuild()
+        self.stdout.write(
+            f"Indexed {BookIndex.objects.count()} book(s), {BookCoOccurrence.objects.count()} co-occurrence pair(s)"
+        )
@@ -0,0 +1,67 @@
+import os
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _process_worker(worker_id, poll_interval, once):
+    django.setup()
+    from core_project import jobs
+
+    stop = threading.Event()
+    try:
+        return jobs.work(worker_id, stop, poll_interval, once)
+    except KeyboardInterrupt:
+        return 0
+
+
+class Command(BaseCommand):
+    help = "Run background job workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Number of concurrent workers.")
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is drained.")
+
+    def handle(self, *args, **options):
+        # Imported here so spawned worker processes can unpickle
+        # _process_worker before Django is set up.
+        from core_project import jobs
+
+        workers = options['workers']
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+        stop = threading.Event()
+        if options['pool'] == 'process':
+            # Children must open their own database connections.
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers)
+            futures = [
+                executor.submit(_process_worker, f"{prefix}:{i}", options['poll_interval'], options['once'])
+                for i in range(workers)
+            ]
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job-worker')
+            futures = [
+                executor.submit(jobs.work, f"{prefix}:{i}", stop, options['poll_interval'], options['once'])
+                for i in range(workers)
+            ]
+
+        self.stdout.write(f"Started {workers} {options['pool']} worker(s)")
+        try:
+            wait(futures)
+        except KeyboardInterrupt:
+            stop.set()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        ran = sum(f.result() for f in futures if f.done() and not f.cancelled() and f.exception() is None)
+        self.stdout.write(f"Ran {ran} job(s)")
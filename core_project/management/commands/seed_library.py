@@ -0,0 +1,189 @@
+import itertools
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core_project.isbn import isbn13_check_digit
+from core_project.models import Reader, ReadingProject, ReadingStatus, TextualItem
+from core_project.readers import anonymous_reader_id
+
+STATUS_WEIGHTS = [
+    (ReadingStatus.COMPLETED, 40),
+    (ReadingStatus.NOT_STARTED, 20),
+    (ReadingStatus.PLANNED, 15),
+    (ReadingStatus.IN_PROGRESS, 10),
+    (ReadingStatus.ON_HOLD, 8),
+    (ReadingStatus.DNF, 7),
+]
+STATUSES, STATUS_CUM_WEIGHTS = zip(*STATUS_WEIGHTS)
+STATUS_CUM_WEIGHTS = list(itertools.accumulate(STATUS_CUM_WEIGHTS))
+RATINGS = ['1.0', '1.5', '2.0', '2.5', '3.0', '3.5', '4.0', '4.5', '5.0']
+RATING_CUM_WEIGHTS = list(itertools.accumulate([1, 1, 3, 4, 10, 16, 24, 20, 12]))
+PROJECT_NAMES = ["{year} Reading", "Book Club {year}", "To Read", "Classics", "Sci-Fi Shelf", "Summer {year}", "Re-reads"]
+WORDS = (
+    "shadow river night glass empire winter garden silent city storm iron house secret "
+    "light sea stone fire crown broken last kingdom lost memory star road wolf song dust "
+    "paper golden black red wild long dark autumn ghost island machine"
+).split()
+FIRST_NAMES = "Ada Toni Jorge Ursula Octavia Haruki Chinua Zadie Italo Clarice Kazuo Elena Orhan Ngozi Mary Frank".split()
+LAST_NAMES = "Le Guin Morrison Borges Butler Murakami Achebe Smith Calvino Lispector Ishiguro Ferrante Pamuk Adichie Shelley Herbert".split()
+NOTES = ["Loved the ending", "Slow start", "Re-read chapter 3", "Recommended by a friend", "Lent to a neighbour", "Audiobook version"]
+
+
+def make_catalog(rng, size):
+    catalog = []
+    for i in range(size):
+        first12 = f"978{i:09d}"
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+        author = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        pages = int(min(max(rng.lognormvariate(5.7, 0.45), 40), 1500))
+        catalog.append((title, first12 + isbn13_check_digit(first12), author, pages))
+    return catalog
+
+
+class ItemInserter:
+    """Batched multi-row insert of TextualItem rows given as db-ready values.
+
+    Items are the bulk of a seeded library; building model instances and
+    going through bulk_create costs several times more than SQLite needs
+    to store the rows, so item rows are written with executemany against
+    the model's own table and columns. Unset columns get the field default.
+    """
+
+    def __init__(self):
+        meta = TextualItem._meta
+        fields = [f for f in meta.concrete_fields if not f.primary_key and not f.generated]
+        self.columns = [f.attname for f in fields]
+        self.defaults = {
+            f.attname: None if f.null and not f.has_default() else f.get_db_prep_save(f.get_default(), connection)
+            for f in fields
+        }
+        quote = connection.ops.quote_name
+        self.sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote(meta.db_table),
+            ", ".join(quote(f.column) for f in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+
+    def row(self, values):
+        defaults = self.defaults
+        return tuple(values.get(column, defaults[column]) for column in self.columns)
+
+    def flush(self, batch):
+        if not batch:
+            return 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(self.sql, batch)
+        count = len(batch)
+        batch.clear()
+        return count
+
+
+class Command(BaseCommand):
+    help = "Generate a deterministic synthetic library for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=10)
+        parser.add_argument('--projects', type=int, default=5, help="Projects per reader.")
+        parser.add_argument('--items', type=int, default=100, help="Items per project.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--catalog', type=int, default=50000, help="Number of distinct books to draw from.")
+        parser.add_argument('--batch-size', type=int, default=20000, help="Rows per insert batch and transaction.")
+        parser.add_argument('--end-date', type=date.fromisoformat, default=date(2025, 1, 1), help="Latest reading date generated.")
+        parser.add_argument('--fast', action='store_true', help="Turn off SQLite fsync while seeding (unsafe if the process crashes).")
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help="Also give the shared anonymous reader projects, so `loadtest` has a library to request.",
+        )
+
+    def handle(self, *args, **options):
+        if min(options['readers'], options['projects'], options['items'], options['catalog'], options['batch_size']) < 1:
+            raise CommandError("All counts must be positive.")
+
+        rng = random.Random(options['seed'])
+        started = time.monotonic()
+        if options['fast'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+
+        catalog = make_catalog(rng, options['catalog'])
+        with transaction.atomic():
+            readers = Reader.objects.bulk_create(
+                [Reader(name=f"Reader {i}") for i in range(options['readers'])],
+                batch_size=options['batch_size'],
+            )
+            owners = list(readers)
+            if options['anonymous']:
+                reader_id = anonymous_reader_id(create=True)
+                if reader_id is None:
+                    raise CommandError("ANONYMOUS_READER_NAME is not set, so there is no anonymous reader to seed.")
+                owners.append(Reader(pk=reader_id))
+            projects = ReadingProject.objects.bulk_create(
+                [
+                    ReadingProject(
+                        name=rng.choice(PROJECT_NAMES).format(year=options['end_date'].year - rng.randint(0, 5)),
+                        reader=reader,
+                    )
+                    for reader in owners
+                    for _ in range(options['projects'])
+                ],
+                batch_size=options['batch_size'],
+            )
+
+        inserter = ItemInserter()
+        total = 0
+        batch = []
+        for project_id in (project.pk for project in projects):
+            for _ in range(options['items']):
+                batch.append(inserter.row(self.make_item(rng, catalog, project_id, options['end_date'])))
+                if len(batch) >= options['batch_size']:
+                    total += inserter.flush(batch)
+        total += inserter.flush(batch)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"Seeded {len(readers)} reader(s), {len(projects)} project(s), {total} item(s) "
+            f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} items/s)"
+        )
+        self.stdout.write("Run `manage.py rebuild_recommendations` to index the new items.")
+
+    def make_item(self, rng, catalog, project_id, end_date):
+        # Popular books are picked far more often than the long tail.
+        title, isbn13, author, total_pages = catalog[int(len(catalog) * rng.random() ** 3)]
+        status = rng.choices(STATUSES, cum_weights=STATUS_CUM_WEIGHTS)[0]
+        item = {
+            'title': title,
+            'isbn': isbn13,
+            'isbn13': isbn13,
+            'author': author,
+            'project_id': project_id,
+            'total_pages': total_pages,
+            'status': status,
+        }
+        if rng.random() < 0.2:
+            item['notes'] = json.dumps(rng.sample(NOTES, rng.randint(1, 3)))
+
+        if status in (ReadingStatus.NOT_STARTED, ReadingStatus.PLANNED):
+            return item
+
+        start_date = end_date - timedelta(days=rng.randint(0, 5 * 365))
+        item['start_date'] = start_date.isoformat()
+        pages_per_day = rng.uniform(10, 80)
+        if status == ReadingStatus.COMPLETED:
+            current_page = total_pages
+            item['completion_date'] = min(start_date + timedelta(days=int(total_pages / pages_per_day)), end_date).isoformat()
+            if rng.random() < 0.8:
+                item['rating'] = rng.choices(RATINGS, cum_weights=RATING_CUM_WEIGHTS)[0]
+        elif status == ReadingStatus.DNF:
+            current_page = rng.randint(1, max(total_pages // 2, 1))
+            item['dnf_date'] = min(start_date + timedelta(days=int(current_page / pages_per_day) + 1), end_date).isoformat()
+            if rng.random() < 0.3:
+                item['rating'] = rng.choice(RATINGS[:5])
+        else:
+            current_page = rng.randint(1, total_pages - 1)
+        item['current_page'] = current_page
+        return item
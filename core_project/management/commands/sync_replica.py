@@ -0,0 +1,38 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database onto the read replica file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1024, help="Pages copied per backup step.")
+
+    def handle(self, *args, **options):
+        alias = settings.READ_REPLICA_ALIAS
+        if alias not in settings.DATABASES:
+            raise CommandError(f"No database configured for replica alias '{alias}'.")
+
+        source = str(settings.DATABASES['default']['NAME'])
+        target = str(settings.DATABASES[alias]['NAME'])
+        tmp = f"{target}.tmp"
+        started = time.monotonic()
+
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(tmp)
+        try:
+            src.backup(dst, pages=options['pages'])
+        finally:
+            dst.close()
+            src.close()
+
+        # Swap the finished copy in so replica readers never see a partial file.
+        connections[alias].close()
+        os.replace(tmp, target)
+
+        self.stdout.write(f"Synced {source} -> {target} in {time.monotonic() - started:.2f}s")
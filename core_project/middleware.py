@@ -0,0 +1,24 @@
+from .db_routers import routing_scope
+from .identity import identity_scope
+
+
+class ReplicaRoutingMiddleware:
+    """Scope read-replica routing and primary pinning to a single request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing_scope():
+            return self.get_response(request)
+
+
+class IdentityMapMiddleware:
+    """Load each Reader and ReadingProject at most once per request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_scope():
+            return self.get_response(request)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0004_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reader',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='readingproject',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 06:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0005_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField()),
+                ('name', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('item_count', models.IntegerField(default=0)),
+                ('items_blob', models.BinaryField()),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core_project.reader')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reader', 'archived_at'], name='archive_reader_archived_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-19 06:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0006_archivedproject'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookCoOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book', models.CharField(max_length=320)),
+                ('other', models.CharField(max_length=320)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['book', '-count'], name='book_cooccurrence_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('book', 'other'), name='book_cooccurrence_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=320, unique=True)),
+                ('title', models.CharField(max_length=300)),
+                ('author', models.CharField(max_length=200)),
+                ('author_key', models.CharField(max_length=200)),
+                ('project_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['author_key', '-project_count'], name='book_index_author_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LibraryIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('book', 'Book'), ('author', 'Author')], max_length=10)),
+                ('key', models.CharField(max_length=320)),
+                ('count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core_project.readingproject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'kind'], name='library_index_project_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key', 'project'), name='library_index_entry_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-19 06:21
+
+from django.db import migrations, models
+
+from core_project.isbn import to_isbn13
+
+
+def backfill_isbn13(apps, schema_editor):
+    TextualItem = apps.get_model('core_project', 'TextualItem')
+    last_pk = 0
+    while True:
+        batch = list(TextualItem.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'isbn')[:1000])
+        if not batch:
+            break
+        for item in batch:
+            item.isbn13 = to_isbn13(item.isbn)
+        TextualItem.objects.bulk_update([item for item in batch if item.isbn13], ['isbn13'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0007_recommendation_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textualitem',
+            name='isbn13',
+            field=models.CharField(blank=True, default='', editable=False, max_length=13),
+        ),
+        migrations.RunPython(backfill_isbn13, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'isbn13'], name='item_project_isbn13_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['isbn13'], name='item_isbn13_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0009_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readingproject',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='textualitem',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-19 06:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0010_row_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=50)),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core_project.reader')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reader', 'id'], name='outbox_reader_id_idx'), models.Index(fields=['created_at'], name='outbox_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('events', models.JSONField(blank=True, default=list)),
+                ('secret', models.CharField(blank=True, max_length=200)),
+                ('active', models.BooleanField(default=True)),
+                ('cursor', models.BigIntegerField(default=0)),
+                ('failures', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core_project.reader')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['active', 'next_attempt_at'], name='webhook_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 06:49
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0011_webhooks'),
+    ]
+
+    operations = [
+        # A regular column cannot be altered into a generated one.
+        migrations.RemoveField(
+            model_name='textualitem',
+            name='progress_percent',
+        ),
+        migrations.AddField(
+            model_name='textualitem',
+            name='progress_percent',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(then=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('current_page'), '*', models.Value(100.0)), '/', models.F('total_pages')), 1), total_pages__gt=0), default=models.Value(0.0)), output_field=models.DecimalField(decimal_places=1, max_digits=5)),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'progress_percent'], name='item_project_progress_idx'),
+        ),
+    ]
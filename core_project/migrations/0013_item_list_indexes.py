@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-19 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0012_generated_progress_percent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'status'], name='item_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'rating'], name='item_project_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'author'], name='item_project_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'title'], name='item_project_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'start_date'], name='item_project_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'completion_date'], name='item_project_completed_idx'),
+        ),
+    ]
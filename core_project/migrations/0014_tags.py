@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-19 06:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0013_item_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core_project.reader')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ItemTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core_project.textualitem')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core_project.tag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='textualitem',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='items', through='core_project.ItemTag', to='core_project.tag'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('reader', 'name'), name='tag_reader_name_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='itemtag',
+            index=models.Index(fields=['tag', 'item'], name='item_tag_tag_item_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='itemtag',
+            constraint=models.UniqueConstraint(fields=('item', 'tag'), name='item_tag_unique'),
+        ),
+    ]
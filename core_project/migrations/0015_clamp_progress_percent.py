@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-19 07:14
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0014_tags'),
+    ]
+
+    operations = [
+        # Generated columns cannot be altered; drop and re-add it with its index.
+        migrations.RemoveIndex(
+            model_name='textualitem',
+            name='item_project_progress_idx',
+        ),
+        migrations.RemoveField(
+            model_name='textualitem',
+            name='progress_percent',
+        ),
+        migrations.AddField(
+            model_name='textualitem',
+            name='progress_percent',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(then=django.db.models.functions.comparison.Least(django.db.models.functions.comparison.Greatest(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('current_page'), '*', models.Value(100.0)), '/', models.F('total_pages')), 1), -9999.9), 9999.9), total_pages__gt=0), default=models.Value(0.0)), output_field=models.DecimalField(decimal_places=1, max_digits=5)),
+        ),
+        migrations.AddIndex(
+            model_name='textualitem',
+            index=models.Index(fields=['project', 'progress_percent'], name='item_project_progress_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-19 07:34
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def rank_books(apps, schema_editor):
+    # Same as recommendations.book_rank at the time of writing.
+    LibraryIndexEntry = apps.get_model('core_project', 'LibraryIndexEntry')
+    entries = LibraryIndexEntry.objects.filter(kind='book').only('key')
+    for entry in entries.iterator(chunk_size=1000):
+        entry.rank = int.from_bytes(hashlib.blake2b(entry.key.encode(), digest_size=4).digest(), 'big') >> 1
+        entry.save(update_fields=['rank'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_project', '0015_clamp_progress_percent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='libraryindexentry',
+            name='rank',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='libraryindexentry',
+            index=models.Index(fields=['project', 'kind', 'rank', 'key'], name='library_index_sample_idx'),
+        ),
+        migrations.RunPython(rank_books, migrations.RunPython.noop),
+    ]
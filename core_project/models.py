@@ -1,5 +1,15 @@
-from django.db import models
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models.sql import UpdateQuery
+from django.db.models.functions import Greatest, Least, Round
+from django.utils import timezone
 from django.core.exceptions import ValidationError
+from .caching import invalidate_reader
+from .events import publish_item_change
+from .identity import IdentityMappedForeignKey
+from .isbn import to_isbn13
 
 class ReadingStatus(models.TextChoices):
     NOT_STARTED = "Not Started", "Not Started"
@@ -9,57 +19,152 @@ class ReadingStatus(models.TextChoices):
     ON_HOLD = "On Hold", "On Hold"
     PLANNED = "Planned", "Planned"
 
+class LiveManager(models.Manager):
+    """Hides rows that are soft-deleted and waiting for background removal."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+class VersionConflict(Exception):
+    pass
+
+class VersionedModel(models.Model):
+    """Counts writes in ``version`` for optimistic concurrency control.
+
+    Every save bumps the version in the database. ``save(expected_version=n)`` writes with a
+    single ``UPDATE ... WHERE version = n`` and raises VersionConflict if the
+    row has moved on, so concurrent editors never overwrite each other.
+    """
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, expected_version=None, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = kwargs['update_fields'] = {*update_fields, 'version'}
+        if expected_version is None:
+            # Bump in SQL: an in-memory copy may be stale, and two different
+            # row states must never share a version. _do_update reads back
+            # the value the row was given.
+            self.version = models.F('version') + 1
+            return super().save(*args, **kwargs)
+
+        values = {
+            f.attname: f.pre_save(self, False)
+            for f in self._meta.concrete_fields
+            if not f.primary_key and not f.generated and f.name != 'version'
+            and (update_fields is None or f.name in update_fields or f.attname in update_fields)
+        }
+        updated = type(self)._base_manager.filter(pk=self.pk, version=expected_version).update(
+            version=expected_version + 1, **values
+        )
+        if not updated:
+            raise VersionConflict(f"{self._meta.object_name} {self.pk} is no longer at version {expected_version}")
+        self.version = expected_version + 1
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        if not isinstance(self.version, models.Expression):
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        filtered = base_qs.filter(pk=pk_val)
+        connection = connections[using]
+        if connection.vendor not in ('sqlite', 'postgresql') or not connection.features.can_return_columns_from_insert:
+            if not filtered._update(values):
+                return False
+            self.version = filtered.values_list('version', flat=True).get()
+            return True
+        query = filtered.query.chain(UpdateQuery)
+        query.add_update_fields(values)
+        update_sql, params = query.get_compiler(using).as_sql()
+        column = connection.ops.quote_name(self._meta.get_field('version').column)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{update_sql} RETURNING {column}", params)
+            row = cursor.fetchone()
+        if row is None:
+            return False
+        self.version = row[0]
+        return True
+
 class Reader(models.Model):
     name = models.CharField(max_length=200)
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='reader'
+    )
     projects = models.ManyToManyField('ReadingProject', related_name='readers', blank=True)
-    active_project = models.ForeignKey(
+    active_project = IdentityMappedForeignKey(
         'ReadingProject', 
         null=True, 
         blank=True, 
         on_delete=models.SET_NULL,
         related_name='active_readers'
     )
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
     
     def add_project(self, name):
         project = ReadingProject.objects.create(name=name, reader=self)
         # Auto-set as active if no active project
-        if not self.active_project:
+        if self.active_project_id is None:
             self.active_project = project
-            self.save()
+            self.save(update_fields=['active_project'])
         return project
     
     def set_default_project(self, project=None):
-        if self.readingproject_set.count() == 0:
+        # A live project of this reader proves the reader has projects.
+        has_projects = project is not None and project.reader_id == self.pk and project.deleted_at is None
+        if not has_projects and not self.readingproject_set.exists():
             project = self.add_project(name="Default Reading Project")
         
-        if project and project.reader != self:
+        if project and project.reader_id != self.pk:
             raise ValueError("Project not found in reader's projects")
         
         self.active_project = project
-        self.save()
+        self.save(update_fields=['active_project'])
     
     @property
     def projects(self):
         return self.readingproject_set.all()
 
-class ReadingProject(models.Model):
+class ReadingProject(VersionedModel):
     name = models.CharField(max_length=200)
-    reader = models.ForeignKey(Reader, on_delete=models.CASCADE)
+    reader = IdentityMappedForeignKey(Reader, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     active_project = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     def add_item(self, title, isbn, author):
+        from .recommendations import item_added
+
+        isbn13 = to_isbn13(isbn)
+        if isbn13 and self.textualitem_set.filter(isbn13=isbn13).exists():
+            raise ValueError("Item with this ISBN already in this project")
         item = TextualItem.objects.create(
             title=title,
             isbn=isbn, 
             author=author,
             project=self
         )
+        item_added(item)
         return item
     
     def delete_item(self, item):
-        if item.project != self:
+        from .recommendations import item_removed
+
+        if item.project_id != self.pk:
             raise ValueError("Item not in this project")
+        item_removed(item)
         item.delete()
     
     def total_project_pages(self):
@@ -74,13 +179,30 @@ class ReadingProject(models.Model):
     def items(self):
         return self.textualitem_set.all()
 
-class TextualItem(models.Model):
+# Largest magnitude a DecimalField(max_digits=5, decimal_places=1) holds.
+PROGRESS_PERCENT_LIMIT = Decimal('9999.9')
+
+class TextualItem(VersionedModel):
     title = models.CharField(max_length=300)
     isbn = models.CharField(max_length=13)
+    # Canonical ISBN-13 derived from isbn on save; blank when isbn is not a valid ISBN.
+    isbn13 = models.CharField(max_length=13, blank=True, default='', editable=False)
     author = models.CharField(max_length=200)
-    project = models.ForeignKey(ReadingProject, on_delete=models.CASCADE)
+    project = IdentityMappedForeignKey(ReadingProject, on_delete=models.CASCADE)
     
-    progress_percent = models.DecimalField(max_digits=5, decimal_places=1, default=0)
+    # Computed by the database so bulk and direct page updates can never leave it stale.
+    # Clamped to what the column can hold, so out-of-range page counts never store an unreadable value.
+    progress_percent = models.GeneratedField(
+        expression=models.Case(
+            models.When(total_pages__gt=0, then=Least(Greatest(
+                Round(models.F('current_page') * 100.0 / models.F('total_pages'), 1),
+                -float(PROGRESS_PERCENT_LIMIT),
+            ), float(PROGRESS_PERCENT_LIMIT))),
+            default=models.Value(0.0),
+        ),
+        output_field=models.DecimalField(max_digits=5, decimal_places=1),
+        db_persist=True,
+    )
     current_page = models.IntegerField(default=0)
     total_pages = models.IntegerField(default=0)
     status = models.CharField(max_length=20, choices=ReadingStatus.choices, default=ReadingStatus.NOT_STARTED)
@@ -90,11 +212,76 @@ class TextualItem(models.Model):
     completion_date = models.DateField(null=True, blank=True)
     dnf_date = models.DateField(null=True, blank=True)
     notes = models.JSONField(default=list, blank=True)
+    # Change through core_project.tagging so the per-tag counts stay right.
+    tags = models.ManyToManyField('Tag', through='ItemTag', related_name='items', blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'isbn13'], name='item_project_isbn13_idx'),
+            models.Index(fields=['isbn13'], name='item_isbn13_idx'),
+            models.Index(fields=['project', 'progress_percent'], name='item_project_progress_idx'),
+            # Filters and orderings of the item list (see item_filters).
+            models.Index(fields=['project', 'status'], name='item_project_status_idx'),
+            models.Index(fields=['project', 'rating'], name='item_project_rating_idx'),
+            models.Index(fields=['project', 'author'], name='item_project_author_idx'),
+            models.Index(fields=['project', 'title'], name='item_project_title_idx'),
+            models.Index(fields=['project', 'start_date'], name='item_project_started_idx'),
+            models.Index(fields=['project', 'completion_date'], name='item_project_completed_idx'),
+        ]
+
+    # Fields whose changes are published to webhooks through the outbox.
+    TRACKED_FIELDS = ('status', 'rating')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        item = super().from_db(db, field_names, values)
+        item.remember_tracked()
+        return item
+
+    def remember_tracked(self):
+        self._tracked = {name: self.__dict__.get(name) for name in self.TRACKED_FIELDS}
+
+    def save(self, *args, **kwargs):
+        from .outbox import item_event_names, record_item_events
+
+        self.isbn13 = to_isbn13(self.isbn)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'isbn' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'isbn13'}
+        if not item_event_names(self):
+            super().save(*args, **kwargs)
+        else:
+            # The outbox rows commit or roll back together with the change.
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                record_item_events([self])
+        # Updates do not read generated columns back; mirror the database's value.
+        self.progress_percent = self.compute_progress_percent(self.current_page, self.total_pages)
+        self.remember_tracked()
+
+    def delete(self, *args, **kwargs):
+        from .tagging import release_items
+
+        with transaction.atomic():
+            release_items(TextualItem.objects.filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+
+    @staticmethod
+    def compute_progress_percent(current_page, total_pages):
+        """The value the database generates for ``progress_percent``, rounded half away from zero like SQL ROUND."""
+        if total_pages <= 0:
+            return Decimal('0.0')
+        percent = (Decimal(current_page * 100) / total_pages).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+        return min(max(percent, -PROGRESS_PERCENT_LIMIT), PROGRESS_PERCENT_LIMIT)
     
-    def update_progress(self, current_page, total_pages):
+    # Fields written when progress changes; progress_percent follows from the page counts.
+    PROGRESS_FIELDS = ['current_page', 'total_pages', 'status']
+
+    def apply_progress(self, current_page, total_pages):
+        """Set page counts, percent and status in memory without saving."""
         self.current_page = current_page
         self.total_pages = total_pages
-        self.progress_percent = round((current_page / total_pages) * 100 if total_pages > 0 else 0, 1)
+        self.progress_percent = self.compute_progress_percent(current_page, total_pages)
         
         if self.progress_percent == 100:
             self.status = ReadingStatus.COMPLETED
@@ -102,18 +289,24 @@ class TextualItem(models.Model):
             self.status = ReadingStatus.IN_PROGRESS
         else:
             self.status = ReadingStatus.NOT_STARTED
-        
+
+    def update_progress(self, current_page, total_pages):
+        self.apply_progress(current_page, total_pages)
         self.save()
+        publish_item_change(self)
+        invalidate_reader(project=self.project)
     
     def update_start_date(self, start_date):
         self.start_date = start_date
         self.save()
+        invalidate_reader(project=self.project)
     
     def update_completion_date(self, completion_date):
         if self.status != ReadingStatus.COMPLETED:
             raise ValueError("Cannot set completion date unless status is COMPLETED")
         self.completion_date = completion_date
         self.save()
+        invalidate_reader(project=self.project)
     
     def update_rating(self, rating):
         if rating < 1 or rating > 5:
@@ -121,4 +314,178 @@ class TextualItem(models.Model):
         elif not (rating * 2).is_integer():
             raise ValueError("Rating must be of decimal values of .0 or .5")
         self.rating = rating
-        self.save()
\ No newline at end of file
+        self.save()
+        publish_item_change(self)
+
+class JobStatus(models.TextChoices):
+    QUEUED = "Queued", "Queued"
+    RUNNING = "Running", "Running"
+    SUCCEEDED = "Succeeded", "Succeeded"
+    FAILED = "Failed", "Failed"
+
+class Job(models.Model):
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    reader = models.ForeignKey(Reader, null=True, blank=True, on_delete=models.SET_NULL)
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+
+class ArchivedProject(models.Model):
+    reader = models.ForeignKey(Reader, on_delete=models.CASCADE)
+    original_id = models.BigIntegerField()
+    name = models.CharField(max_length=200)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    item_count = models.IntegerField(default=0)
+    # zlib-compressed JSON: {"fields": [...], "rows": [[...], ...]}
+    items_blob = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reader', 'archived_at'], name='archive_reader_archived_idx'),
+        ]
+
+
+class IndexKind(models.TextChoices):
+    BOOK = "book", "Book"
+    AUTHOR = "author", "Author"
+
+class LibraryIndexEntry(models.Model):
+    """Inverted index from a normalized book or author key to the projects holding it."""
+    kind = models.CharField(max_length=10, choices=IndexKind.choices)
+    key = models.CharField(max_length=320)
+    project = models.ForeignKey(ReadingProject, on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+    # recommendations.book_rank(key) for books; orders each project's pair sample.
+    rank = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key', 'project'], name='library_index_entry_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['project', 'kind'], name='library_index_project_idx'),
+            models.Index(fields=['project', 'kind', 'rank', 'key'], name='library_index_sample_idx'),
+        ]
+
+class BookIndex(models.Model):
+    key = models.CharField(max_length=320, unique=True)
+    title = models.CharField(max_length=300)
+    author = models.CharField(max_length=200)
+    author_key = models.CharField(max_length=200)
+    project_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author_key', '-project_count'], name='book_index_author_idx'),
+        ]
+
+class BookCoOccurrence(models.Model):
+    book = models.CharField(max_length=320)
+    other = models.CharField(max_length=320)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'other'], name='book_cooccurrence_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['book', '-count'], name='book_cooccurrence_top_idx'),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """A completed write, replayed when a client retries with the same Idempotency-Key."""
+    reader = models.ForeignKey(Reader, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    # sha256 of the method, path and body the key was first used with.
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    # zlib-compressed JSON response body.
+    response_body = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['reader', 'key'], name='idempotency_reader_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+
+class WebhookEndpoint(models.Model):
+    """An integration URL that receives a reader's outbox events in batches."""
+    reader = models.ForeignKey(Reader, on_delete=models.CASCADE)
+    url = models.URLField(max_length=500)
+    # Event names to deliver; empty means every event.
+    events = models.JSONField(default=list, blank=True)
+    secret = models.CharField(max_length=200, blank=True)
+    active = models.BooleanField(default=True)
+    # Id of the last OutboxEvent delivered to this endpoint.
+    cursor = models.BigIntegerField(default=0)
+    failures = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['active', 'next_attempt_at'], name='webhook_due_idx'),
+        ]
+
+
+class OutboxEvent(models.Model):
+    reader = models.ForeignKey(Reader, on_delete=models.CASCADE)
+    event = models.CharField(max_length=50)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reader', 'id'], name='outbox_reader_id_idx'),
+            models.Index(fields=['created_at'], name='outbox_created_idx'),
+        ]
+
+
+class Tag(models.Model):
+    """A reader's shelf, with a denormalized count of the items on it."""
+    reader = models.ForeignKey(Reader, on_delete=models.CASCADE)
+    name = models.CharField(max_length=50)
+    item_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['reader', 'name'], name='tag_reader_name_unique'),
+        ]
+
+
+class ItemTag(models.Model):
+    item = models.ForeignKey(TextualItem, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # The unique constraint serves item -> tags; the index serves tag -> items.
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'tag'], name='item_tag_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'item'], name='item_tag_tag_item_idx'),
+        ]
@@ -0,0 +1,109 @@
+from django.db import connection, models
+from django.db.models.functions import Cast, Coalesce, JSONObject
+from django.utils import timezone
+
+from .models import OutboxEvent, ReadingStatus, TextualItem, WebhookEndpoint
+
+ITEM_COMPLETED = 'item.completed'
+ITEM_RATED = 'item.rated'
+ITEM_DNF = 'item.dnf'
+EVENTS = (ITEM_COMPLETED, ITEM_RATED, ITEM_DNF)
+
+
+def item_event_names(item):
+    """Names of the events an unsaved change to ``item`` will publish."""
+    before = getattr(item, '_tracked', None) or {}
+    names = []
+    if item.status != before.get('status'):
+        if item.status == ReadingStatus.COMPLETED:
+            names.append(ITEM_COMPLETED)
+        elif item.status == ReadingStatus.DNF:
+            names.append(ITEM_DNF)
+    if item.rating is not None and item.rating != before.get('rating'):
+        names.append(ITEM_RATED)
+    return names
+
+
+def item_payload(item):
+    return {
+        'id': item.id,
+        'project': item.project_id,
+        'title': item.title,
+        'author': item.author,
+        'isbn': item.isbn,
+        'status': item.status,
+        'rating': None if item.rating is None else str(item.rating),
+        'completion_date': item.completion_date and str(item.completion_date),
+        'dnf_date': item.dnf_date and str(item.dnf_date),
+    }
+
+
+def record_item_events(items):
+    """Write outbox rows for the tracked changes of saved ``items``.
+
+    Call inside the transaction that saves the items. Nothing is written
+    for readers without a webhook endpoint; disabled endpoints still get
+    their events, so re-enabling one delivers what it missed.
+    """
+    pending = []
+    for item in items:
+        names = item_event_names(item)
+        if names:
+            pending.append((item, names))
+    if not pending:
+        return []
+    # One query finds which of the items' projects belong to subscribed readers.
+    subscribed = dict(
+        WebhookEndpoint.objects
+        .filter(reader__readingproject__in={item.project_id for item, _ in pending})
+        .values_list('reader__readingproject', 'reader_id')
+        .distinct()
+    )
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(reader_id=subscribed[item.project_id], event=name, payload=item_payload(item))
+        for item, names in pending if item.project_id in subscribed
+        for name in names
+    ])
+
+
+def record_completions(items, completion_date):
+    """Write ``item.completed`` rows for ``items`` with one INSERT ... SELECT.
+
+    Call before marking ``items`` completed in bulk, inside the same
+    transaction; the payload describes each item as it will be afterwards.
+    """
+    subscribed = WebhookEndpoint.objects.filter(reader_id=models.OuterRef('project__reader_id'))
+    rows = (
+        TextualItem.objects.filter(pk__in=items.values('pk'))
+        .filter(models.Exists(subscribed))
+        .annotate(
+            event_reader=models.F('project__reader_id'),
+            event_name=models.Value(ITEM_COMPLETED),
+            event_payload=JSONObject(
+                id='id',
+                project='project_id',
+                title='title',
+                author='author',
+                isbn='isbn',
+                status=models.Value(ReadingStatus.COMPLETED),
+                # Ratings are halves; match str(Decimal) of the one-place field.
+                rating=models.Case(models.When(rating__isnull=False, then=models.Func(
+                    models.Value('%.1f'), 'rating', function='printf', output_field=models.CharField(),
+                ))),
+                completion_date=Cast(
+                    Coalesce('completion_date', models.Value(completion_date)), models.CharField(),
+                ),
+                dnf_date=Cast('dnf_date', models.CharField()),
+            ),
+            event_created=models.Value(timezone.now(), output_field=models.DateTimeField()),
+        )
+        .order_by('pk')
+        .values_list('event_reader', 'event_name', 'event_payload', 'event_created')
+    )
+    select, params = rows.query.get_compiler(using=rows.db).as_sql()
+    meta = OutboxEvent._meta
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(meta.get_field(name).column) for name in ('reader', 'event', 'payload', 'created_at'))
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {quote(meta.db_table)} ({columns}) {select}", params)
+        return cursor.rowcount
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.exceptions import NotAuthenticated
+
+from .caching import reader_generation
+from .models import Reader
+
+SESSION_KEY = '_reader'
+
+
+def resolve_reader_id(request):
+    """Return the id of the Reader making this request.
+
+    Authenticated users get their own Reader, created on first use; its id is
+    cached in the session, keyed by user and reader generation, so later
+    requests skip the lookup. Anonymous requests share the
+    ``ANONYMOUS_READER_NAME`` reader when that setting is enabled.
+    """
+    reader_id = getattr(request, '_reader_id', None)
+    if reader_id is not None:
+        return reader_id
+
+    user = request.user
+    if not user.is_authenticated:
+        # The shared reader is cached per process, so anonymous requests
+        # never need a session row.
+        reader_id = anonymous_reader_id(create=True)
+        if reader_id is None:
+            raise NotAuthenticated()
+        request._reader_id = reader_id
+        return reader_id
+
+    # Deleting a reader bumps its user's generation, so a cached id is only
+    # trusted while the generation it was stored under is still current.
+    generation = reader_generation(user.pk)
+    session = getattr(request, 'session', None)
+    cached = session.get(SESSION_KEY) if session is not None else None
+    if cached and cached[0] == user.pk and cached[2:] == [generation]:
+        reader_id = cached[1]
+    else:
+        reader, _ = Reader.objects.get_or_create(user=user, defaults={'name': user.get_username()})
+        reader_id = reader.id
+        if session is not None:
+            session[SESSION_KEY] = [user.pk, reader_id, generation]
+
+    request._reader_id = reader_id
+    return reader_id
+
+
+# ANONYMOUS_READER_NAME -> reader id, filled on first use in this process.
+_anonymous_reader_ids = {}
+
+
+def anonymous_reader_id(create=False):
+    """Id of the reader shared by anonymous requests, or None if there is none."""
+    anonymous_name = getattr(settings, 'ANONYMOUS_READER_NAME', None)
+    if not anonymous_name:
+        return None
+    reader_id = _anonymous_reader_ids.get(anonymous_name)
+    if reader_id is not None:
+        return reader_id
+    # Read from the primary, where a missing reader would be created; a
+    # lagging replica would otherwise create a new one on every request.
+    readers = Reader.objects.db_manager(DEFAULT_DB_ALIAS)
+    reader = readers.filter(name=anonymous_name, user__isnull=True).order_by('id').first()
+    if reader is None and create:
+        reader = readers.create(name=anonymous_name)
+    if reader is None:
+        return None
+    # Only a committed reader is cached; a rolled back one must be looked up again.
+    transaction.on_commit(lambda: _anonymous_reader_ids.setdefault(anonymous_name, reader.id), using=DEFAULT_DB_ALIAS)
+    return reader.id
+
+
+def forget_anonymous_reader():
+    """Drop this process's cached anonymous reader id, e.g. after deleting that reader."""
+    _anonymous_reader_ids.clear()
+
+
+class ReaderScopedMixin:
+    @property
+    def reader_id(self):
+        return resolve_reader_id(self.request)
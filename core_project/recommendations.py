@@ -0,0 +1,236 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.db import models, transaction
+
+from .isbn import clean as clean_isbn, to_isbn13
+from .models import BookCoOccurrence, BookIndex, IndexKind, LibraryIndexEntry, TextualItem
+
+
+def normalize_text(value):
+    return re.sub(r'\s+', ' ', (value or '').strip().lower())
+
+
+def author_key(author):
+    return normalize_text(author)
+
+
+def book_key(isbn, title, author):
+    isbn = to_isbn13(isbn) or clean_isbn(isbn)
+    if isbn:
+        return f"isbn:{isbn}"
+    return f"title:{normalize_text(title)}|{author_key(author)}"
+
+
+def item_keys(item):
+    return book_key(item.isbn, item.title, item.author), author_key(item.author)
+
+
+def max_project_books():
+    # Co-occurrence is quadratic in project size, so pairs are only counted
+    # among a sample of this many books per project (see book_rank).
+    return getattr(settings, 'RECOMMENDATION_MAX_PROJECT_BOOKS', 50)
+
+
+def book_rank(key):
+    """A stable pseudo-random rank for ``key``; each project samples its lowest-ranked books."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=4).digest(), 'big') >> 1
+
+
+def _entry(kind, key, project_id, count=0):
+    rank = book_rank(key) if kind == IndexKind.BOOK else 0
+    return LibraryIndexEntry(kind=kind, key=key, project_id=project_id, count=count, rank=rank)
+
+
+def _bump_entry(kind, key, project_id, delta):
+    """Adjust an index entry and return its new count."""
+    if delta > 0:
+        LibraryIndexEntry.objects.bulk_create([_entry(kind, key, project_id)], ignore_conflicts=True)
+    entries = LibraryIndexEntry.objects.filter(kind=kind, key=key, project_id=project_id)
+    entries.update(count=models.F('count') + delta)
+    count = entries.values_list('count', flat=True).first() or 0
+    if count <= 0:
+        entries.delete()
+    return count
+
+
+def _sample(project_id, size):
+    """The project's ``size`` lowest-ranked books; pairs exist only within the first max_project_books()."""
+    return list(
+        LibraryIndexEntry.objects
+        .filter(project_id=project_id, kind=IndexKind.BOOK)
+        .order_by('rank', 'key')
+        .values_list('key', flat=True)[:size]
+    )
+
+
+def _bump_pairs(key, others, delta):
+    if not others:
+        return
+    if delta > 0:
+        BookCoOccurrence.objects.bulk_create(
+            [BookCoOccurrence(book=key, other=other) for other in others]
+            + [BookCoOccurrence(book=other, other=key) for other in others],
+            ignore_conflicts=True,
+        )
+    pairs = BookCoOccurrence.objects.filter(
+        models.Q(book=key, other__in=others) | models.Q(book__in=others, other=key)
+    )
+    pairs.update(count=models.F('count') + delta)
+    if delta < 0:
+        pairs.filter(count__lte=0).delete()
+
+
+def index_item(item, delta=1):
+    """Add (``delta=1``) or remove (``delta=-1``) one item from the recommendation index."""
+    key, author = item_keys(item)
+    with transaction.atomic():
+        _bump_entry(IndexKind.AUTHOR, author, item.project_id, delta)
+        count = _bump_entry(IndexKind.BOOK, key, item.project_id, delta)
+        # Only the first copy of a book in a project, or the removal of its
+        # last copy, changes which projects and pairs contain it.
+        if (delta > 0 and count != 1) or (delta < 0 and count > 0):
+            return
+
+        if delta > 0:
+            BookIndex.objects.bulk_create(
+                [BookIndex(key=key, title=item.title, author=item.author, author_key=author)],
+                ignore_conflicts=True,
+            )
+        BookIndex.objects.filter(key=key).update(project_count=models.F('project_count') + delta)
+
+        # A book joining or leaving a project's sample moves at most one other
+        # book across its edge, so the pairs always match what rebuild() makes.
+        limit = max_project_books()
+        if delta > 0:
+            sample = _sample(item.project_id, limit + 1)
+            if key not in sample[:limit]:
+                return
+            others = [other for other in sample[:limit] if other != key]
+            _bump_pairs(key, others, 1)
+            if len(sample) > limit:
+                _bump_pairs(sample[limit], others, -1)
+        else:
+            sample = _sample(item.project_id, limit)
+            if len(sample) == limit and (book_rank(key), key) > (book_rank(sample[-1]), sample[-1]):
+                return
+            others = sample[:limit - 1]
+            _bump_pairs(key, others, -1)
+            if len(sample) == limit:
+                _bump_pairs(sample[-1], others, 1)
+
+
+def item_added(item):
+    index_item(item, 1)
+
+
+def item_removed(item):
+    index_item(item, -1)
+
+
+def item_changed(old, new):
+    if item_keys(old) != item_keys(new) or old.project_id != new.project_id:
+        item_removed(old)
+        item_added(new)
+
+
+def _project_pairs(project_id):
+    keys = _sample(project_id, max_project_books())
+    return BookCoOccurrence.objects.filter(book__in=keys, other__in=keys)
+
+
+def project_removed(project_id):
+    """Drop a whole project from the index with set-based statements."""
+    books = LibraryIndexEntry.objects.filter(project_id=project_id, kind=IndexKind.BOOK).values('key')
+    with transaction.atomic():
+        pairs = _project_pairs(project_id)
+        pairs.update(count=models.F('count') - 1)
+        pairs.filter(count__lte=0).delete()
+        BookIndex.objects.filter(key__in=books).update(project_count=models.F('project_count') - 1)
+        LibraryIndexEntry.objects.filter(project_id=project_id).delete()
+
+
+def project_copied(source_id, project_id):
+    """Index ``project_id`` as a copy of ``source_id`` with set-based statements."""
+    books = LibraryIndexEntry.objects.filter(project_id=source_id, kind=IndexKind.BOOK).values('key')
+    with transaction.atomic():
+        LibraryIndexEntry.objects.bulk_create([
+            LibraryIndexEntry(kind=kind, key=key, project_id=project_id, count=count, rank=rank)
+            for kind, key, count, rank in
+            LibraryIndexEntry.objects.filter(project_id=source_id).values_list('kind', 'key', 'count', 'rank')
+        ], ignore_conflicts=True)
+        _project_pairs(source_id).update(count=models.F('count') + 1)
+        BookIndex.objects.filter(key__in=books).update(project_count=models.F('project_count') + 1)
+
+
+def project_added(project_id, items, batch_size=1000):
+    """Index a new project holding ``items`` with set-based statements."""
+    counts, books = {}, {}
+    for item in items:
+        key, author = item_keys(item)
+        for entry in ((IndexKind.BOOK, key), (IndexKind.AUTHOR, author)):
+            counts[entry] = counts.get(entry, 0) + 1
+        books.setdefault(key, BookIndex(key=key, title=item.title, author=item.author, author_key=author))
+    keys = LibraryIndexEntry.objects.filter(project_id=project_id, kind=IndexKind.BOOK).values('key')
+    sample = sorted(books, key=lambda key: (book_rank(key), key))[:max_project_books()]
+    with transaction.atomic():
+        LibraryIndexEntry.objects.bulk_create([
+            _entry(kind, key, project_id, count) for (kind, key), count in counts.items()
+        ], batch_size=batch_size)
+        BookIndex.objects.bulk_create(books.values(), batch_size=batch_size, ignore_conflicts=True)
+        BookIndex.objects.filter(key__in=keys).update(project_count=models.F('project_count') + 1)
+        BookCoOccurrence.objects.bulk_create(
+            [BookCoOccurrence(book=book, other=other) for book in sample for other in sample if book != other],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        _project_pairs(project_id).update(count=models.F('count') + 1)
+
+
+def rebuild(batch_size=1000):
+    """Rebuild the whole index from TextualItem, e.g. after bulk loads that bypass the hooks."""
+    with transaction.atomic():
+        BookCoOccurrence.objects.all().delete()
+        BookIndex.objects.all().delete()
+        LibraryIndexEntry.objects.all().delete()
+        items = TextualItem.objects.order_by('project_id', 'pk').only('isbn', 'title', 'author', 'project_id')
+        project_id, project_items = None, []
+        for item in items.iterator(chunk_size=batch_size):
+            if item.project_id != project_id and project_items:
+                project_added(project_id, project_items, batch_size)
+                project_items = []
+            project_id = item.project_id
+            project_items.append(item)
+        if project_items:
+            project_added(project_id, project_items, batch_size)
+
+
+def also_read(key, limit=10):
+    pairs = list(
+        BookCoOccurrence.objects.filter(book=key).order_by('-count').values_list('other', 'count')[:limit]
+    )
+    books = BookIndex.objects.in_bulk([other for other, _ in pairs], field_name='key')
+    return [_book(books[other], count) for other, count in pairs if other in books]
+
+
+def more_by_author(key, author, limit=10):
+    books = (
+        BookIndex.objects
+        .filter(author_key=author, project_count__gt=0)
+        .exclude(key=key)
+        .order_by('-project_count')[:limit]
+    )
+    return [_book(book, book.project_count) for book in books]
+
+
+def _book(book, count):
+    return {'key': book.key, 'title': book.title, 'author': book.author, 'count': count}
+
+
+def recommendations_for(item, limit=10):
+    key, author = item_keys(item)
+    return {
+        'also_read': also_read(key, limit),
+        'more_by_author': more_by_author(key, author, limit),
+    }
@@ -1,22 +1,144 @@
 from rest_framework import serializers
-from .models import Reader, ReadingProject, TextualItem
+from .archive import unpack_items
+from .identity import cached
+from .models import ArchivedProject, Job, Reader, ReadingProject, Tag, TextualItem, WebhookEndpoint
+from .outbox import EVENTS
+
+class VersionedSerializerMixin:
+    """Save updates conditionally when the view passes ``expected_version`` in the context."""
+
+    def update(self, instance, validated_data):
+        expected_version = self.context.get('expected_version')
+        if expected_version is None:
+            return super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(expected_version=expected_version)
+        return instance
+
+class ProjectField(serializers.PrimaryKeyRelatedField):
+    """Resolves a project id from the request's identity map before querying."""
+
+    def to_internal_value(self, data):
+        project = cached(ReadingProject, data)
+        if project is not None and project.deleted_at is None:
+            return project
+        return super().to_internal_value(data)
+
+class TextualItemSerializer(VersionedSerializerMixin, serializers.ModelSerializer):
+    project = ProjectField(queryset=ReadingProject.objects.all())
+    # Declared so the generated column serializes like the decimal it is.
+    progress_percent = serializers.DecimalField(max_digits=5, decimal_places=1, read_only=True)
 
-class TextualItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = TextualItem
-        fields = ["title", "isbn", "author", "project", "progress_percent", "status", "total_pages"]
+        fields = ["title", "isbn", "author", "project", "progress_percent", "status", "total_pages", "version"]
+        read_only_fields = ["version"]
+
+class LibraryProjectSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReadingProject
+        fields = ["id", "name"]
+
+class LibraryItemSerializer(serializers.ModelSerializer):
+    """Read-only item with its project, for listings that span projects."""
+    project = LibraryProjectSerializer(read_only=True)
+    progress_percent = serializers.DecimalField(max_digits=5, decimal_places=1, read_only=True)
 
-class ReadingProjectSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TextualItem
+        fields = [
+            "id", "title", "isbn", "author", "project", "status", "current_page", "total_pages",
+            "progress_percent", "rating", "start_date", "completion_date", "version",
+        ]
+        read_only_fields = fields
+
+class ReadingProjectSerializer(VersionedSerializerMixin, serializers.ModelSerializer):
     items = TextualItemSerializer(many=True, read_only=True)
     
     class Meta:
         model = ReadingProject
-        fields = ["name", "created_at", 'items']
-        read_only_fields = ["reader"]
+        fields = ["name", "created_at", 'items', "version"]
+        read_only_fields = ["reader", "version"]
 
 class ReaderSerializer(serializers.ModelSerializer):
     projects = ReadingProjectSerializer(many=True, read_only=True)
     
     class Meta:
         model = Reader
-        fields = ["name", "active_project", "projects"]
\ No newline at end of file
+        fields = ["name", "active_project", "projects"]
+
+class ProgressUpdateSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    current_page = serializers.IntegerField(min_value=0)
+    total_pages = serializers.IntegerField(min_value=0)
+    version = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        # A total of 0 means the length is not known yet.
+        if 0 < data['total_pages'] < data['current_page']:
+            raise serializers.ValidationError({'current_page': ["Must not be greater than total_pages."]})
+        return data
+
+class ProjectCloneSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=200, required=False)
+    reset_progress = serializers.BooleanField(default=False)
+
+class ItemProgressSerializer(serializers.ModelSerializer):
+    progress_percent = serializers.DecimalField(max_digits=5, decimal_places=1, read_only=True)
+
+    class Meta:
+        model = TextualItem
+        fields = ["id", *TextualItem.PROGRESS_FIELDS, "progress_percent", "version"]
+        read_only_fields = fields
+
+class JobSerializer(serializers.ModelSerializer):
+    last_error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ["id", "name", "status", "attempts", "max_attempts", "run_after", "last_error", "result", "created_at", "updated_at"]
+        read_only_fields = fields
+
+    def get_last_error(self, job):
+        # The full traceback stays in the database and logs; clients get its summary line.
+        lines = job.last_error.strip().splitlines()
+        return lines[-1] if lines else ''
+
+class ArchivedProjectSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedProject
+        fields = ["id", "original_id", "name", "created_at", "archived_at", "item_count"]
+        read_only_fields = fields
+
+class ArchivedProjectDetailSerializer(ArchivedProjectSerializer):
+    items = serializers.SerializerMethodField()
+
+    class Meta(ArchivedProjectSerializer.Meta):
+        fields = ArchivedProjectSerializer.Meta.fields + ["items"]
+        read_only_fields = fields
+
+    def get_items(self, archived):
+        return unpack_items(archived.items_blob)
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    events = serializers.ListField(child=serializers.ChoiceField(choices=EVENTS), required=False)
+
+    class Meta:
+        model = WebhookEndpoint
+        fields = ["id", "url", "events", "secret", "active", "failures", "last_error", "next_attempt_at", "created_at"]
+        read_only_fields = ["failures", "last_error", "next_attempt_at", "created_at"]
+        extra_kwargs = {"secret": {"write_only": True}}
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ["id", "name", "item_count", "created_at"]
+        read_only_fields = fields
+
+class ItemTagsSerializer(serializers.Serializer):
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=Tag._meta.get_field('name').max_length),
+        allow_empty=False,
+        max_length=50,
+    )
@@ -0,0 +1,29 @@
+from django.db.models import Avg, Count, Q, Sum
+
+from .models import ReadingStatus
+
+
+def summarize(projects):
+    """Summaries for every project in a queryset, computed in one GROUP BY query.
+
+    Returns ``{project_id: summary}`` including projects without items.
+    """
+    statuses = {f'status_{i}': value for i, value in enumerate(ReadingStatus.values)}
+    rows = projects.order_by().values('pk').annotate(
+        item_count=Count('textualitem'),
+        average_rating=Avg('textualitem__rating'),
+        pages_read=Sum('textualitem__current_page', default=0),
+        total_pages=Sum('textualitem__total_pages', default=0),
+        **{alias: Count('textualitem', filter=Q(textualitem__status=value)) for alias, value in statuses.items()},
+    )
+    return {
+        row['pk']: {
+            'id': row['pk'],
+            'item_count': row['item_count'],
+            'status_counts': {value: row[alias] for alias, value in statuses.items()},
+            'average_rating': None if row['average_rating'] is None else round(float(row['average_rating']), 2),
+            'pages_read': row['pages_read'],
+            'total_pages': row['total_pages'],
+        }
+        for row in rows
+    }
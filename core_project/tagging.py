@@ -0,0 +1,63 @@
+from django.db import models, transaction
+
+from .models import ItemTag, Tag, TextualItem
+
+
+def normalize(name):
+    return ' '.join(name.split()).lower()
+
+
+def normalize_all(names):
+    return list(dict.fromkeys(filter(None, map(normalize, names))))
+
+
+def item_tags(item):
+    return list(item.tags.order_by('name').values_list('name', flat=True))
+
+
+def add_tags(item, names, reader_id):
+    """Tag ``item``, creating the reader's tags as needed; returns the names newly added."""
+    names = normalize_all(names)
+    with transaction.atomic():
+        # Serializes concurrent tagging of the same item so counts are bumped once.
+        TextualItem.objects.select_for_update().filter(pk=item.pk).exists()
+        Tag.objects.bulk_create([Tag(reader_id=reader_id, name=name) for name in names], ignore_conflicts=True)
+        tags = dict(Tag.objects.filter(reader_id=reader_id, name__in=names).values_list('pk', 'name'))
+        linked = set(ItemTag.objects.filter(item=item, tag_id__in=tags).values_list('tag_id', flat=True))
+        added = [tag_id for tag_id in tags if tag_id not in linked]
+        ItemTag.objects.bulk_create([ItemTag(item=item, tag_id=tag_id) for tag_id in added])
+        Tag.objects.filter(pk__in=added).update(item_count=models.F('item_count') + 1)
+    return sorted(tags[tag_id] for tag_id in added)
+
+
+def remove_tags(item, names, reader_id):
+    """Untag ``item``; returns the names actually removed."""
+    names = normalize_all(names)
+    with transaction.atomic():
+        TextualItem.objects.select_for_update().filter(pk=item.pk).exists()
+        tags = dict(
+            ItemTag.objects.filter(item=item, tag__reader_id=reader_id, tag__name__in=names)
+            .values_list('tag_id', 'tag__name')
+        )
+        ItemTag.objects.filter(item=item, tag_id__in=tags).delete()
+        Tag.objects.filter(pk__in=tags).update(item_count=models.F('item_count') - 1)
+    return sorted(tags.values())
+
+
+def release_items(items):
+    """Untag every item in the ``items`` queryset ahead of its deletion.
+
+    Counts drop by the number of links removed per tag, one UPDATE per tag
+    rather than per item.
+    """
+    with transaction.atomic():
+        links = ItemTag.objects.filter(item__in=items)
+        per_tag = links.values('tag_id').annotate(n=models.Count('pk')).order_by()
+        for row in per_tag:
+            Tag.objects.filter(pk=row['tag_id']).update(item_count=models.F('item_count') - row['n'])
+        links.delete()
+
+
+def tagged_item_ids(reader_id, name):
+    """Subquery of the ids of a reader's items carrying tag ``name``, read from the tag -> items index."""
+    return ItemTag.objects.filter(tag__reader_id=reader_id, tag__name=normalize(name)).values('item_id')
@@ -0,0 +1,12 @@
+from .deletion import purge_project, purge_reader
+from .jobs import job
+
+
+@job('delete_project')
+def delete_project(project_id):
+    return {'deleted': purge_project(project_id)}
+
+
+@job('delete_reader')
+def delete_reader(reader_id):
+    return {'deleted': purge_reader(reader_id)}
@@ -1,11 +1,45 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest.mock import patch
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
 from decimal import Decimal
-from datetime import date
-from .models import Reader, ReadingProject, TextualItem, ReadingStatus
-from .serializers import ReaderSerializer, ReadingProjectSerializer, TextualItemSerializer
+from datetime import date, timedelta
+from django.utils import timezone
+from . import events, jobs
+from .events import ProgressHub, event_stream
+from .readers import SESSION_KEY, anonymous_reader_id, forget_anonymous_reader
+from .db_routers import ReadReplicaRouter, current_state, replica_reads, routing_scope
+from .middleware import ReplicaRoutingMiddleware
+from .admin import EstimatedCountPaginator
+from .caching import activity_generation_key
+from .cloning import clone_project
+from .archive import archivable_projects, archive_project, restore_project, unpack_items
+from . import backups, outbox, recommendations, webhooks
+from .loadtest import LoadTest, format_report, parse_mix, percentile
+from .identity import IdentityMappedForeignKey, identity_scope, remember
+from .isbn import to_isbn13
+from .tagging import add_tags, remove_tags
+from .item_filters import FILTERS, ORDERINGS, filter_items
+from .forecasting import compute_forecasts, reader_forecasts
+from .deletion import delete_items_in_chunks, purge_project, soft_delete_project, soft_delete_reader
+from .models import ArchivedProject, BookCoOccurrence, BookIndex, IdempotencyKey, ItemTag, Job, LibraryIndexEntry, JobStatus, OutboxEvent, Reader, ReadingProject, Tag, TextualItem, ReadingStatus, VersionConflict, WebhookEndpoint
+from .serializers import JobSerializer, ReaderSerializer, ReadingProjectSerializer, TextualItemSerializer
 
 
 # ========== READER MODEL TESTS ==========
@@ -864,18 +898,21 @@ class ReadingProjectViewSetTests(APITestCase):
         self.assertIsInstance(response.data, list)
         self.assertEqual(len(response.data), 2)
 
-    def test_get_projects_with_reader_filter(self):
-        """Test GET with ?reader=Name filters correctly"""
+    def test_get_projects_scoped_to_requesting_reader(self):
+        """Test GET only returns the requesting reader's projects"""
         other_reader = Reader.objects.create(name="Other User")
         ReadingProject.objects.create(name="Other Project", reader=other_reader)
 
-        response = self.client.get('/api/reading-projects/?reader=Test User')
+        response = self.client.get('/api/reading-projects/')
         self.assertEqual(len(response.data), 2)
 
-    def test_get_projects_with_nonexistent_reader(self):
-        """Test filtering with non-existent reader name returns empty list"""
-        response = self.client.get('/api/reading-projects/?reader=Nonexistent')
-        self.assertEqual(len(response.data), 0)
+    def test_reader_name_param_cannot_reach_other_readers(self):
+        """Test ?reader=Name no longer selects another reader's projects"""
+        other_reader = Reader.objects.create(name="Other User")
+        ReadingProject.objects.create(name="Other Project", reader=other_reader)
+
+        response = self.client.get('/api/reading-projects/?reader=Other User')
+        self.assertEqual(len(response.data), 2)
 
     def test_post_creates_project(self):
         """Test POST creating project with valid data returns 201"""
@@ -919,10 +956,13 @@ class ReadingProjectViewSetTests(APITestCase):
         self.assertEqual(self.project1.name, 'Patched Name')
 
     def test_delete_project(self):
-        """Test DELETE returns 204 and removes project"""
+        """Test DELETE returns 202 and hides the project straight away"""
         response = self.client.delete(f'/api/reading-projects/{self.project1.id}/')
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['name'], 'delete_project')
         self.assertEqual(ReadingProject.objects.count(), 1)
+        jobs.run_pending()
+        self.assertEqual(ReadingProject.all_objects.count(), 1)
 
     def test_get_project_includes_nested_items(self):
         """Test GET returns project with nested items"""
@@ -1101,7 +1141,7 @@ class TextualItemSerializerTests(TestCase):
             author="Test Author",
             project=self.project,
             total_pages=300,
-            progress_percent=Decimal('50.0'),
+            current_page=150,
             status=ReadingStatus.IN_PROGRESS
         )
 
@@ -1122,7 +1162,7 @@ class TextualItemSerializerTests(TestCase):
         serializer = TextualItemSerializer(self.item)
         data = serializer.data
 
-        expected_fields = {'title', 'isbn', 'author', 'project', 'progress_percent', 'status', 'total_pages'}
+        expected_fields = {'title', 'isbn', 'author', 'project', 'progress_percent', 'status', 'total_pages', 'version'}
         self.assertEqual(set(data.keys()), expected_fields)
 
     def test_deserializing_valid_data(self):
@@ -1278,3 +1318,2464 @@ class IntegrationTests(TestCase):
 
         with self.assertRaises(ReadingProject.DoesNotExist):
             ReadingProject.objects.get(id=project_id)
+
+
+def project_selects(queries):
+    return [q for q in queries if q['sql'].startswith('SELECT') and 'FROM "core_project_readingproject"' in q['sql']]
+
+
+class IntegrationQueryCountTests(APITestCase):
+    """Test the integration workflows do not load the same rows repeatedly"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="John Doe")
+        self.project = self.reader.add_project("2024 Reading")
+        self.items = [
+            self.project.add_item(title=f"Book {i}", isbn="", author="Author") for i in range(3)
+        ]
+
+    def test_workflow_query_counts(self):
+        """Test each step of the complete workflow costs only its writes"""
+        reader = Reader.objects.create(name="Jane Doe")
+        # Insert the project, then save the reader's active project.
+        with self.assertNumQueries(2):
+            project = reader.add_project("2025 Reading")
+        # The reader's own project proves it has projects; no COUNT.
+        with self.assertNumQueries(1):
+            reader.set_default_project(project)
+        item = project.add_item(title="The Great Gatsby", isbn="9780743273565", author="F. Scott Fitzgerald")
+        with self.assertNumQueries(1):
+            item.update_progress(50, 180)
+        self.assertEqual(item.status, ReadingStatus.IN_PROGRESS)
+
+    def test_item_updates_share_project_in_scope(self):
+        """Test freshly loaded items of one project load it once per scope"""
+        items = list(TextualItem.objects.filter(project=self.project))
+        with CaptureQueriesContext(connection) as unscoped:
+            for item in items:
+                item.update_start_date(date(2024, 1, 1))
+        self.assertEqual(len(project_selects(unscoped)), 3)
+
+        items = list(TextualItem.objects.filter(project=self.project))
+        with identity_scope(), CaptureQueriesContext(connection) as scoped:
+            for item in items:
+                item.update_start_date(date(2024, 1, 2))
+        self.assertEqual(len(project_selects(scoped)), 1)
+        self.assertEqual(len(scoped), len(unscoped) - 2)
+
+    def test_delete_item_does_not_load_project(self):
+        """Test delete_item checks membership by id"""
+        project = ReadingProject.objects.get(pk=self.project.pk)
+        item = TextualItem.objects.get(pk=self.items[0].pk)
+        with CaptureQueriesContext(connection) as queries:
+            project.delete_item(item)
+        self.assertEqual(project_selects(queries), [])
+        with self.assertRaises(ValueError):
+            ReadingProject.objects.create(name="Other", reader=self.reader).delete_item(self.items[1])
+
+    def test_set_default_project_without_projects_creates_one(self):
+        """Test the default project is still created for a reader with none"""
+        reader = Reader.objects.create(name="New")
+        reader.set_default_project()
+        self.assertEqual(reader.active_project.name, "Default Reading Project")
+
+    def test_patch_resolves_project_from_loaded_item(self):
+        """Test PATCH reuses the item's project instead of querying it again"""
+        self.client.get('/api/textual-items/')
+        project = ReadingProject.objects.create(name="Mine", reader_id=anonymous_reader_id())
+        item = TextualItem.objects.create(title="Book", author="Author", project=project)
+        # Anonymous reader lookup, item joined with its project, and the update.
+        with self.assertNumQueries(3):
+            response = self.client.patch(
+                f'/api/textual-items/{item.id}/', {'project': project.id, 'total_pages': 100}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+# ========== PROGRESS STREAM TESTS ==========
+
+class ProgressHubTests(SimpleTestCase):
+    """Test the in-process progress pub/sub hub"""
+
+    async def test_publish_reaches_only_matching_reader(self):
+        """Test events are delivered to subscribers of the item's reader only"""
+        hub = ProgressHub(queue_size=5)
+        mine = hub.subscribe(1)
+        other = hub.subscribe(2)
+
+        self.assertEqual(hub.publish(1, {'id': 10}), 1)
+        self.assertEqual(await mine.get(1), {'id': 10})
+        with self.assertRaises(asyncio.TimeoutError):
+            await other.get(0.01)
+
+    async def test_full_queue_drops_oldest_event(self):
+        """Test a slow subscriber loses the oldest events instead of blocking"""
+        hub = ProgressHub(queue_size=2)
+        subscription = hub.subscribe(1)
+        for i in range(4):
+            hub.publish(1, {'id': i})
+        await asyncio.sleep(0)
+
+        self.assertEqual(subscription.take_dropped(), 2)
+        self.assertEqual(await subscription.get(1), {'id': 2})
+        self.assertEqual(await subscription.get(1), {'id': 3})
+
+    async def test_subscriber_closed_after_too_many_drops(self):
+        """Test a subscriber that keeps overflowing is disconnected"""
+        hub = ProgressHub(queue_size=1, max_dropped=2)
+        subscription = hub.subscribe(1)
+        for i in range(5):
+            hub.publish(1, {'id': i})
+        await asyncio.sleep(0)
+
+        self.assertTrue(subscription.closed)
+        self.assertEqual(hub.subscriber_count(1), 0)
+
+    async def test_stream_emits_heartbeat_and_overflow(self):
+        """Test the SSE stream sends heartbeats when idle and reports drops"""
+        hub = ProgressHub(queue_size=1)
+        subscription = hub.subscribe(1)
+        stream = event_stream(subscription, heartbeat=0.01)
+
+        self.assertTrue((await anext(stream)).startswith("retry:"))
+        self.assertEqual(await anext(stream), ": heartbeat\n\n")
+
+        hub.publish(1, {'id': 1})
+        hub.publish(1, {'id': 2})
+        await asyncio.sleep(0)
+        self.assertIn("event: overflow", await anext(stream))
+        self.assertIn('"id": 2', await anext(stream))
+
+        await stream.aclose()
+        self.assertEqual(hub.subscriber_count(), 0)
+
+
+class ProgressPublishTests(APITestCase):
+    """Test writes publish item changes to the hub"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="Project", reader=self.reader)
+        self.item = TextualItem.objects.create(title="Book", isbn="123", author="Author", project=self.project)
+        # Commit callbacks run here, which caches the anonymous reader.
+        self.addCleanup(forget_anonymous_reader)
+
+    def test_update_progress_publishes_after_commit(self):
+        """Test update_progress publishes the new state on commit"""
+        with patch.object(events.hub, 'publish') as publish, \
+                patch.object(events.hub, 'subscriber_count', return_value=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.item.update_progress(50, 100)
+                publish.assert_not_called()
+
+        reader_id, event = publish.call_args.args
+        self.assertEqual(reader_id, self.reader.id)
+        self.assertEqual(event['status'], ReadingStatus.IN_PROGRESS)
+        self.assertEqual(event['progress_percent'], '50.0')
+
+    def test_viewset_update_publishes(self):
+        """Test PATCH on an item publishes the change"""
+        with patch.object(events.hub, 'publish') as publish, \
+                patch.object(events.hub, 'subscriber_count', return_value=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(f'/api/textual-items/{self.item.id}/', {'status': ReadingStatus.ON_HOLD}, format='json')
+
+        self.assertEqual(publish.call_args.args[1]['status'], ReadingStatus.ON_HOLD)
+
+    @override_settings(ANONYMOUS_READER_NAME=None)
+    def test_stream_requires_reader(self):
+        """Test the stream endpoint rejects requests without a reader"""
+        response = self.client.get('/api/events/progress/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+# ========== READER RESOLUTION TESTS ==========
+
+class ReaderResolutionTests(APITestCase):
+    """Test readers are resolved from the authenticated user"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="secret")
+        self.anonymous_reader = Reader.objects.create(name="Test User")
+        ReadingProject.objects.create(name="Shared", reader=self.anonymous_reader)
+
+    def test_authenticated_user_gets_own_reader(self):
+        """Test an authenticated POST creates the project for the user's reader"""
+        self.client.force_login(self.user)
+        response = self.client.post('/api/reading-projects/', {'name': 'Mine'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        project = ReadingProject.objects.get(name='Mine')
+        self.assertEqual(project.reader.user, self.user)
+        self.assertEqual(project.reader.name, "alice")
+
+    def test_authenticated_user_only_sees_own_projects(self):
+        """Test the anonymous reader's projects are hidden from a logged in user"""
+        self.client.force_login(self.user)
+        response = self.client.get('/api/reading-projects/')
+        self.assertEqual(len(response.data), 0)
+
+    def test_reader_id_cached_in_session(self):
+        """Test later requests resolve the reader without querying Reader"""
+        self.client.force_login(self.user)
+        self.client.get('/api/reading-projects/')
+        reader_id = Reader.objects.get(user=self.user).id
+        self.assertEqual(self.client.session[SESSION_KEY][:2], [self.user.pk, reader_id])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/reading-projects/')
+        self.assertFalse(any('"core_project_reader"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_session_cache_is_keyed_by_user(self):
+        """Test logging in after an anonymous request does not reuse its reader"""
+        self.client.get('/api/reading-projects/')
+        self.client.force_login(self.user)
+        self.client.post('/api/reading-projects/', {'name': 'Mine'}, format='json')
+        self.assertEqual(ReadingProject.objects.get(name='Mine').reader.user, self.user)
+
+    def test_deleted_reader_is_not_reused_from_session(self):
+        """Test a purged reader cached in the session is replaced by a fresh one"""
+        self.client.force_login(self.user)
+        self.client.get('/api/reading-projects/')
+        reader = Reader.objects.get(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_reader(reader)
+        jobs.run_pending()
+        self.assertFalse(Reader.all_objects.filter(pk=reader.pk).exists())
+
+        response = self.client.post('/api/reading-projects/', {'name': 'Mine'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        project = ReadingProject.objects.get(name='Mine')
+        self.assertEqual(project.reader.user, self.user)
+        self.assertNotEqual(project.reader_id, reader.pk)
+
+    def test_evicted_generation_retires_cached_reader(self):
+        """Test a session cached under an evicted generation looks the reader up again"""
+        self.client.force_login(self.user)
+        self.client.get('/api/reading-projects/')
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/reading-projects/')
+        self.assertTrue(any('"core_project_reader"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_anonymous_reader_cached_per_process(self):
+        """Test anonymous requests write no session and reuse the committed reader id"""
+        self.addCleanup(forget_anonymous_reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get('/api/reading-projects/')
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/reading-projects/')
+        self.assertEqual(len(response.data), 1)
+        self.assertFalse(any('"core_project_reader"' in q['sql'] or '"django_session"' in q['sql'] for q in ctx.captured_queries))
+
+    @override_settings(ANONYMOUS_READER_NAME=None)
+    def test_anonymous_rejected_without_shared_reader(self):
+        """Test anonymous requests are rejected when no shared reader is configured"""
+        response = self.client.get('/api/reading-projects/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cannot_add_item_to_other_readers_project(self):
+        """Test POSTing an item into another reader's project is rejected"""
+        self.client.force_login(self.user)
+        project = ReadingProject.objects.first()
+        data = {'title': 'Book', 'isbn': '1', 'author': 'A', 'project': project.id}
+        response = self.client.post('/api/textual-items/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ========== READ REPLICA ROUTING TESTS ==========
+
+@override_settings(USE_READ_REPLICA=True)
+class ReadReplicaRouterTests(SimpleTestCase):
+    """Test safe reads are routed to the replica"""
+
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+
+    def test_reads_stay_on_primary_by_default(self):
+        """Test reads outside replica_reads() use the primary"""
+        with routing_scope():
+            self.assertIsNone(self.router.db_for_read(TextualItem))
+        self.assertIsNone(self.router.db_for_read(TextualItem))
+
+    def test_replica_reads_use_replica_alias(self):
+        """Test reads inside replica_reads() go to the replica"""
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(TextualItem), 'replica')
+
+    def test_write_pins_rest_of_scope_to_primary(self):
+        """Test reads after a write in the same scope use the primary"""
+        with routing_scope():
+            with replica_reads():
+                self.assertEqual(self.router.db_for_write(TextualItem), 'default')
+                self.assertIsNone(self.router.db_for_read(TextualItem))
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(TextualItem), 'replica')
+
+    @override_settings(USE_READ_REPLICA=False)
+    def test_disabled_replica_is_never_used(self):
+        """Test reads stay on the primary when the replica is switched off"""
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(TextualItem))
+
+    def test_sessions_stay_on_primary(self):
+        """Test non-library models are never read from the replica"""
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(User))
+
+    def test_replica_is_never_migrated(self):
+        """Test migrations only run against the primary"""
+        self.assertFalse(self.router.allow_migrate('replica', 'core_project'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core_project'))
+
+    def test_middleware_resets_pin_between_requests(self):
+        """Test a write pins only the request that made it"""
+        def writes(request):
+            self.router.db_for_write(TextualItem)
+            return current_state().pinned
+
+        def reads(request):
+            return current_state().pinned
+
+        self.assertTrue(ReplicaRoutingMiddleware(writes)(None))
+        self.assertFalse(ReplicaRoutingMiddleware(reads)(None))
+
+
+class ReplicaViewSetTests(APITestCase):
+    """Test viewset list and retrieve run as replica reads"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="Project", reader=self.reader)
+
+    def spy_read_routes(self):
+        routes = []
+
+        def db_for_read(router, model, **hints):
+            if model._meta.app_label == 'core_project':
+                state = current_state()
+                routes.append(bool(state and state.replica_reads and not state.pinned))
+            return None
+
+        return routes, patch.object(ReadReplicaRouter, 'db_for_read', db_for_read)
+
+    def test_list_and_retrieve_use_replica(self):
+        """Test GET list/detail reads are eligible for the replica"""
+        routes, spy = self.spy_read_routes()
+        with spy:
+            self.client.get('/api/reading-projects/')
+            self.client.get(f'/api/reading-projects/{self.project.id}/')
+        self.assertTrue(routes)
+        self.assertTrue(all(routes))
+
+    def test_anonymous_reader_resolved_on_primary(self):
+        """Test the anonymous reader is looked up where it would be created"""
+        models_read = []
+
+        def db_for_read(router, model, **hints):
+            models_read.append(model)
+            return None
+
+        with patch.object(ReadReplicaRouter, 'db_for_read', db_for_read):
+            response = self.client.get('/api/reading-projects/')
+        self.assertEqual(len(response.data), 1)
+        self.assertNotIn(Reader, models_read)
+        self.assertEqual(Reader.objects.filter(name="Test User").count(), 1)
+
+    def test_writes_read_from_primary(self):
+        """Test reads made while handling a write stay on the primary"""
+        routes, spy = self.spy_read_routes()
+        with spy:
+            self.client.patch(f'/api/reading-projects/{self.project.id}/', {'name': 'Renamed'}, format='json')
+        self.assertFalse(any(routes))
+
+
+# ========== BACKGROUND JOB TESTS ==========
+
+class JobQueueTests(TestCase):
+    """Test the database-backed job queue"""
+
+    def setUp(self):
+        self.calls = []
+        self.failures = 0
+        jobs.registry['test_record'] = lambda **payload: self.calls.append(payload) or {'ok': True}
+        jobs.registry['test_flaky'] = self.flaky
+
+    def tearDown(self):
+        jobs.registry.pop('test_record')
+        jobs.registry.pop('test_flaky')
+
+    def flaky(self):
+        self.failures += 1
+        raise RuntimeError("boom")
+
+    def test_enqueue_unknown_job_raises_error(self):
+        """Test enqueueing a job without a handler raises ValueError"""
+        with self.assertRaises(ValueError):
+            jobs.enqueue('no_such_job')
+
+    def test_run_pending_runs_and_records_result(self):
+        """Test queued jobs run once and store their result"""
+        job = jobs.enqueue('test_record', {'value': 1})
+        self.assertEqual(jobs.run_pending(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+        self.assertEqual(job.result, {'ok': True})
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(self.calls, [{'value': 1}])
+
+    def test_failed_job_is_retried_with_backoff(self):
+        """Test a failing job is requeued for later with growing delay"""
+        job = jobs.enqueue('test_flaky')
+        jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertIn("boom", job.last_error)
+        self.assertGreater(job.run_after, job.updated_at)
+        self.assertEqual(jobs.run_pending(), 0)
+        self.assertLess(jobs.backoff(1), jobs.backoff(3))
+
+    def test_job_fails_after_max_attempts(self):
+        """Test a job is marked failed once it runs out of attempts"""
+        job = jobs.enqueue('test_flaky')
+        for _ in range(job.max_attempts):
+            Job.objects.filter(pk=job.pk).update(run_after=job.created_at)
+            jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(self.failures, job.max_attempts)
+
+    def test_claimed_job_cannot_be_claimed_again(self):
+        """Test a running job is invisible to other workers"""
+        jobs.enqueue('test_record')
+        self.assertIsNotNone(jobs.claim_job('a'))
+        self.assertIsNone(jobs.claim_job('b'))
+
+    def test_worker_requeues_stale_jobs(self):
+        """Test the worker loop returns jobs of dead workers to the queue"""
+        job = jobs.enqueue('test_record')
+        jobs.claim_job('dead')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.work('alive', threading.Event(), once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0)
+    def test_heartbeat_keeps_long_job_leased(self):
+        """Test a handler that renews its lease is not requeued as stale"""
+        requeued = []
+
+        def long_running():
+            # Pretend the handler has been running for an hour.
+            Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+            jobs.heartbeat()
+            requeued.append(jobs.requeue_stale())
+
+        jobs.registry['test_long'] = long_running
+        self.addCleanup(jobs.registry.pop, 'test_long')
+        job = jobs.enqueue('test_long')
+        jobs.heartbeat()
+        jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(requeued, [0])
+        self.assertEqual((job.status, job.attempts), (JobStatus.SUCCEEDED, 1))
+
+    def test_lock_error_recording_outcome_is_retried(self):
+        """Test a locked database while saving the outcome does not escape run_job"""
+        job = jobs.enqueue('test_record')
+        claimed = jobs.claim_job('a')
+        save = Job.save
+        errors = iter([OperationalError("database is locked")])
+
+        def flaky_save(instance, *args, **kwargs):
+            error = next(errors, None)
+            if error:
+                raise error
+            return save(instance, *args, **kwargs)
+
+        with patch.object(Job, 'save', flaky_save), patch('core_project.jobs.time.sleep'):
+            jobs.run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.SUCCEEDED)
+
+    def test_api_shows_error_summary_only(self):
+        """Test job errors are reported without the traceback"""
+        job = jobs.enqueue('test_flaky')
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertIn("Traceback", job.last_error)
+        self.assertEqual(JobSerializer(job).data['last_error'], "RuntimeError: boom")
+
+
+class RunWorkersCommandTests(TransactionTestCase):
+    """Test the run_workers management command"""
+
+    def setUp(self):
+        self.calls = []
+        jobs.registry['test_record'] = lambda **payload: self.calls.append(payload)
+
+    def tearDown(self):
+        jobs.registry.pop('test_record')
+
+    def test_thread_pool_drains_queue(self):
+        """Test run_workers --once runs every queued job and exits"""
+        for value in range(3):
+            jobs.enqueue('test_record', {'value': value})
+        call_command('run_workers', workers=1, once=True, stdout=StringIO())
+
+        self.assertEqual(sorted(c['value'] for c in self.calls), [0, 1, 2])
+        self.assertEqual(Job.objects.filter(status=JobStatus.SUCCEEDED).count(), 3)
+
+
+class JobAPITests(APITestCase):
+    """Test the job status API"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="Project", reader=self.reader)
+
+    def test_job_status_visible_to_reader(self):
+        """Test the reader can poll the status of a job they started"""
+        job_id = self.client.delete(f'/api/reading-projects/{self.project.id}/').data['id']
+        response = self.client.get(f'/api/jobs/{job_id}/')
+        self.assertEqual(response.data['status'], JobStatus.QUEUED)
+
+        jobs.run_pending()
+        response = self.client.get(f'/api/jobs/{job_id}/')
+        self.assertEqual(response.data['status'], JobStatus.SUCCEEDED)
+
+    def test_other_readers_jobs_hidden(self):
+        """Test jobs of other readers are not listed"""
+        other = Reader.objects.create(name="Other")
+        jobs.enqueue('delete_reader', {'reader_id': other.id}, reader_id=other.id)
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response.data, [])
+
+
+# ========== CHUNKED DELETION TESTS ==========
+
+class ChunkedDeletionTests(APITestCase):
+    """Test soft-delete followed by chunked background removal"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = self.reader.add_project("Big Project")
+        for i in range(5):
+            self.project.add_item(title=f"Book {i}", isbn=str(i), author="Author")
+
+    def test_soft_deleted_project_hidden_immediately(self):
+        """Test a soft-deleted project and its items disappear from the API"""
+        soft_delete_project(self.project)
+
+        self.assertEqual(self.client.get('/api/reading-projects/').data, [])
+        self.assertEqual(self.client.get('/api/textual-items/').data, [])
+        self.assertEqual(TextualItem.objects.count(), 5)
+
+    def test_soft_delete_clears_active_project(self):
+        """Test readers no longer point at a soft-deleted project"""
+        soft_delete_project(self.project)
+        self.reader.refresh_from_db()
+        self.assertIsNone(self.reader.active_project)
+
+    def test_items_deleted_in_bounded_chunks(self):
+        """Test each chunk is removed by its own small DELETE"""
+        with CaptureQueriesContext(connection) as ctx:
+            deleted = delete_items_in_chunks(TextualItem.objects.filter(project=self.project), size=2)
+
+        self.assertEqual(deleted, 5)
+        # Each chunk also cascades one indexed DELETE to the items' tag links.
+        deletes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('DELETE FROM "core_project_textualitem"')]
+        self.assertEqual(len(deletes), 3)
+
+    def test_purge_removes_project_and_items(self):
+        """Test purging removes every item and the project row"""
+        soft_delete_project(self.project)
+        jobs.run_pending()
+
+        self.assertEqual(TextualItem.objects.count(), 0)
+        self.assertFalse(ReadingProject.all_objects.filter(pk=self.project.pk).exists())
+
+    def test_purge_of_missing_project_is_noop(self):
+        """Test a retried purge of an already removed project succeeds"""
+        purge_project(self.project.pk)
+        self.assertEqual(purge_project(self.project.pk), 0)
+
+    def test_soft_delete_reader_hides_and_purges_everything(self):
+        """Test deleting a reader hides their projects then removes all rows"""
+        user = User.objects.create_user(username="bob")
+        Reader.objects.filter(pk=self.reader.pk).update(user=user)
+        soft_delete_reader(self.reader)
+
+        self.assertFalse(Reader.objects.filter(pk=self.reader.pk).exists())
+        self.assertFalse(ReadingProject.objects.exists())
+        self.assertFalse(Reader.all_objects.filter(user=user).exists())
+
+        jobs.run_pending()
+        self.assertFalse(Reader.all_objects.filter(pk=self.reader.pk).exists())
+        self.assertEqual(TextualItem.objects.count(), 0)
+
+
+# ========== ARCHIVE TESTS ==========
+
+class ArchiveTests(APITestCase):
+    """Test moving projects into and out of the archive tier"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = self.reader.add_project("2020 Reading")
+        self.item = self.project.add_item(title="Dune", isbn="9780441013593", author="Frank Herbert")
+        self.item.update_progress(412, 412)
+        self.item.update_completion_date(date(2020, 5, 1))
+        self.item.update_rating(4.5)
+        self.project.add_item(title="Emma", isbn="9780141439587", author="Jane Austen")
+
+    def test_archive_packs_items_and_removes_live_rows(self):
+        """Test archiving stores items compressed and clears the hot tables"""
+        archived = archive_project(self.project)
+        jobs.run_pending()
+
+        self.assertEqual(archived.item_count, 2)
+        self.assertFalse(ReadingProject.all_objects.filter(pk=self.project.pk).exists())
+        self.assertEqual(TextualItem.objects.count(), 0)
+        items = unpack_items(archived.items_blob)
+        self.assertEqual(items[0]['title'], "Dune")
+        self.assertEqual(items[0]['completion_date'], date(2020, 5, 1))
+        self.assertEqual(items[0]['rating'], Decimal('4.5'))
+
+    def test_restore_recreates_project_and_items(self):
+        """Test restoring brings back the project with identical item fields"""
+        created_at = self.project.created_at
+        archived = archive_project(self.project)
+        jobs.run_pending()
+
+        project = restore_project(archived)
+        self.assertEqual(project.name, "2020 Reading")
+        self.assertEqual(ReadingProject.objects.get(pk=project.pk).created_at, created_at)
+        restored = project.textualitem_set.get(title="Dune")
+        self.assertEqual(restored.status, ReadingStatus.COMPLETED)
+        self.assertEqual(restored.progress_percent, Decimal('100.0'))
+        self.assertFalse(ArchivedProject.objects.exists())
+
+    def test_restore_indexes_recommendations_in_bulk(self):
+        """Test a restored project is indexed as a rebuild would, in a constant number of statements"""
+        recommendations.item_added(TextualItem.objects.create(title="Dune", isbn="0441013597", author="Frank Herbert", project=self.project))
+        Reader.objects.create(name="Other").add_project("Theirs").add_item(title="Emma", isbn="9780141439587", author="Jane Austen")
+        small = archive_project(self.project)
+        big_project = self.reader.add_project("Big")
+        for i in range(10):
+            big_project.add_item(title=f"Book {i}", isbn="", author="Author")
+        big = archive_project(big_project)
+        jobs.run_pending()
+
+        with CaptureQueriesContext(connection) as small_queries:
+            restore_project(small)
+        with CaptureQueriesContext(connection) as big_queries:
+            restore_project(big)
+        self.assertEqual(len(big_queries), len(small_queries))
+
+        incremental = index_state()
+        recommendations.rebuild()
+        self.assertEqual(index_state(), incremental)
+
+    def test_archivable_projects_selects_completed_or_old(self):
+        """Test only fully completed or old projects are archivable"""
+        done = self.reader.add_project("Done")
+        done.add_item(title="A", isbn="1", author="X").update_progress(10, 10)
+        self.reader.add_project("Empty")
+
+        self.assertEqual(list(archivable_projects()), [done])
+        ReadingProject.objects.filter(pk=self.project.pk).update(created_at=timezone.now() - timedelta(days=400))
+        self.assertEqual(set(archivable_projects(older_than_days=365)), {done, self.project})
+
+    def test_archive_api_lists_and_reads_archived_projects(self):
+        """Test the archive API lists metadata and returns items on retrieve"""
+        response = self.client.post(f'/api/reading-projects/{self.project.id}/archive/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        archived_id = response.data['id']
+
+        self.assertEqual(self.client.get('/api/reading-projects/').data, [])
+        listed = self.client.get('/api/archived-projects/').data
+        self.assertEqual(len(listed), 1)
+        self.assertNotIn('items', listed[0])
+        detail = self.client.get(f'/api/archived-projects/{archived_id}/').data
+        self.assertEqual(len(detail['items']), 2)
+
+    def test_archive_api_is_read_only_but_restorable(self):
+        """Test archives cannot be edited but can be restored"""
+        archived = archive_project(self.project)
+        response = self.client.patch(f'/api/archived-projects/{archived.id}/', {'name': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        response = self.client.post(f'/api/archived-projects/{archived.id}/restore/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['items']), 2)
+
+    def test_archive_projects_command(self):
+        """Test the archive_projects command archives matching projects"""
+        self.project.textualitem_set.filter(title="Emma").delete()
+        out = StringIO()
+        call_command('archive_projects', stdout=out)
+        self.assertIn("Archived 1 project(s)", out.getvalue())
+        self.assertEqual(ArchivedProject.objects.get().original_id, self.project.id)
+
+
+# ========== FORECASTING TESTS ==========
+
+class ForecastingTests(APITestCase):
+    """Test completion date forecasts"""
+
+    def setUp(self):
+        cache.clear()
+        self.today = date(2024, 3, 11)
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = self.reader.add_project("2024")
+        finished = self.project.add_item(title="Finished", isbn="1", author="A")
+        finished.start_date = date(2024, 2, 1)
+        finished.update_progress(200, 200)
+        finished.update_completion_date(date(2024, 2, 10))
+        self.reading = self.project.add_item(title="Reading", isbn="2", author="B")
+        self.reading.start_date = date(2024, 3, 2)
+        self.reading.update_progress(100, 300)
+
+    def test_forecast_blends_item_and_reader_pace(self):
+        """Test the projected finish uses item pace shrunk toward the reader's pace"""
+        forecasts = compute_forecasts(self.reader.id, self.today)
+
+        # (200 + 100) pages over (10 + 10) days
+        self.assertEqual(forecasts['reader_pages_per_day'], 15.0)
+        forecast = forecasts['items'][self.reading.id]
+        # (100 + 15 * 7) / (10 + 7) pages/day for the 200 remaining pages
+        self.assertEqual(forecast['pages_per_day'], 12.06)
+        self.assertEqual(forecast['remaining_pages'], 200)
+        self.assertEqual(forecast['projected_finish'], date(2024, 3, 28))
+
+    def test_only_in_progress_items_forecast(self):
+        """Test completed and unstarted items get no forecast"""
+        self.project.add_item(title="Unstarted", isbn="3", author="C")
+        forecasts = compute_forecasts(self.reader.id, self.today)
+        self.assertEqual(list(forecasts['items']), [self.reading.id])
+
+    def test_forecasts_computed_in_one_query(self):
+        """Test the whole library is forecast with a single query"""
+        for i in range(20):
+            item = self.project.add_item(title=f"Book {i}", isbn=str(i), author="D")
+            item.start_date = date(2024, 3, 1)
+            item.update_progress(i + 1, 100)
+        with self.assertNumQueries(1):
+            forecasts = compute_forecasts(self.reader.id, self.today)
+        self.assertEqual(len(forecasts['items']), 21)
+
+    def test_forecasts_cached_until_progress_changes(self):
+        """Test cached forecasts are reused and dropped after a progress update"""
+        reader_forecasts(self.reader.id)
+        with self.assertNumQueries(0):
+            reader_forecasts(self.reader.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reading.update_progress(290, 300)
+        forecast = reader_forecasts(self.reader.id)['items'][self.reading.id]
+        self.assertEqual(forecast['remaining_pages'], 10)
+
+    def test_item_and_project_forecast_endpoints(self):
+        """Test forecasts are exposed on the item and project endpoints"""
+        response = self.client.get(f'/api/textual-items/{self.reading.id}/forecast/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['remaining_pages'], 200)
+        self.assertIsNotNone(response.data['projected_finish'])
+
+        response = self.client.get(f'/api/reading-projects/{self.project.id}/forecast/')
+        self.assertEqual(list(response.data['items']), [self.reading.id])
+
+
+# ========== RECOMMENDATION TESTS ==========
+
+def index_state():
+    return (
+        set(BookCoOccurrence.objects.values_list('book', 'other', 'count')),
+        set(BookIndex.objects.filter(project_count__gt=0).values_list('key', 'project_count')),
+        set(LibraryIndexEntry.objects.values_list('kind', 'key', 'project_id', 'count')),
+    )
+
+
+class RecommendationIndexTests(APITestCase):
+    """Test the incrementally maintained recommendation index"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.other_reader = Reader.objects.create(name="Other")
+        self.mine = self.reader.add_project("Mine")
+        self.dune = self.mine.add_item(title="Dune", isbn="978-0441013593", author="Frank Herbert")
+        theirs = self.other_reader.add_project("Theirs")
+        theirs.add_item(title="Dune", isbn="9780441013593", author="frank  herbert")
+        theirs.add_item(title="Hyperion", isbn="9780553283686", author="Dan Simmons")
+        theirs.add_item(title="Children of Dune", isbn="9780593098240", author="Frank Herbert")
+        book_club = self.other_reader.add_project("Book Club")
+        book_club.add_item(title="Dune", isbn="9780441013593", author="Frank Herbert")
+        book_club.add_item(title="Hyperion", isbn="9780553283686", author="Dan Simmons")
+
+    def test_keys_are_normalized(self):
+        """Test hyphenated ISBNs and author spacing map to the same keys"""
+        self.assertEqual(BookIndex.objects.get(title="Dune").project_count, 3)
+        self.assertEqual(
+            LibraryIndexEntry.objects.filter(kind='author', key='frank herbert').count(), 3
+        )
+
+    def test_also_read_ranks_by_cooccurrence(self):
+        """Test books sharing the most projects come first"""
+        results = recommendations.recommendations_for(self.dune)['also_read']
+        self.assertEqual([r['title'] for r in results], ["Hyperion", "Children of Dune"])
+        self.assertEqual(results[0]['count'], 2)
+
+    def test_more_by_author(self):
+        """Test other books by the same author are suggested"""
+        results = recommendations.recommendations_for(self.dune)['more_by_author']
+        self.assertEqual([r['title'] for r in results], ["Children of Dune"])
+
+    def test_removing_item_updates_index(self):
+        """Test deleting an item decrements pairs and project counts"""
+        book_club = ReadingProject.objects.get(name="Book Club")
+        book_club.delete_item(book_club.textualitem_set.get(title="Hyperion"))
+
+        pair = BookCoOccurrence.objects.get(book="isbn:9780441013593", other="isbn:9780553283686")
+        self.assertEqual(pair.count, 1)
+        self.assertEqual(BookIndex.objects.get(title="Hyperion").project_count, 1)
+
+    def test_duplicate_copy_in_project_counted_once(self):
+        """Test a second copy of a book in one project does not double count"""
+        data = {'title': 'Dune', 'isbn': '9780441013593', 'author': 'Frank Herbert', 'project': self.mine.id}
+        self.client.post('/api/textual-items/', data, format='json')
+        self.assertEqual(BookIndex.objects.get(title="Dune").project_count, 3)
+
+    def test_purged_project_leaves_index(self):
+        """Test purging a project removes its contribution with set-based updates"""
+        soft_delete_project(ReadingProject.objects.get(name="Book Club"))
+        jobs.run_pending()
+        self.assertEqual(
+            BookCoOccurrence.objects.get(book="isbn:9780441013593", other="isbn:9780553283686").count, 1
+        )
+        self.assertEqual(BookIndex.objects.get(title="Dune").project_count, 2)
+
+    def test_rebuild_matches_incremental_index(self):
+        """Test a full rebuild produces the same index as incremental updates"""
+        before = set(BookCoOccurrence.objects.values_list('book', 'other', 'count'))
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.assertEqual(set(BookCoOccurrence.objects.values_list('book', 'other', 'count')), before)
+
+    def test_incremental_updates_match_rebuild(self):
+        """Test adds, removals and copies leave exactly the index a rebuild gives"""
+        shelf = self.reader.add_project("Shelf")
+        books = [shelf.add_item(title=f"Book {i}", isbn="", author="Author") for i in range(6)]
+        shelf.delete_item(books[0])
+        shelf.delete_item(books[3])
+        clone_project(shelf)
+        self.mine.add_item(title="Book 5", isbn="", author="Author")
+        soft_delete_project(ReadingProject.objects.get(name="Book Club"))
+        jobs.run_pending()
+
+        incremental = index_state()
+        recommendations.rebuild()
+        self.assertEqual(index_state(), incremental)
+
+    @override_settings(RECOMMENDATION_MAX_PROJECT_BOOKS=20)
+    def test_pairs_are_bounded_per_project(self):
+        """Test large projects only pair a fixed sample of books, on every path"""
+        shelf = self.reader.add_project("Shelf")
+        books = [shelf.add_item(title=f"Book {i}", isbn="", author="Author") for i in range(200)]
+        shelf_pairs = BookCoOccurrence.objects.filter(book__startswith="title:book ")
+        self.assertEqual(shelf_pairs.count(), 20 * 19)
+
+        # Removing sampled and unsampled books keeps the sample full.
+        for book in books[::7]:
+            shelf.delete_item(book)
+        self.assertEqual(shelf_pairs.count(), 20 * 19)
+        clone_project(shelf)
+        self.assertEqual(shelf_pairs.count(), 20 * 19)
+        self.assertEqual(set(shelf_pairs.values_list('count', flat=True)), {2})
+
+        incremental = index_state()
+        recommendations.rebuild()
+        self.assertEqual(index_state(), incremental)
+
+    def test_api_updates_and_serves_index(self):
+        """Test item API writes maintain the index and recommendations are served"""
+        self.client.patch(f'/api/textual-items/{self.dune.id}/', {'isbn': '9780553283686', 'title': 'Hyperion'}, format='json')
+        self.assertEqual(BookIndex.objects.get(title="Dune").project_count, 2)
+
+        with self.assertNumQueries(5):
+            response = self.client.get(f'/api/textual-items/{self.dune.id}/recommendations/?limit=5')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('also_read', response.data)
+
+    def test_limit_below_one_is_rejected(self):
+        """Test zero or negative limits are a client error"""
+        for limit in ('0', '-1'):
+            response = self.client.get(f'/api/textual-items/{self.dune.id}/recommendations/?limit={limit}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('limit', response.data)
+
+
+# ========== ISBN NORMALIZATION TESTS ==========
+
+class ISBNNormalizationTests(TestCase):
+    """Test canonical ISBN-13 normalization"""
+
+    def test_isbn10_converted_to_isbn13(self):
+        """Test ISBN-10 values, including an X check digit, become ISBN-13"""
+        self.assertEqual(to_isbn13("0-441-01359-7"), "9780441013593")
+        self.assertEqual(to_isbn13("080442957x"), "9780804429573")
+
+    def test_hyphenated_isbn13_normalized(self):
+        """Test hyphens and spaces are stripped from ISBN-13 values"""
+        self.assertEqual(to_isbn13("978-0 441-01359-3"), "9780441013593")
+
+    def test_invalid_isbn_gives_blank(self):
+        """Test non-ISBN values and bad check digits give a blank canonical ISBN"""
+        self.assertEqual(to_isbn13("123"), "")
+        self.assertEqual(to_isbn13("9780441013594"), "")
+        self.assertEqual(to_isbn13(""), "")
+
+
+class ISBNDuplicateTests(APITestCase):
+    """Test canonical ISBN column and duplicate detection"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        self.other_project = ReadingProject.objects.create(name="Book Club", reader=self.reader)
+
+    def test_isbn13_populated_on_save(self):
+        """Test isbn13 is set on create and kept in sync on update"""
+        item = TextualItem.objects.create(title="Dune", isbn="0441013597", author="Frank Herbert", project=self.project)
+        self.assertEqual(item.isbn13, "9780441013593")
+
+        item.isbn = "0-553-28368-5"
+        item.save(update_fields=['isbn'])
+        item.refresh_from_db()
+        self.assertEqual(item.isbn13, "9780553283686")
+
+    def test_add_item_rejects_same_book_in_project(self):
+        """Test add_item() rejects an ISBN variant of a book already in the project"""
+        self.project.add_item(title="Dune", isbn="9780441013593", author="Frank Herbert")
+        with self.assertRaises(ValueError):
+            self.project.add_item(title="Dune", isbn="0-441-01359-7", author="Frank Herbert")
+        self.other_project.add_item(title="Dune", isbn="0441013597", author="Frank Herbert")
+
+    def test_add_item_allows_items_without_valid_isbn(self):
+        """Test items without a valid ISBN are never treated as duplicates"""
+        self.project.add_item(title="Zine", isbn="123", author="Anon")
+        self.project.add_item(title="Zine", isbn="123", author="Anon")
+        self.assertEqual(self.project.items.count(), 2)
+
+    def test_duplicates_endpoint_groups_across_projects(self):
+        """Test the duplicates endpoint lists books held in several projects"""
+        first = self.project.add_item(title="Dune", isbn="9780441013593", author="Frank Herbert")
+        second = self.other_project.add_item(title="Dune (paperback)", isbn="0441013597", author="Frank Herbert")
+        self.project.add_item(title="Emma", isbn="9780141439587", author="Jane Austen")
+        other_reader = Reader.objects.create(name="Other")
+        other_reader.add_project("Theirs").add_item(title="Dune", isbn="9780441013593", author="Frank Herbert")
+
+        self.client.get('/api/textual-items/duplicates/')
+        # Session lookup plus a single duplicates query.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/textual-items/duplicates/')
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['isbn13'], "9780441013593")
+        self.assertEqual([i['id'] for i in response.data[0]['items']], [first.id, second.id])
+
+    def test_duplicates_query_uses_isbn_index(self):
+        """Test the duplicate lookup is served by the project/isbn13 index"""
+        items = TextualItem.objects.filter(project__reader_id=self.reader.id).exclude(isbn13='')
+        plan = items.values('isbn13').annotate(n=Count('project', distinct=True)).explain()
+        self.assertIn("item_project_isbn13_idx", plan)
+
+
+# ========== SEED DATA TESTS ==========
+
+class SeedLibraryCommandTests(TestCase):
+    """Test the synthetic library generator"""
+
+    def seed(self, **options):
+        call_command('seed_library', readers=2, projects=3, items=40, catalog=200, batch_size=50, stdout=StringIO(), **options)
+        return list(
+            TextualItem.objects.order_by('pk').values_list(
+                'title', 'isbn13', 'status', 'current_page', 'total_pages', 'progress_percent', 'rating', 'start_date', 'notes'
+            )
+        )
+
+    def test_generates_requested_shape(self):
+        """Test N readers x M projects x K items are created"""
+        self.seed()
+        self.assertEqual(Reader.objects.count(), 2)
+        self.assertEqual(ReadingProject.objects.count(), 6)
+        self.assertEqual(TextualItem.objects.count(), 240)
+
+    def test_anonymous_option_seeds_the_shared_reader(self):
+        """Test --anonymous gives the anonymous reader projects that loadtest can use"""
+        self.seed(anonymous=True)
+        reader_id = anonymous_reader_id()
+        self.assertEqual(ReadingProject.objects.filter(reader_id=reader_id).count(), 3)
+        self.assertEqual(TextualItem.objects.filter(project__reader_id=reader_id).count(), 120)
+
+    def test_same_seed_gives_same_library(self):
+        """Test generation is deterministic for a seed"""
+        first = self.seed(seed=7)
+        TextualItem.objects.all().delete()
+        self.assertEqual(self.seed(seed=7), first)
+        TextualItem.objects.all().delete()
+        self.assertNotEqual(self.seed(seed=8), first)
+
+    def test_rows_are_consistent(self):
+        """Test generated rows obey the model's own progress and status rules"""
+        self.seed()
+        for item in TextualItem.objects.all():
+            self.assertEqual(item.isbn13, to_isbn13(item.isbn))
+            if item.status == ReadingStatus.COMPLETED:
+                self.assertEqual(item.current_page, item.total_pages)
+                self.assertIsNotNone(item.completion_date)
+            if item.status in (ReadingStatus.NOT_STARTED, ReadingStatus.PLANNED):
+                self.assertEqual(item.current_page, 0)
+                self.assertIsNone(item.start_date)
+            expected = round(Decimal(item.current_page * 100) / item.total_pages, 1)
+            self.assertEqual(item.progress_percent, expected)
+
+
+# ========== LOAD TEST TESTS ==========
+
+class LoadTestReportTests(SimpleTestCase):
+    """Test load-test mix parsing and latency statistics"""
+
+    def test_percentile_nearest_rank(self):
+        """Test percentiles use the nearest-rank method"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_parse_mix(self):
+        """Test the route mix is parsed and validated"""
+        self.assertEqual(parse_mix("list_items=3, create_item=1"), {'list_items': 3.0, 'create_item': 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("delete_everything=1")
+        with self.assertRaises(ValueError):
+            parse_mix("list_items=0")
+
+    def test_report_is_sorted_per_route(self):
+        """Test the report lists routes in a stable order with a total row"""
+        load_test = LoadTest('http://127.0.0.1:1', [1], [1], mix={'list_items': 1, 'get_item': 1})
+        for latency in (0.01, 0.02, 0.03):
+            load_test.stats['list_items'].record(latency, ok=True)
+        load_test.stats['get_item'].record(0.5, ok=False)
+        report = load_test.report(elapsed=2.0)
+
+        self.assertEqual(list(report['routes']), ['get_item', 'list_items'])
+        self.assertEqual(report['routes']['list_items']['p50_ms'], 20.0)
+        self.assertEqual(report['routes']['get_item']['error_rate'], 1.0)
+        self.assertEqual(report['total']['requests'], 4)
+        self.assertEqual(report['total']['throughput_rps'], 2.0)
+        lines = format_report(report).splitlines()
+        self.assertEqual([line.split()[0] for line in lines[2:]], ['get_item', 'list_items', 'TOTAL'])
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    """Test the load generator against a live server"""
+
+    def test_runs_mix_against_server(self):
+        """Test every route in the mix is exercised without errors"""
+        self.addCleanup(forget_anonymous_reader)
+        reader = Reader.objects.create(name="Test User")
+        project = ReadingProject.objects.create(name="Load", reader=reader)
+        project.add_item(title="Dune", isbn="9780441013593", author="Frank Herbert")
+
+        out = StringIO()
+        # The live server's threads share one in-memory SQLite connection,
+        # so requests are kept sequential here.
+        call_command('loadtest', url=self.live_server_url, concurrency=1, requests=60, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['total']['requests'], 60)
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(
+            set(report['routes']),
+            {'list_projects', 'get_project', 'list_items', 'get_item', 'create_item', 'patch_item'},
+        )
+        self.assertGreater(TextualItem.objects.filter(author="Load Tester").count(), 0)
+
+
+# ========== PROGRESS SYNC TESTS ==========
+
+@override_settings(PROGRESS_SYNC_MAX_ITEMS=5)
+class ProgressSyncTests(APITestCase):
+    """Test batched progress updates"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        self.items = [
+            TextualItem.objects.create(title=f"Book {i}", isbn=str(i), author="Author", project=self.project)
+            for i in range(4)
+        ]
+
+    def test_matches_update_progress(self):
+        """Test each item gets the same percent and status as update_progress()"""
+        pages = [(0, 300), (150, 300), (300, 300), (10, 0)]
+        payload = [
+            {'item': item.id, 'current_page': current, 'total_pages': total}
+            for item, (current, total) in zip(self.items, pages)
+        ]
+        response = self.client.post('/api/textual-items/sync-progress/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+
+        for item, (current, total) in zip(self.items, pages):
+            expected = TextualItem(title="Twin", isbn="0", author="Author", project=self.project)
+            expected.update_progress(current, total)
+            expected.refresh_from_db()
+            item.refresh_from_db()
+            self.assertEqual(
+                [getattr(item, f) for f in [*TextualItem.PROGRESS_FIELDS, 'progress_percent']],
+                [getattr(expected, f) for f in [*TextualItem.PROGRESS_FIELDS, 'progress_percent']],
+            )
+
+    def test_writes_in_one_update(self):
+        """Test the batch is loaded and written with a constant number of queries"""
+        payload = [{'item': item.id, 'current_page': 50, 'total_pages': 100} for item in self.items]
+        self.client.post('/api/textual-items/sync-progress/', [], format='json')
+        # Session, savepoint, item load, bulk UPDATE, release.
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/textual-items/sync-progress/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(TextualItem.objects.filter(status=ReadingStatus.IN_PROGRESS).count(), 4)
+
+    def test_unknown_or_foreign_item_rejects_batch(self):
+        """Test the whole batch fails if any item is not the reader's"""
+        other = Reader.objects.create(name="Other").add_project("Theirs")
+        foreign = TextualItem.objects.create(title="Theirs", isbn="9", author="Author", project=other)
+        payload = [
+            {'item': self.items[0].id, 'current_page': 50, 'total_pages': 100},
+            {'item': foreign.id, 'current_page': 50, 'total_pages': 100},
+        ]
+        response = self.client.post('/api/textual-items/sync-progress/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.items[0].refresh_from_db()
+        self.assertEqual(self.items[0].current_page, 0)
+
+    def test_rejects_oversized_or_invalid_batch(self):
+        """Test batch size and page counts are validated"""
+        item = self.items[0].id
+        too_many = [{'item': item, 'current_page': 1, 'total_pages': 10}] * 6
+        response = self.client.post('/api/textual-items/sync-progress/', too_many, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        negative = [{'item': item, 'current_page': -1, 'total_pages': 10}]
+        response = self.client.post('/api/textual-items/sync-progress/', negative, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_page_past_total(self):
+        """Test an entry reading past its total fails the batch without writing"""
+        payload = [
+            {'item': self.items[0].id, 'current_page': 10, 'total_pages': 100},
+            {'item': self.items[1].id, 'current_page': 100000, 'total_pages': 1},
+        ]
+        response = self.client.post('/api/textual-items/sync-progress/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('current_page', response.json()['1'])
+        self.assertFalse(TextualItem.objects.exclude(current_page=0).exists())
+
+
+# ========== IDEMPOTENCY TESTS ==========
+
+class IdempotencyKeyTests(APITestCase):
+    """Test Idempotency-Key handling on write endpoints"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+
+    def post_item(self, key, title="Dune"):
+        data = {'title': title, 'isbn': "9780441013593", 'author': "Frank Herbert", 'project': self.project.id}
+        return self.client.post('/api/textual-items/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        """Test a retried create is answered from storage without writing again"""
+        first = self.post_item("abc")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        # Session plus a single key lookup.
+        with self.assertNumQueries(2):
+            retry = self.post_item("abc")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(TextualItem.objects.count(), 1)
+
+    def test_losing_a_concurrent_race_replays_winner(self):
+        """Test a retry that only conflicts on insert replays the committed response"""
+        first = self.post_item("abc")
+        # As if the first request committed between the lookup and the insert.
+        with patch('core_project.idempotency.IdempotencyKey.objects.filter') as lookup:
+            lookup.return_value.first.return_value = None
+            retry = self.post_item("abc")
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(TextualItem.objects.count(), 1)
+
+    def test_without_key_nothing_is_stored(self):
+        """Test writes without the header behave as before"""
+        self.client.post('/api/reading-projects/', {'name': "A"}, format='json')
+        self.client.post('/api/reading-projects/', {'name': "A"}, format='json')
+        self.assertEqual(ReadingProject.objects.filter(name="A").count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_reused_key_with_different_body_is_rejected(self):
+        """Test a key cannot be reused for a different request"""
+        self.post_item("abc")
+        response = self.post_item("abc", title="Emma")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(TextualItem.objects.count(), 1)
+
+    def test_validation_errors_are_replayed(self):
+        """Test a failed validation is stored and replayed rather than re-run"""
+        data = {'title': "Dune"}
+        first = self.client.post('/api/textual-items/', data, format='json', HTTP_IDEMPOTENCY_KEY="bad")
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        with patch.object(TextualItemSerializer, 'is_valid') as is_valid:
+            retry = self.client.post('/api/textual-items/', data, format='json', HTTP_IDEMPOTENCY_KEY="bad")
+        is_valid.assert_not_called()
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.json(), first.json())
+
+    def test_server_errors_are_not_stored(self):
+        """Test a failed write rolls back and can be retried with the same key"""
+        with patch.object(recommendations, 'item_added', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post_item("abc")
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(TextualItem.objects.count(), 0)
+        self.assertEqual(self.post_item("abc").status_code, status.HTTP_201_CREATED)
+
+    def test_keys_are_scoped_per_reader(self):
+        """Test the same key from another reader is a new request"""
+        self.client.post('/api/reading-projects/', {'name': "Mine"}, format='json', HTTP_IDEMPOTENCY_KEY="k")
+        self.client.force_authenticate(User.objects.create_user("other"))
+        response = self.client.post('/api/reading-projects/', {'name': "Mine"}, format='json', HTTP_IDEMPOTENCY_KEY="k")
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(ReadingProject.objects.filter(name="Mine").count(), 2)
+
+    def test_expired_keys_are_reused_and_purged(self):
+        """Test expired responses are not replayed and are purged by the command"""
+        self.post_item("abc")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.post_item("abc", title="Emma")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_patch_with_key_is_replayed(self):
+        """Test PATCH with a key runs once and replays on retry"""
+        item = TextualItem.objects.create(title="Dune", isbn="1", author="Frank Herbert", project=self.project)
+        for url in (f'/api/textual-items/{item.id}/', f'/api/reading-projects/{self.project.id}/'):
+            first = self.client.patch(url, {'title': "Renamed", 'name': "Renamed"}, format='json', HTTP_IDEMPOTENCY_KEY=url)
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+            retry = self.client.patch(url, {'title': "Renamed", 'name': "Renamed"}, format='json', HTTP_IDEMPOTENCY_KEY=url)
+            self.assertEqual(retry['Idempotent-Replayed'], 'true')
+            self.assertEqual(retry.json(), first.json())
+        item.refresh_from_db()
+        self.project.refresh_from_db()
+        self.assertEqual((item.version, self.project.version), (2, 2))
+
+    def test_unfinished_key_is_not_replayed(self):
+        """Test a key whose first request has not stored a response yields a conflict"""
+        IdempotencyKey.objects.create(
+            reader=self.reader, key="abc", request_hash="x", status_code=0,
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        response = self.post_item("abc")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(TextualItem.objects.count(), 0)
+
+    def test_bulk_progress_sync_is_idempotent(self):
+        """Test the batched progress endpoint honours the key"""
+        item = TextualItem.objects.create(title="Dune", isbn="1", author="Frank Herbert", project=self.project)
+        payload = [{'item': item.id, 'current_page': 10, 'total_pages': 100}]
+        self.client.post('/api/textual-items/sync-progress/', payload, format='json', HTTP_IDEMPOTENCY_KEY="sync")
+        TextualItem.objects.filter(pk=item.pk).update(current_page=20)
+        response = self.client.post('/api/textual-items/sync-progress/', payload, format='json', HTTP_IDEMPOTENCY_KEY="sync")
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        item.refresh_from_db()
+        self.assertEqual(item.current_page, 20)
+
+
+# ========== OPTIMISTIC CONCURRENCY TESTS ==========
+
+class RowVersionTests(APITestCase):
+    """Test version numbers and conditional updates"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        self.item = TextualItem.objects.create(title="Dune", isbn="1", author="Frank Herbert", project=self.project, total_pages=400)
+        self.url = f'/api/textual-items/{self.item.id}/'
+
+    def test_every_save_bumps_version(self):
+        """Test plain saves and model helpers advance the version"""
+        self.assertEqual(self.item.version, 1)
+        self.item.update_progress(100, 400)
+        self.item.save(update_fields=['title'])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.version, 3)
+
+    def test_stale_copies_never_share_a_version(self):
+        """Test unconditional saves from stale copies still get distinct versions"""
+        a = TextualItem.objects.get(pk=self.item.pk)
+        b = TextualItem.objects.get(pk=self.item.pk)
+        b.update_progress(10, 400)
+        a.update_rating(4)
+        self.assertEqual((b.version, a.version), (2, 3))
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.version, 3)
+        response = self.client.patch(self.url, {'title': "Dune"}, format='json', HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_conditional_save_is_a_single_guarded_update(self):
+        """Test save(expected_version=) issues one UPDATE ... WHERE version = ?"""
+        stale = TextualItem.objects.get(pk=self.item.pk)
+        self.item.title = "Dune Messiah"
+        with CaptureQueriesContext(connection) as queries:
+            self.item.save(expected_version=1)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"version" = 1', queries[0]['sql'])
+        self.assertEqual(self.item.version, 2)
+
+        stale.title = "Children of Dune"
+        with self.assertRaises(VersionConflict):
+            stale.save(expected_version=1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.title, "Dune Messiah")
+
+    def test_if_match_update(self):
+        """Test If-Match updates succeed on the current version and return 412 when stale"""
+        response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], '"1"')
+
+        response = self.client.patch(self.url, {'total_pages': 500}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"2"')
+
+        response = self.client.patch(self.url, {'total_pages': 600}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.total_pages, 500)
+
+    def test_update_without_if_match_still_allowed(self):
+        """Test clients that send no If-Match keep last-write-wins behaviour"""
+        response = self.client.patch(self.url, {'total_pages': 500}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['version'], 2)
+
+    def test_project_if_match(self):
+        """Test reading projects use the same version check"""
+        url = f'/api/reading-projects/{self.project.id}/'
+        self.assertEqual(self.client.patch(url, {'name': "2025"}, format='json', HTTP_IF_MATCH='"1"').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.patch(url, {'name': "2026"}, format='json', HTTP_IF_MATCH='"1"').status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(self.client.patch(url, {'name': "2026"}, format='json', HTTP_IF_MATCH='W/"2"').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.patch(url, {'name': "2027"}, format='json', HTTP_IF_MATCH='"abc"').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_progress_checks_versions(self):
+        """Test the batched progress endpoint rejects stale versions and bumps current ones"""
+        payload = [{'item': self.item.id, 'current_page': 10, 'total_pages': 400, 'version': 1}]
+        response = self.client.post('/api/textual-items/sync-progress/', payload, format='json')
+        self.assertEqual(response.data[0]['version'], 2)
+        response = self.client.post('/api/textual-items/sync-progress/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_page, 10)
+
+
+# ========== PROJECT CLONING TESTS ==========
+
+class ProjectCloneTests(APITestCase):
+    """Test server-side project cloning"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="Book club 2026", reader=self.reader)
+        self.dune = self.project.add_item(title="Dune", isbn="9780441013593", author="Frank Herbert")
+        self.dune.update_progress(412, 412)
+        self.dune.update_rating(4.5)
+        self.emma = self.project.add_item(title="Emma", isbn="9780141439587", author="Jane Austen")
+        self.emma.update_start_date(date(2026, 1, 5))
+        self.emma.update_progress(100, 400)
+        self.url = f'/api/reading-projects/{self.project.id}/clone/'
+
+    def test_clone_copies_items(self):
+        """Test a clone has every item with the same reading state"""
+        response = self.client.post(self.url, {'name': "Book club 2027"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['item_count'], 2)
+
+        clone = ReadingProject.objects.get(pk=response.data['id'])
+        self.assertEqual(clone.name, "Book club 2027")
+        fields = ['title', 'isbn', 'isbn13', 'author', 'status', 'current_page', 'progress_percent', 'rating', 'start_date']
+        self.assertEqual(
+            list(clone.items.order_by('pk').values_list(*fields)),
+            list(self.project.items.order_by('pk').values_list(*fields)),
+        )
+        self.assertEqual(set(clone.items.values_list('version', flat=True)), {1})
+
+    def test_clone_can_reset_progress(self):
+        """Test reset_progress clears progress, status and dates but keeps ratings"""
+        response = self.client.post(self.url, {'reset_progress': True}, format='json')
+        clone = ReadingProject.objects.get(pk=response.data['id'])
+        self.assertEqual(clone.name, "Book club 2026 (copy)")
+        for item in clone.items:
+            self.assertEqual(item.status, ReadingStatus.NOT_STARTED)
+            self.assertEqual((item.current_page, item.progress_percent), (0, 0))
+            self.assertIsNone(item.start_date)
+            self.assertIsNone(item.completion_date)
+        self.assertEqual(clone.items.get(title="Dune").rating, Decimal("4.5"))
+        self.assertEqual(clone.items.get(title="Emma").total_pages, 400)
+
+    def test_clone_is_indexed_for_recommendations(self):
+        """Test the clone counts in the recommendation index like added items would"""
+        self.client.post(self.url, {}, format='json')
+        dune = recommendations.book_key("9780441013593", "", "")
+        emma = recommendations.book_key("9780141439587", "", "")
+        self.assertEqual(BookIndex.objects.get(key=dune).project_count, 2)
+        self.assertEqual(BookCoOccurrence.objects.get(book=dune, other=emma).count, 2)
+
+        def snapshot():
+            return (
+                set(BookIndex.objects.values_list('key', 'project_count')),
+                set(BookCoOccurrence.objects.values_list('book', 'other', 'count')),
+                set(LibraryIndexEntry.objects.values_list('kind', 'key', 'project_id', 'count')),
+            )
+        indexed = snapshot()
+        recommendations.rebuild()
+        self.assertEqual(snapshot(), indexed)
+
+    def test_clone_query_count_is_constant(self):
+        """Test cloning an indexed project issues no per-item queries and touches a bounded set of pairs"""
+        TextualItem.objects.bulk_create([
+            TextualItem(title=f"Book {i}", isbn=str(i), author="Author", project=self.project)
+            for i in range(500)
+        ])
+        recommendations.rebuild()
+        sample = recommendations.max_project_books()
+        self.assertEqual(BookCoOccurrence.objects.count(), sample * (sample - 1))
+
+        self.client.get('/api/reading-projects/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.data['item_count'], 502)
+        self.assertLess(len(queries), 20)
+        # Only the sampled pairs are counted again; none are added.
+        self.assertEqual(BookCoOccurrence.objects.count(), sample * (sample - 1))
+        self.assertEqual(set(BookCoOccurrence.objects.values_list('count', flat=True)), {2})
+
+    def test_cannot_clone_other_readers_project(self):
+        """Test cloning is scoped to the reader's own projects"""
+        other = Reader.objects.create(name="Other").add_project("Theirs")
+        response = self.client.post(f'/api/reading-projects/{other.id}/clone/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# ========== PROJECT SUMMARY TESTS ==========
+
+class ProjectSummaryTests(APITestCase):
+    """Test project summaries computed with conditional aggregation"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        self.empty = ReadingProject.objects.create(name="Empty", reader=self.reader)
+        dune = self.project.add_item(title="Dune", isbn="1", author="Frank Herbert")
+        dune.update_progress(400, 400)
+        dune.update_rating(4.5)
+        emma = self.project.add_item(title="Emma", isbn="2", author="Jane Austen")
+        emma.update_progress(100, 300)
+        emma.update_rating(3)
+        self.project.add_item(title="Ulysses", isbn="3", author="James Joyce")
+        self.client.get('/api/reading-projects/')
+
+    def test_summary_values(self):
+        """Test histogram, average rating and page totals"""
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/reading-projects/{self.project.id}/summary/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['item_count'], 3)
+        self.assertEqual(set(response.data['status_counts']), set(ReadingStatus.values))
+        self.assertEqual(response.data['status_counts'][ReadingStatus.COMPLETED], 1)
+        self.assertEqual(response.data['status_counts'][ReadingStatus.IN_PROGRESS], 1)
+        self.assertEqual(response.data['status_counts'][ReadingStatus.NOT_STARTED], 1)
+        self.assertEqual(response.data['status_counts'][ReadingStatus.DNF], 0)
+        self.assertEqual(response.data['average_rating'], 3.75)
+        self.assertEqual(response.data['pages_read'], 500)
+        self.assertEqual(response.data['total_pages'], 700)
+
+    def test_empty_project_summary(self):
+        """Test a project without items summarizes to zeros"""
+        response = self.client.get(f'/api/reading-projects/{self.empty.id}/summary/')
+        self.assertEqual(response.data['item_count'], 0)
+        self.assertIsNone(response.data['average_rating'])
+        self.assertEqual(response.data['pages_read'], 0)
+
+    def test_batch_summaries_in_one_query(self):
+        """Test many projects are summarized with a single query"""
+        for i in range(5):
+            ReadingProject.objects.create(name=f"Extra {i}", reader=self.reader).add_item(title="Book", isbn=str(i), author="A")
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/reading-projects/summaries/')
+        self.assertEqual(len(response.data), 7)
+
+        response = self.client.get(f'/api/reading-projects/summaries/?ids={self.project.id},{self.empty.id}')
+        self.assertEqual([s['id'] for s in response.data], [self.project.id, self.empty.id])
+
+    def test_other_readers_projects_are_hidden(self):
+        """Test summaries are scoped to the reader"""
+        other = Reader.objects.create(name="Other").add_project("Theirs")
+        self.assertEqual(self.client.get(f'/api/reading-projects/{other.id}/summary/').status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(f'/api/reading-projects/summaries/?ids={other.id}')
+        self.assertEqual(response.data, [])
+        self.assertEqual(self.client.get('/api/reading-projects/summaries/?ids=x').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ========== READING ACTIVITY TESTS ==========
+
+class ReadingActivityTests(APITestCase):
+    """Test the reading activity calendar"""
+
+    def setUp(self):
+        cache.clear()
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        dune = self.project.add_item(title="Dune", isbn="1", author="Frank Herbert")
+        dune.update_start_date(date(2024, 1, 1))
+        dune.update_progress(400, 400)
+        dune.update_completion_date(date(2024, 1, 20))
+        emma = self.project.add_item(title="Emma", isbn="2", author="Jane Austen")
+        emma.update_start_date(date(2024, 1, 20))
+        old = self.project.add_item(title="Old", isbn="3", author="A")
+        old.update_start_date(date(2023, 12, 31))
+
+    def test_daily_buckets(self):
+        """Test one dense count per day of a leap year"""
+        response = self.client.get('/api/activity/?year=2024')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['start'], date(2024, 1, 1))
+        self.assertEqual(len(response.data['total']), 366)
+        self.assertEqual(response.data['started'][0], 1)
+        self.assertEqual(response.data['started'][19], 1)
+        self.assertEqual(response.data['completed'][19], 1)
+        self.assertEqual(response.data['total'][19], 2)
+        self.assertEqual(sum(response.data['total']), 3)
+
+    def test_weekly_and_monthly_buckets(self):
+        """Test week buckets start on Monday and month buckets cover the year"""
+        weekly = self.client.get('/api/activity/?year=2024&bucket=week').data
+        self.assertEqual(weekly['start'], date(2024, 1, 1))
+        self.assertEqual(len(weekly['total']), 53)
+        self.assertEqual(weekly['total'][:3], [1, 0, 2])
+
+        monthly = self.client.get('/api/activity/?year=2024&bucket=month').data
+        self.assertEqual(monthly['total'], [3] + [0] * 11)
+        self.assertEqual(self.client.get('/api/activity/?year=2023&bucket=month').data['started'][11], 1)
+
+    def test_single_query_then_cached(self):
+        """Test activity is computed in one query and then served from cache"""
+        self.client.get('/api/reading-projects/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/activity/?year=2024')
+        with self.assertNumQueries(1):
+            self.client.get('/api/activity/?year=2024')
+
+    def test_date_changes_invalidate_cache(self):
+        """Test changing an item's dates refreshes the cached calendar"""
+        self.assertEqual(sum(self.client.get('/api/activity/?year=2024').data['total']), 3)
+        item = TextualItem.objects.get(title="Emma")
+        with self.captureOnCommitCallbacks(execute=True):
+            item.update_start_date(date(2024, 3, 1))
+        data = self.client.get('/api/activity/?year=2024').data
+        self.assertEqual(data['started'][19], 0)
+        self.assertEqual(data['started'][60], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_project(self.project)
+        self.assertEqual(sum(self.client.get('/api/activity/?year=2024').data['total']), 0)
+
+    def test_evicted_generation_does_not_revive_stale_calendar(self):
+        """Test losing the generation key never falls back to a calendar cached before a change"""
+        self.client.get('/api/activity/?year=2024')
+        with self.captureOnCommitCallbacks(execute=True):
+            TextualItem.objects.get(title="Emma").update_start_date(date(2024, 3, 1))
+        cache.delete(activity_generation_key(self.reader.id))
+        self.assertEqual(self.client.get('/api/activity/?year=2024').data['started'][60], 1)
+
+    def test_rejects_bad_parameters(self):
+        """Test invalid year or bucket values are rejected"""
+        self.assertEqual(self.client.get('/api/activity/?year=x').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/activity/?bucket=hour').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ========== WEBHOOK OUTBOX TESTS ==========
+
+class StubReceiver:
+    """A local HTTP server that records webhook deliveries."""
+
+    def __init__(self):
+        receiver = self
+        self.requests = []
+        self.status = 200
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                receiver.requests.append({
+                    'client_port': self.client_address[1],
+                    'headers': dict(self.headers),
+                    'raw': body,
+                    'body': json.loads(body),
+                })
+                self.send_response(receiver.status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class WebhookOutboxTests(APITestCase):
+    """Test the transactional outbox and batched webhook delivery"""
+
+    def setUp(self):
+        self.receiver = StubReceiver()
+        self.addCleanup(self.receiver.stop)
+        self.pool = webhooks.ConnectionPool(timeout=2)
+        self.addCleanup(self.pool.close)
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        response = self.client.post('/api/webhooks/', {'url': self.receiver.url, 'secret': "s3cret"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.endpoint = WebhookEndpoint.objects.get(pk=response.data['id'])
+
+    def add_item(self, title="Dune"):
+        return self.project.add_item(title=title, isbn="1", author="Frank Herbert")
+
+    def test_events_written_with_the_change(self):
+        """Test completion, rating and DNF changes write outbox rows"""
+        dune = self.add_item()
+        dune.update_progress(50, 400)
+        self.assertFalse(OutboxEvent.objects.exists())
+        dune.update_progress(400, 400)
+        dune.update_rating(4.5)
+        dune.update_rating(4.5)
+        emma = self.add_item("Emma")
+        self.client.patch(f'/api/textual-items/{emma.id}/', {'status': ReadingStatus.DNF}, format='json')
+        self.assertEqual(
+            list(OutboxEvent.objects.order_by('id').values_list('event', 'payload__title')),
+            [('item.completed', "Dune"), ('item.rated', "Dune"), ('item.dnf', "Emma")],
+        )
+
+    def test_outbox_rolls_back_with_the_change(self):
+        """Test an aborted transaction leaves no outbox row behind"""
+        dune = self.add_item()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            dune.update_progress(400, 400)
+            raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_no_events_without_endpoint(self):
+        """Test readers without webhooks do not fill the outbox"""
+        other = Reader.objects.create(name="Other").add_project("Theirs")
+        other.add_item(title="Dune", isbn="1", author="Frank Herbert").update_progress(10, 10)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_bulk_progress_sync_writes_events(self):
+        """Test the batched progress endpoint records completions too"""
+        items = [self.add_item(f"Book {i}") for i in range(3)]
+        payload = [{'item': item.id, 'current_page': 10, 'total_pages': 10} for item in items]
+        self.client.post('/api/textual-items/sync-progress/', payload, format='json')
+        self.assertEqual(OutboxEvent.objects.filter(event='item.completed').count(), 3)
+
+    def test_delivers_in_batches_over_one_connection(self):
+        """Test events are batched per endpoint, signed and sent over a pooled connection"""
+        for i in range(5):
+            self.add_item(f"Book {i}").update_progress(10, 10)
+        self.assertEqual(webhooks.deliver_pending(self.pool, batch_size=3), 3)
+        self.assertEqual(webhooks.deliver_pending(self.pool, batch_size=3), 2)
+        self.assertEqual(webhooks.deliver_pending(self.pool, batch_size=3), 0)
+
+        first, second = self.receiver.requests
+        self.assertEqual([e['item']['title'] for e in first['body']['events']], ["Book 0", "Book 1", "Book 2"])
+        self.assertEqual(len(second['body']['events']), 2)
+        self.assertEqual(first['client_port'], second['client_port'])
+        self.assertEqual(first['headers'][webhooks.SIGNATURE_HEADER], webhooks.sign("s3cret", first['raw']))
+        self.endpoint.refresh_from_db()
+        self.assertEqual(self.endpoint.cursor, OutboxEvent.objects.order_by('-id').first().id)
+
+    def test_failed_delivery_backs_off_and_retries(self):
+        """Test a failing receiver keeps the cursor and is retried after backoff"""
+        self.add_item().update_progress(10, 10)
+        self.receiver.status = 503
+        self.assertEqual(webhooks.deliver_pending(self.pool), 0)
+        self.endpoint.refresh_from_db()
+        self.assertEqual((self.endpoint.cursor, self.endpoint.failures), (0, 1))
+        self.assertGreater(self.endpoint.next_attempt_at, timezone.now())
+        self.assertEqual(self.endpoint.last_error, "HTTP 503")
+
+        self.assertEqual(webhooks.deliver_pending(self.pool), 0)
+        self.assertEqual(len(self.receiver.requests), 1)
+
+        self.receiver.status = 200
+        WebhookEndpoint.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(webhooks.deliver_pending(self.pool), 1)
+        self.endpoint.refresh_from_db()
+        self.assertEqual(self.endpoint.failures, 0)
+
+    @override_settings(WEBHOOK_MAX_FAILURES=2)
+    def test_endpoint_disabled_after_repeated_failures(self):
+        """Test an endpoint is deactivated once it keeps failing"""
+        self.add_item().update_progress(10, 10)
+        self.receiver.stop()
+        for _ in range(2):
+            WebhookEndpoint.objects.update(next_attempt_at=timezone.now())
+            webhooks.deliver_pending(self.pool)
+        self.endpoint.refresh_from_db()
+        self.assertFalse(self.endpoint.active)
+
+    def test_event_filter_and_purge(self):
+        """Test endpoints only get subscribed events and delivered rows are purged"""
+        WebhookEndpoint.objects.update(events=['item.rated'])
+        dune = self.add_item()
+        dune.update_progress(10, 10)
+        dune.update_rating(4)
+        webhooks.deliver_pending(self.pool)
+        self.assertEqual([e['event'] for e in self.receiver.requests[0]['body']['events']], ['item.rated'])
+        self.assertEqual(webhooks.purge_outbox(), 2)
+
+    def test_filtered_pass_does_not_skip_later_events(self):
+        """Test an event committed after the fetch is still delivered"""
+        WebhookEndpoint.objects.update(events=['item.rated'])
+        dune = self.add_item()
+        dune.update_progress(10, 10)
+        fetch = webhooks.pending_events
+
+        def fetch_then_rate(*args):
+            events = fetch(*args)
+            dune.update_rating(4)
+            return events
+
+        with patch.object(webhooks, 'pending_events', fetch_then_rate):
+            self.assertEqual(webhooks.deliver_pending(self.pool), 0)
+        WebhookEndpoint.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(webhooks.deliver_pending(self.pool), 1)
+        self.assertEqual([e['event'] for e in self.receiver.requests[0]['body']['events']], ['item.rated'])
+
+    def test_inactive_endpoint_keeps_backlog_until_cutoff(self):
+        """Test purging keeps undelivered events of a disabled endpoint"""
+        self.add_item().update_progress(10, 10)
+        WebhookEndpoint.objects.update(active=False)
+        self.assertEqual(webhooks.purge_outbox(), 0)
+        self.assertEqual(webhooks.purge_outbox(now=timezone.now() + timedelta(days=8)), 1)
+
+    def test_reenabled_endpoint_receives_missed_events(self):
+        """Test events recorded while an endpoint is disabled are delivered once it is re-enabled"""
+        self.client.patch(f'/api/webhooks/{self.endpoint.id}/', {'active': False}, format='json')
+        self.add_item().update_progress(10, 10)
+        self.assertEqual(webhooks.deliver_pending(self.pool), 0)
+
+        self.client.patch(f'/api/webhooks/{self.endpoint.id}/', {'active': True}, format='json')
+        self.assertEqual(webhooks.deliver_pending(self.pool), 1)
+        self.assertEqual([e['event'] for e in self.receiver.requests[0]['body']['events']], ['item.completed'])
+
+    def test_command_drains_outbox(self):
+        """Test the delivery command sends everything pending and exits with --once"""
+        self.add_item().update_progress(10, 10)
+        out = StringIO()
+        call_command('deliver_webhooks', once=True, stdout=out)
+        self.assertIn("Delivered 1 event(s)", out.getvalue())
+        self.assertEqual(len(self.receiver.requests), 1)
+
+
+# ========== ADMIN TESTS ==========
+
+class AdminTests(TestCase):
+    """Test the admin for large tables"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        self.dune = self.project.add_item(title="Dune", isbn="0441013597", author="Frank Herbert")
+        self.dune.update_progress(10, 400)
+
+    def add_items(self, count):
+        TextualItem.objects.bulk_create([
+            TextualItem(title=f"Book {i}", isbn=str(i), author="Author", project=self.project, notes=["x" * 100])
+            for i in range(count)
+        ])
+
+    def test_changelists_render(self):
+        """Test every registered changelist loads"""
+        for url in ('/admin/core_project/reader/', '/admin/core_project/readingproject/', '/admin/core_project/textualitem/'):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_item_changelist_queries_do_not_grow_with_rows(self):
+        """Test related projects are joined and notes are not loaded"""
+        self.add_items(5)
+        self.client.get('/admin/core_project/textualitem/')
+        with CaptureQueriesContext(connection) as few:
+            self.client.get('/admin/core_project/textualitem/')
+        self.add_items(40)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get('/admin/core_project/textualitem/')
+        self.assertEqual(len(few), len(many))
+        listing = [q['sql'] for q in many if q['sql'].startswith('SELECT "core_project_textualitem"."id"')]
+        self.assertEqual(len(listing), 1)
+        self.assertNotIn('"notes"', listing[0])
+        self.assertIn('JOIN "core_project_readingproject"', listing[0])
+
+    def test_unfiltered_count_is_estimated(self):
+        """Test large unfiltered changelists skip COUNT(*)"""
+        self.add_items(30)
+        with patch.object(EstimatedCountPaginator, 'exact_below', 10):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/admin/core_project/textualitem/')
+        self.assertEqual(response.context['cl'].result_count, TextualItem.objects.order_by('-pk').first().pk)
+        self.assertFalse([q for q in queries if 'COUNT(*)' in q['sql'] and 'textualitem' in q['sql']])
+
+    def test_search_uses_canonical_isbn(self):
+        """Test searching by either ISBN form or id finds the item"""
+        self.add_items(3)
+        for term in ("978-0441013593", "0441013597", str(self.dune.id)):
+            response = self.client.get('/admin/core_project/textualitem/', {'q': term})
+            self.assertEqual([item.pk for item in response.context['cl'].result_list], [self.dune.pk], term)
+
+    def test_bulk_actions_are_single_updates(self):
+        """Test admin actions update all selected rows with one statement"""
+        self.add_items(3)
+        ids = list(TextualItem.objects.filter(total_pages=0).values_list('pk', flat=True)) + [self.dune.pk]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/admin/core_project/textualitem/', {'action': 'mark_completed', '_selected_action': ids})
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "core_project_textualitem"')]), 1)
+        self.dune.refresh_from_db()
+        self.assertEqual((self.dune.status, self.dune.current_page, self.dune.version), (ReadingStatus.COMPLETED, 400, 3))
+        self.assertEqual(self.dune.progress_percent, Decimal('100.0'))
+
+        self.client.post('/admin/core_project/textualitem/', {'action': 'reset_progress', '_selected_action': ids})
+        self.dune.refresh_from_db()
+        self.assertEqual((self.dune.status, self.dune.current_page, self.dune.completion_date), (ReadingStatus.NOT_STARTED, 0, None))
+
+    def test_mark_completed_writes_outbox_events(self):
+        """Test completions from the admin reach webhooks like any other completion"""
+        WebhookEndpoint.objects.create(reader=self.reader, url="http://127.0.0.1:9/hook")
+        self.dune.update_rating(4)
+        emma = self.project.add_item(title="Emma", isbn="2", author="Jane Austen")
+        emma.apply_progress(5, 300)
+        emma.completion_date = date(2024, 3, 1)
+        emma.save()
+        Reader.objects.create(name="Other").add_project("Theirs").add_item(title="Ulysses", isbn="3", author="James Joyce")
+        TextualItem.objects.update(total_pages=300)
+        OutboxEvent.objects.all().delete()
+
+        ids = list(TextualItem.objects.values_list('pk', flat=True))
+        self.client.post('/admin/core_project/textualitem/', {'action': 'mark_completed', '_selected_action': ids})
+        events = OutboxEvent.objects.order_by('id')
+        self.assertEqual([(e.reader_id, e.event) for e in events], [(self.reader.id, 'item.completed')] * 2)
+        self.assertEqual(
+            [e.payload for e in events],
+            [outbox.item_payload(item) for item in TextualItem.objects.filter(project=self.project).order_by('pk')],
+        )
+
+    def test_project_delete_action_is_soft(self):
+        """Test deleting projects from the admin goes through background deletion"""
+        self.client.post('/admin/core_project/readingproject/', {'action': 'soft_delete', '_selected_action': [self.project.pk]})
+        self.assertFalse(ReadingProject.objects.filter(pk=self.project.pk).exists())
+        self.assertTrue(Job.objects.filter(name='delete_project').exists())
+        response = self.client.get('/admin/core_project/readingproject/')
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_delete_confirmation_counts_instead_of_collecting(self):
+        """Test the reader and project delete pages summarise related rows with counts"""
+        self.add_items(3)
+        for url in (f'/admin/core_project/reader/{self.reader.pk}/delete/', f'/admin/core_project/readingproject/{self.project.pk}/delete/'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(dict(response.context['model_count'])['textual items'], 4)
+            self.assertFalse(any('"core_project_itemtag"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_item_edits_keep_recommendations_in_step(self):
+        """Test adding, editing and deleting items in the admin updates the recommendation index"""
+        def book_keys():
+            entries = LibraryIndexEntry.objects.filter(kind='book', count__gt=0).exclude(key=recommendations.item_keys(self.dune)[0])
+            return set(entries.values_list('key', flat=True))
+
+        data = {'title': 'Emma', 'isbn': '2', 'author': 'Jane Austen', 'project': self.project.pk,
+                'status': ReadingStatus.NOT_STARTED, 'current_page': 0, 'total_pages': 0, 'notes': '[]'}
+        self.client.post('/admin/core_project/textualitem/add/', data)
+        emma = TextualItem.objects.get(title='Emma')
+        self.assertEqual(book_keys(), {recommendations.item_keys(emma)[0]})
+
+        self.client.post(f'/admin/core_project/textualitem/{emma.pk}/change/', {**data, 'isbn': '3'})
+        emma.refresh_from_db()
+        self.assertEqual(book_keys(), {recommendations.item_keys(emma)[0]})
+
+        self.client.post(f'/admin/core_project/textualitem/{emma.pk}/delete/', {'post': 'yes'})
+        self.assertFalse(TextualItem.objects.filter(pk=emma.pk).exists())
+        self.assertEqual(book_keys(), set())
+
+
+# ========== GENERATED PROGRESS TESTS ==========
+
+class GeneratedProgressTests(APITestCase):
+    """Test the database-generated progress_percent column"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+
+    def add_item(self, current_page, total_pages, project=None):
+        return TextualItem.objects.create(
+            title="Book", isbn="123", author="Author", project=project or self.project,
+            current_page=current_page, total_pages=total_pages,
+        )
+
+    def test_queryset_updates_recompute_percent(self):
+        """Test bulk page updates that bypass save() still update the percent"""
+        item = self.add_item(10, 200)
+        self.assertEqual(item.progress_percent, Decimal('5.0'))
+        TextualItem.objects.filter(pk=item.pk).update(current_page=150)
+        item.refresh_from_db()
+        self.assertEqual(item.progress_percent, Decimal('75.0'))
+
+    def test_python_mirror_matches_database(self):
+        """Test compute_progress_percent rounds exactly like the database"""
+        # 49/400 is an exact tie at 12.25; 2/3 and 1/7 repeat.
+        pages = [(49, 400), (2, 3), (1, 7), (0, 0), (5, 0), (-3, 8), (333, 1000), (1, 2000), (100000, 1), (-100000, 1)]
+        for current_page, total_pages in pages:
+            item = self.add_item(0, 1)
+            item.apply_progress(current_page, total_pages)
+            item.save()
+            in_memory = item.progress_percent
+            item.refresh_from_db()
+            self.assertEqual(in_memory, item.progress_percent, (current_page, total_pages))
+
+    def test_out_of_range_percent_is_clamped(self):
+        """Test page counts past the column's range still store a readable percent"""
+        item = self.add_item(0, 300)
+        item.update_progress(150, 300)
+        response = self.client.patch(f'/api/textual-items/{item.id}/', {'total_pages': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['progress_percent'], '9999.9')
+        for url in (f'/api/textual-items/{item.id}/', '/api/textual-items/', '/api/reading-projects/'):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        item.refresh_from_db()
+        self.assertEqual(item.progress_percent, Decimal('9999.9'))
+
+    def test_save_keeps_instance_current(self):
+        """Test the instance reflects the new percent after save() without a reload"""
+        item = self.add_item(0, 300)
+        item.current_page = 100
+        item.save()
+        self.assertEqual(item.progress_percent, Decimal('33.3'))
+
+    def test_percent_is_read_only_in_api(self):
+        """Test a client-supplied percent is ignored"""
+        item = self.add_item(30, 300)
+        response = self.client.patch(f'/api/textual-items/{item.id}/', {'progress_percent': '90.0'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['progress_percent'], '10.0')
+
+    def test_ordering_by_progress(self):
+        """Test items can be listed by progress in either direction"""
+        for current in (40, 90, 10, 40):
+            self.add_item(current, 100)
+        response = self.client.get('/api/textual-items/', {'project': self.project.id, 'ordering': 'progress_percent'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([i['progress_percent'] for i in response.data], ['10.0', '40.0', '40.0', '90.0'])
+
+        response = self.client.get('/api/textual-items/', {'project': self.project.id, 'ordering': '-progress_percent'})
+        self.assertEqual([i['progress_percent'] for i in response.data], ['90.0', '40.0', '40.0', '10.0'])
+
+    def test_invalid_ordering_rejected(self):
+        """Test an unknown ordering is a 400"""
+        response = self.client.get('/api/textual-items/', {'ordering': 'title; DROP TABLE'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', response.data)
+
+    def test_project_progress_sort_uses_index(self):
+        """Test sorting a project by progress reads the index instead of sorting"""
+        other = ReadingProject.objects.create(name="Other", reader=self.reader)
+        for current in range(0, 100, 10):
+            self.add_item(current, 100)
+            self.add_item(current, 100, project=other)
+        plan = TextualItem.objects.filter(project=self.project).order_by('-progress_percent', '-pk').explain()
+        self.assertIn("item_project_progress_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+# ========== ITEM FILTER TESTS ==========
+
+class ItemFilterTests(APITestCase):
+    """Test filtering and ordering the item list"""
+
+    SAMPLE_VALUES = {
+        'status__in': 'Completed,In Progress',
+        'rating__gte': '3.5',
+        'rating__lte': '4.5',
+        'author': 'Le Guin',
+        'start_date__gte': '2024-01-01',
+        'start_date__lte': '2024-12-31',
+        'completion_date__gte': '2024-03-01',
+        'completion_date__lte': '2024-06-30',
+    }
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        self.dispossessed = TextualItem.objects.create(
+            title="The Dispossessed", author="Le Guin", project=self.project, total_pages=400, current_page=400,
+            status=ReadingStatus.COMPLETED, rating=Decimal('4.5'),
+            start_date=date(2024, 2, 1), completion_date=date(2024, 4, 1),
+        )
+        self.dune = TextualItem.objects.create(
+            title="Dune", author="Herbert", project=self.project, total_pages=600, current_page=150,
+            status=ReadingStatus.IN_PROGRESS, start_date=date(2024, 5, 1),
+        )
+        self.earthsea = TextualItem.objects.create(
+            title="A Wizard of Earthsea", author="Le Guin", project=self.project, total_pages=200, current_page=200,
+            status=ReadingStatus.COMPLETED, rating=Decimal('3.0'),
+            start_date=date(2023, 11, 1), completion_date=date(2023, 12, 1),
+        )
+
+    def titles(self, **params):
+        response = self.client.get('/api/textual-items/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [item['title'] for item in response.data]
+
+    def test_filters(self):
+        """Test each filter narrows the list"""
+        self.assertEqual(
+            set(self.titles(status__in='Completed')), {"The Dispossessed", "A Wizard of Earthsea"}
+        )
+        self.assertEqual(self.titles(rating__gte='4'), ["The Dispossessed"])
+        self.assertEqual(self.titles(rating__lte='3.5'), ["A Wizard of Earthsea"])
+        self.assertEqual(set(self.titles(author='Le Guin')), {"The Dispossessed", "A Wizard of Earthsea"})
+        self.assertEqual(
+            set(self.titles(start_date__gte='2024-01-01', start_date__lte='2024-12-31')), {"The Dispossessed", "Dune"}
+        )
+        self.assertEqual(self.titles(completion_date__lte='2023-12-31'), ["A Wizard of Earthsea"])
+
+    def test_filters_combine(self):
+        """Test filters are ANDed together"""
+        self.assertEqual(self.titles(author='Le Guin', completion_date__gte='2024-01-01'), ["The Dispossessed"])
+        self.assertEqual(self.titles(status__in='In Progress', author='Le Guin'), [])
+
+    def test_orderings(self):
+        """Test each ordering in both directions"""
+        self.assertEqual(self.titles(ordering='title'), ["A Wizard of Earthsea", "Dune", "The Dispossessed"])
+        # Ties are broken by id in the same direction.
+        self.assertEqual(self.titles(ordering='-progress_percent'), ["A Wizard of Earthsea", "The Dispossessed", "Dune"])
+        self.assertEqual(self.titles(ordering='start_date'), ["A Wizard of Earthsea", "The Dispossessed", "Dune"])
+        self.assertEqual(self.titles(ordering='-completion_date', status__in='Completed'), ["The Dispossessed", "A Wizard of Earthsea"])
+
+    def test_invalid_values_rejected(self):
+        """Test malformed filter values are a 400 naming the parameter"""
+        for param, value in [
+            ('status__in', 'Reading'), ('status__in', ','), ('rating__gte', 'high'),
+            ('start_date__lte', '2024-13-01'), ('ordering', 'isbn'),
+        ]:
+            response = self.client.get('/api/textual-items/', {param: value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, param)
+            self.assertIn(param, response.data)
+
+    def test_filters_only_apply_to_lists(self):
+        """Test list parameters do not hide items from detail routes"""
+        response = self.client.get(f'/api/textual-items/{self.dune.id}/', {'status__in': 'Completed'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_no_full_table_scans(self):
+        """Test every filter and ordering, alone and combined, is served by an index"""
+        queryset = TextualItem.objects.filter(project__reader_id=self.reader.id, project__deleted_at__isnull=True)
+        self.assertEqual(set(self.SAMPLE_VALUES), set(FILTERS))
+        cases = [{param: value} for param, value in self.SAMPLE_VALUES.items()]
+        cases += [{'ordering': ordering} for ordering in ORDERINGS]
+        cases.append({**self.SAMPLE_VALUES, 'ordering': '-title'})
+        for scoped in (queryset, queryset.filter(project=self.project)):
+            for params in cases:
+                plan = filter_items(scoped, params, self.reader.id).explain()
+                self.assertIn("SEARCH core_project_textualitem USING INDEX", plan, params)
+                self.assertNotIn("SCAN core_project_textualitem", plan, params)
+
+    def test_project_ordering_reads_index_in_order(self):
+        """Test ordering within one project needs no sort step"""
+        queryset = TextualItem.objects.filter(project=self.project)
+        for ordering in ORDERINGS:
+            plan = filter_items(queryset, {'ordering': ordering}, self.reader.id).explain()
+            self.assertNotIn("TEMP B-TREE", plan, ordering)
+
+
+# ========== READER LIBRARY TESTS ==========
+
+class ReaderLibraryTests(APITestCase):
+    """Test the reader-wide item listing"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.url = f'/api/readers/{self.reader.id}/items/'
+        self.projects = [ReadingProject.objects.create(name=f"Project {i}", reader=self.reader) for i in range(3)]
+        for project in self.projects:
+            for i in range(4):
+                TextualItem.objects.create(
+                    title=f"{project.name} book {i}", author="Author", project=project,
+                    total_pages=100, current_page=50 if i % 2 else 0,
+                    status=ReadingStatus.IN_PROGRESS if i % 2 else ReadingStatus.NOT_STARTED,
+                )
+
+    def test_lists_items_across_projects(self):
+        """Test items from every project come back with their project"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual({item['project']['id'] for item in response.data['results']}, {p.id for p in self.projects})
+        first = response.data['results'][0]
+        self.assertEqual(first['project'], {'id': self.projects[0].id, 'name': "Project 0"})
+        self.assertEqual(first['progress_percent'], '0.0')
+
+    def test_applies_item_filters(self):
+        """Test the item list's filters and orderings work here too"""
+        response = self.client.get(self.url, {'status__in': 'In Progress', 'ordering': '-title'})
+        titles = [item['title'] for item in response.data['results']]
+        self.assertEqual(len(titles), 6)
+        self.assertEqual(titles, sorted(titles, reverse=True))
+        response = self.client.get(self.url, {'rating__gte': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_paginates(self):
+        """Test pages honour page_size and link to the next page"""
+        response = self.client.get(self.url, {'page_size': 5, 'page': 3})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    def test_query_count_does_not_grow_with_projects(self):
+        """Test the page is fetched in one query however many projects it spans"""
+        ReadingProject.objects.bulk_create(ReadingProject(name=f"More {i}", reader=self.reader) for i in range(5))
+        for project in ReadingProject.objects.filter(name__startswith="More"):
+            TextualItem.objects.create(title="Extra", author="Author", project=project)
+        self.client.get(self.url)
+        # Session lookup, page count and the page itself.
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 17)
+        self.assertEqual(len({item['project']['id'] for item in response.data['results']}), 8)
+
+    def test_hides_deleted_projects(self):
+        """Test items of soft-deleted projects are not listed"""
+        soft_delete_project(self.projects[0])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 8)
+
+    def test_other_readers_library_not_found(self):
+        """Test a reader cannot list someone else's library"""
+        other = Reader.objects.create(name="Other")
+        response = self.client.get(f'/api/readers/{other.id}/items/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# ========== BACKUP TESTS ==========
+
+class BackupTests(SimpleTestCase):
+    """Test online SQLite snapshots"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source = os.path.join(tmp.name, 'source.sqlite3')
+        self.directory = os.path.join(tmp.name, 'backups')
+        self.create_source('delete')
+
+    def create_source(self, journal_mode, rows=500):
+        conn = sqlite3.connect(self.source)
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        conn.execute("CREATE TABLE book (id INTEGER PRIMARY KEY, body BLOB)")
+        conn.executemany("INSERT INTO book (body) VALUES (?)", [(os.urandom(500),) for _ in range(rows)])
+        conn.commit()
+        conn.close()
+
+    def count(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM book").fetchone()[0]
+        finally:
+            conn.close()
+
+    def write_to_source(self, *args):
+        conn = sqlite3.connect(self.source)
+        conn.execute("INSERT INTO book (body) VALUES (randomblob(10))")
+        conn.commit()
+        conn.close()
+
+    def test_snapshot_copies_and_verifies(self):
+        """Test a snapshot holds every row and passes the integrity check"""
+        stats = backups.snapshot(self.source, self.directory, pages=8, pause=0)
+        self.assertEqual(self.count(stats['path']), 500)
+        self.assertEqual(backups.verify(stats['path']), [])
+        self.assertGreater(stats['steps'], 1)
+        self.assertEqual(stats['bytes'], os.path.getsize(stats['path']))
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(stats['path'])])
+
+    def test_rotation_keeps_newest(self):
+        """Test only the newest snapshots are kept"""
+        paths = [backups.snapshot(self.source, self.directory, keep=2, pause=0)['path'] for _ in range(4)]
+        self.assertEqual(backups.snapshots(self.directory), paths[-2:])
+
+    def test_wal_copy_is_a_snapshot_despite_writes(self):
+        """Test writes during a WAL-mode copy neither restart nor leak into it"""
+        os.remove(self.source)
+        self.create_source('wal')
+        keep_open = sqlite3.connect(self.source)
+        self.addCleanup(keep_open.close)
+        with patch.object(backups.time, 'sleep', side_effect=self.write_to_source):
+            stats = backups.snapshot(self.source, self.directory, pages=8, pause=1)
+        self.assertEqual(stats['journal_mode'], 'wal')
+        self.assertEqual(stats['restarts'], 0)
+        self.assertEqual(self.count(stats['path']), 500)
+        self.assertEqual(self.count(self.source), 500 + stats['steps'] - 1)
+
+    def test_rollback_journal_gives_up_after_restarts(self):
+        """Test a copy restarted by writes too often fails without leaving files"""
+        with patch.object(backups.time, 'sleep', side_effect=self.write_to_source):
+            with self.assertRaises(backups.BackupError):
+                backups.snapshot(self.source, self.directory, pages=8, pause=1, max_restarts=2)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_failed_verification_keeps_nothing(self):
+        """Test a snapshot failing the integrity check is discarded"""
+        with patch.object(backups, 'verify', return_value=["page 3 is never used"]):
+            with self.assertRaises(backups.BackupError):
+                backups.snapshot(self.source, self.directory)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_command_reports_throughput(self):
+        """Test backup_db writes a snapshot and reports its speed"""
+        out = StringIO()
+        call_command('backup_db', source=self.source, dir=self.directory, keep=1, stdout=out)
+        self.assertIn("MiB/s", out.getvalue())
+        self.assertEqual(len(backups.snapshots(self.directory)), 1)
+
+    def test_command_missing_source(self):
+        """Test backup_db fails cleanly when the database cannot be opened"""
+        with self.assertRaises(CommandError):
+            call_command('backup_db', source=self.source + '.missing', dir=self.directory, stdout=StringIO())
+
+
+# ========== TAG TESTS ==========
+
+class TagTests(APITestCase):
+    """Test tagging items and the cached per-tag counts"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        self.items = [
+            TextualItem.objects.create(title=f"Book {i}", author="Author", project=self.project)
+            for i in range(3)
+        ]
+
+    def counts(self):
+        return dict(Tag.objects.filter(reader=self.reader).values_list('name', 'item_count'))
+
+    def assertCountsMatchLinks(self):
+        for tag in Tag.objects.filter(reader=self.reader):
+            self.assertEqual(tag.item_count, ItemTag.objects.filter(tag=tag).count(), tag.name)
+
+    def test_add_and_remove_through_api(self):
+        """Test POST adds normalized tags and DELETE removes them"""
+        url = f'/api/textual-items/{self.items[0].id}/tags/'
+        response = self.client.post(url, {'tags': ["Sci-Fi ", "re-read"]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'tags': ["re-read", "sci-fi"]})
+
+        response = self.client.delete(url, {'tags': ["RE-READ", "audiobook"]}, format='json')
+        self.assertEqual(response.data, {'tags': ["sci-fi"]})
+        self.assertEqual(self.client.get(url).data, {'tags': ["sci-fi"]})
+        self.assertEqual(self.counts(), {"sci-fi": 1, "re-read": 0})
+
+    def test_counts_are_maintained(self):
+        """Test counts follow adds and removes, and repeats are not double counted"""
+        for item in self.items:
+            add_tags(item, ["sci-fi"], self.reader.id)
+        self.assertEqual(add_tags(self.items[0], ["sci-fi", "audiobook"], self.reader.id), ["audiobook"])
+        self.assertEqual(self.counts(), {"sci-fi": 3, "audiobook": 1})
+
+        self.assertEqual(remove_tags(self.items[1], ["sci-fi"], self.reader.id), ["sci-fi"])
+        self.assertEqual(remove_tags(self.items[1], ["sci-fi"], self.reader.id), [])
+        self.assertEqual(self.counts(), {"sci-fi": 2, "audiobook": 1})
+        self.assertCountsMatchLinks()
+
+    def test_deletions_release_tags(self):
+        """Test deleting items or projects takes them off their shelves"""
+        other = ReadingProject.objects.create(name="Other", reader=self.reader)
+        extra = TextualItem.objects.create(title="Extra", author="Author", project=other)
+        for item in [*self.items, extra]:
+            add_tags(item, ["sci-fi"], self.reader.id)
+
+        self.client.delete(f'/api/textual-items/{self.items[0].id}/')
+        self.assertEqual(self.counts(), {"sci-fi": 3})
+        soft_delete_project(self.project)
+        self.assertEqual(self.counts(), {"sci-fi": 1})
+        jobs.run_pending()
+        self.assertEqual(self.counts(), {"sci-fi": 1})
+        self.assertCountsMatchLinks()
+
+    def test_tag_list_reads_stored_counts(self):
+        """Test listing shelves is one query on the tag table whatever its size"""
+        for i, item in enumerate(self.items):
+            add_tags(item, ["sci-fi", f"shelf {i}"], self.reader.id)
+        self.client.get('/api/tags/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tags/')
+        self.assertEqual([(t['name'], t['item_count']) for t in response.data][:2], [("sci-fi", 3), ("shelf 0", 1)])
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql'] or 'itemtag' in q['sql']])
+
+    def test_tags_are_per_reader(self):
+        """Test readers see only their own tags and tagged items"""
+        other = Reader.objects.create(name="Other")
+        other_project = ReadingProject.objects.create(name="Theirs", reader=other)
+        theirs = TextualItem.objects.create(title="Theirs", author="Author", project=other_project)
+        add_tags(theirs, ["sci-fi"], other.id)
+        add_tags(self.items[0], ["sci-fi"], self.reader.id)
+
+        self.assertEqual(len(self.client.get('/api/tags/').data), 1)
+        response = self.client.get('/api/textual-items/', {'tag': 'sci-fi'})
+        self.assertEqual([i['title'] for i in response.data], ["Book 0"])
+        self.assertEqual(Tag.objects.get(reader=other).item_count, 1)
+
+    def test_filter_by_tag(self):
+        """Test ?tag= narrows the item list and the reader library"""
+        add_tags(self.items[0], ["sci-fi"], self.reader.id)
+        add_tags(self.items[2], ["sci-fi", "audiobook"], self.reader.id)
+        response = self.client.get('/api/textual-items/', {'tag': 'Sci-Fi', 'ordering': '-title'})
+        self.assertEqual([i['title'] for i in response.data], ["Book 2", "Book 0"])
+        response = self.client.get(f'/api/readers/{self.reader.id}/items/', {'tag': 'audiobook'})
+        self.assertEqual([i['title'] for i in response.data['results']], ["Book 2"])
+        self.assertEqual(self.client.get('/api/textual-items/', {'tag': 'unknown'}).data, [])
+
+    def test_tag_filter_uses_indexes(self):
+        """Test the tag filter reads the tag and its links through indexes"""
+        add_tags(self.items[0], ["sci-fi"], self.reader.id)
+        queryset = TextualItem.objects.filter(project__reader_id=self.reader.id, project__deleted_at__isnull=True)
+        plan = filter_items(queryset, {'tag': 'sci-fi'}, self.reader.id).explain()
+        # SQLite names the (reader, name) unique index sqlite_autoindex_*.
+        self.assertIn("(reader_id=? AND name=?)", plan)
+        self.assertIn("item_tag_tag_item_idx", plan)
+        self.assertNotIn("SCAN ", plan)
+
+    def test_invalid_payload(self):
+        """Test tag changes need a non-empty list of short names"""
+        url = f'/api/textual-items/{self.items[0].id}/tags/'
+        for payload in [{}, {'tags': []}, {'tags': ["x" * 51]}]:
+            response = self.client.post(url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+
+    def test_delete_tag(self):
+        """Test deleting a tag removes it from every item"""
+        add_tags(self.items[0], ["sci-fi"], self.reader.id)
+        tag = Tag.objects.get(reader=self.reader)
+        response = self.client.delete(f'/api/tags/{tag.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ItemTag.objects.exists())
+
+
+# ========== IDENTITY MAP TESTS ==========
+
+class IdentityMapTests(TestCase):
+    """Test the request-scoped identity map for readers and projects"""
+
+    def setUp(self):
+        self.reader = Reader.objects.create(name="Test User")
+        self.project = ReadingProject.objects.create(name="2024", reader=self.reader)
+        for i in range(2):
+            TextualItem.objects.create(title=f"Book {i}", author="Author", project=self.project)
+
+    def fresh_items(self):
+        return list(TextualItem.objects.filter(project=self.project).order_by('pk'))
+
+    def test_shares_instances_within_scope(self):
+        """Test lookups in one scope return the same instance, and not across scopes"""
+        with identity_scope():
+            first, second = self.fresh_items()
+            self.assertIs(first.project, second.project)
+            reader = Reader.objects.get(pk=self.reader.pk)
+            remember(reader)
+            with self.assertNumQueries(0):
+                self.assertIs(first.project.reader, reader)
+        first, second = self.fresh_items()
+        self.assertIsNot(first.project, second.project)
+
+    def test_saves_invalidate(self):
+        """Test saving a project drops it so later lookups see the write"""
+        with identity_scope():
+            first, second = self.fresh_items()
+            project = first.project
+            project.name = "Renamed"
+            project.save()
+            self.assertIsNot(second.project, project)
+            self.assertEqual(second.project.name, "Renamed")
+
+    def test_queryset_writes_invalidate(self):
+        """Test UPDATE statements drop every cached row of the model"""
+        with identity_scope():
+            first, second = self.fresh_items()
+            first.project
+            ReadingProject.objects.filter(pk=self.project.pk).update(name="Bulk")
+            self.assertEqual(second.project.name, "Bulk")
+
+    @override_settings(DATABASE_ROUTERS=['core_project.db_routers.IdentityMapRouter'])
+    def test_invalidation_does_not_need_replica_router(self):
+        """Test writes invalidate the map with only the identity router installed"""
+        with identity_scope():
+            first, second = self.fresh_items()
+            first.project
+            ReadingProject.objects.filter(pk=self.project.pk).update(name="Alone")
+            self.assertEqual(second.project.name, "Alone")
+
+    def test_serializer_skips_deleted_cached_project(self):
+        """Test a cached soft-deleted project is not accepted by the serializer"""
+        with identity_scope():
+            project = ReadingProject.all_objects.get(pk=self.project.pk)
+            project.deleted_at = timezone.now()
+            ReadingProject.all_objects.filter(pk=project.pk).update(deleted_at=project.deleted_at)
+            remember(project)
+            serializer = TextualItemSerializer(data={'title': "B", 'isbn': "1", 'author': "A", 'project': project.pk})
+            self.assertFalse(serializer.is_valid())
+            self.assertIn('project', serializer.errors)
+
+    def test_foreign_keys_migrate_as_plain_foreign_keys(self):
+        """Test the identity-mapped keys need no migrations of their own"""
+        field = TextualItem._meta.get_field('project')
+        self.assertIsInstance(field, IdentityMappedForeignKey)
+        self.assertEqual(field.deconstruct()[1], 'django.db.models.ForeignKey')
@@ -1,33 +1,383 @@
+import copy
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import render
-from rest_framework import viewsets
-from .models import Reader, ReadingProject, TextualItem
-from .serializers import ReaderSerializer, ReadingProjectSerializer, TextualItemSerializer
+from django.utils import timezone
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from . import recommendations
+from .activity import BUCKETS, reader_activity
+from .archive import archive_project, restore_project
+from .caching import invalidate_reader
+from .cloning import clone_project
+from .db_routers import replica_reads
+from .deletion import soft_delete_project
+from .events import event_stream, hub, publish_item_change
+from .forecasting import reader_forecasts
+from .idempotency import IdempotentWritesMixin, idempotent
+from .identity import remember
+from .item_filters import filter_items
+from .models import ArchivedProject, Job, OutboxEvent, ReadingProject, ReadingStatus, Tag, TextualItem, VersionConflict, WebhookEndpoint
+from .outbox import record_item_events
+from .readers import ReaderScopedMixin, resolve_reader_id
+from .serializers import (
+    ArchivedProjectDetailSerializer,
+    ArchivedProjectSerializer,
+    ItemProgressSerializer,
+    ItemTagsSerializer,
+    JobSerializer,
+    LibraryItemSerializer,
+    ProjectCloneSerializer,
+    ProgressUpdateSerializer,
+    ReaderSerializer,
+    ReadingProjectSerializer,
+    TagSerializer,
+    TextualItemSerializer,
+    WebhookEndpointSerializer,
+)
+from .summaries import summarize
+from .tagging import add_tags, item_tags, remove_tags
 
 # Create your views here.
-class ReadingProjectViewSet(viewsets.ModelViewSet):
+class ReplicaReadMixin:
+    def list(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().retrieve(request, *args, **kwargs)
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The resource has been modified since the given version."
+    default_code = 'precondition_failed'
+
+class VersionedUpdateMixin:
+    """Honour ``If-Match: "<version>"`` on updates and expose versions as ETags."""
+
+    def expected_version(self):
+        if_match = self.request.headers.get('If-Match', '').strip()
+        if not if_match or if_match == '*':
+            return None
+        try:
+            return int(if_match.removeprefix('W/').strip('"'))
+        except ValueError:
+            raise serializers.ValidationError({'If-Match': ["Must be a version number as returned in the ETag header."]})
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('update', 'partial_update'):
+            context['expected_version'] = self.expected_version()
+        return context
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except VersionConflict:
+            raise PreconditionFailed()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.action in ('retrieve', 'update', 'partial_update') and isinstance(response.data, dict) and 'version' in response.data:
+            response['ETag'] = f'"{response.data["version"]}"'
+        return response
+
+class ReadingProjectViewSet(ReaderScopedMixin, IdempotentWritesMixin, VersionedUpdateMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = ReadingProjectSerializer
 
     def get_queryset(self):
-        queryset = ReadingProject.objects.all()
-        reader_name = self.request.query_params.get('reader')
-
-        if reader_name:
-            queryset = queryset.filter(reader__name=reader_name)
+        return ReadingProject.objects.filter(reader_id=self.reader_id)
 
-        return queryset
+    def get_object(self):
+        return remember(super().get_object())
 
     def perform_create(self, serializer):
-        reader, _ = Reader.objects.get_or_create(name="Test User")
-        serializer.save(reader=reader)
+        serializer.save(reader_id=self.reader_id)
+
+    def destroy(self, request, *args, **kwargs):
+        job = soft_delete_project(self.get_object(), reader_id=self.reader_id)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def archive(self, request, pk=None):
+        archived = archive_project(self.get_object())
+        return Response(ArchivedProjectSerializer(archived).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    @idempotent
+    def clone(self, request, pk=None):
+        serializer = ProjectCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        project, count = clone_project(self.get_object(), **serializer.validated_data)
+        return Response(
+            {'id': project.id, 'name': project.name, 'created_at': project.created_at, 'item_count': count},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True)
+    def summary(self, request, pk=None):
+        try:
+            return Response(summarize(self.get_queryset().filter(pk=pk))[int(pk)])
+        except (KeyError, ValueError):
+            raise Http404
 
-class TextualItemViewSet(viewsets.ModelViewSet):
+    @action(detail=False)
+    def summaries(self, request):
+        projects = self.get_queryset()
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                projects = projects.filter(pk__in=[int(i) for i in ids.split(',') if i.strip()])
+            except ValueError:
+                raise serializers.ValidationError({'ids': ["Give a comma-separated list of project ids."]})
+        return Response(sorted(summarize(projects).values(), key=lambda summary: summary['id']))
+
+    @action(detail=True)
+    def forecast(self, request, pk=None):
+        project = self.get_object()
+        forecasts = reader_forecasts(self.reader_id)
+        item_ids = project.textualitem_set.filter(status=ReadingStatus.IN_PROGRESS).values_list('pk', flat=True)
+        return Response({
+            'id': project.id,
+            'reader_pages_per_day': forecasts['reader_pages_per_day'],
+            'items': {item_id: forecasts['items'][item_id] for item_id in item_ids if item_id in forecasts['items']},
+        })
+
+class TextualItemViewSet(ReaderScopedMixin, IdempotentWritesMixin, VersionedUpdateMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = TextualItemSerializer
 
     def get_queryset(self):
-        queryset = TextualItem.objects.all()
+        queryset = TextualItem.objects.filter(project__reader_id=self.reader_id, project__deleted_at__isnull=True)
         project_id = self.request.query_params.get('project')
 
         if project_id:
             queryset = queryset.filter(project_id=project_id)
 
-        return queryset
\ No newline at end of file
+        if self.action == 'list':
+            queryset = filter_items(queryset, self.request.query_params, self.reader_id)
+        else:
+            # The project is joined for the reader check anyway.
+            queryset = queryset.select_related('project')
+
+        return queryset
+
+    def get_object(self):
+        item = super().get_object()
+        # Lets the serializer's project field and later lookups reuse this project.
+        remember(item.project)
+        return item
+
+    def check_project(self, serializer):
+        project = serializer.validated_data.get('project')
+        if project is not None and project.reader_id != self.reader_id:
+            raise serializers.ValidationError({'project': ["Project not found in reader's projects"]})
+
+    def perform_create(self, serializer):
+        self.check_project(serializer)
+        item = serializer.save()
+        recommendations.item_added(item)
+        publish_item_change(item, self.reader_id)
+        invalidate_reader(self.reader_id)
+
+    def perform_update(self, serializer):
+        self.check_project(serializer)
+        old = copy.copy(serializer.instance)
+        item = serializer.save()
+        recommendations.item_changed(old, item)
+        publish_item_change(item, self.reader_id)
+        invalidate_reader(self.reader_id)
+
+    def perform_destroy(self, instance):
+        recommendations.item_removed(instance)
+        instance.delete()
+        invalidate_reader(self.reader_id)
+
+    @action(detail=True)
+    def forecast(self, request, pk=None):
+        item = self.get_object()
+        forecasts = reader_forecasts(self.reader_id)
+        return Response({
+            'id': item.id,
+            'reader_pages_per_day': forecasts['reader_pages_per_day'],
+            **forecasts['items'].get(item.id, {'pages_per_day': None, 'remaining_pages': None, 'projected_finish': None}),
+        })
+
+    @action(detail=False)
+    def duplicates(self, request):
+        items = TextualItem.objects.filter(
+            project__reader_id=self.reader_id, project__deleted_at__isnull=True
+        ).exclude(isbn13='')
+        duplicated = (
+            items.values('isbn13')
+            .annotate(projects=Count('project', distinct=True))
+            .filter(projects__gt=1)
+            .values('isbn13')
+        )
+        groups = {}
+        for item in items.filter(isbn13__in=duplicated).order_by('isbn13', 'project_id', 'pk').values('id', 'title', 'project', 'isbn13'):
+            groups.setdefault(item.pop('isbn13'), []).append(item)
+        return Response([{'isbn13': isbn13, 'items': group} for isbn13, group in groups.items()])
+
+    @action(detail=True)
+    def recommendations(self, request, pk=None):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            raise serializers.ValidationError({'limit': ["A valid integer is required."]})
+        if limit < 1:
+            raise serializers.ValidationError({'limit': ["Ensure this value is greater than or equal to 1."]})
+        return Response(recommendations.recommendations_for(self.get_object(), limit))
+
+    @action(detail=True, methods=['get', 'post', 'delete'])
+    def tags(self, request, pk=None):
+        """List the item's tags, or add (POST) or remove (DELETE) ``{"tags": [...]}``."""
+        item = self.get_object()
+        if request.method != 'GET':
+            serializer = ItemTagsSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            change = add_tags if request.method == 'POST' else remove_tags
+            change(item, serializer.validated_data['tags'], self.reader_id)
+        return Response({'tags': item_tags(item)})
+
+    @action(detail=False, methods=['post'], url_path='sync-progress')
+    @idempotent
+    def sync_progress(self, request):
+        max_items = getattr(settings, 'PROGRESS_SYNC_MAX_ITEMS', 500)
+        serializer = ProgressUpdateSerializer(data=request.data, many=True, max_length=max_items)
+        serializer.is_valid(raise_exception=True)
+        # Later entries for the same item win, as if the PATCHes were sent in order.
+        updates = {update['item']: update for update in serializer.validated_data}
+
+        with transaction.atomic():
+            items = self.get_queryset().select_for_update().in_bulk(updates)
+            missing = sorted(set(updates) - set(items))
+            if missing:
+                raise serializers.ValidationError({'item': [f"Items not found: {', '.join(map(str, missing))}"]})
+            stale = sorted(
+                item_id for item_id, update in updates.items()
+                if update.get('version', items[item_id].version) != items[item_id].version
+            )
+            if stale:
+                raise PreconditionFailed(f"Items modified since the given version: {', '.join(map(str, stale))}")
+            for item_id, update in updates.items():
+                items[item_id].apply_progress(update['current_page'], update['total_pages'])
+                items[item_id].version += 1
+            TextualItem.objects.bulk_update(items.values(), [*TextualItem.PROGRESS_FIELDS, 'version'])
+            record_item_events(items.values())
+
+        for item in items.values():
+            publish_item_change(item, self.reader_id)
+        invalidate_reader(self.reader_id)
+        return Response(ItemProgressSerializer(items.values(), many=True).data)
+
+class ArchivedProjectViewSet(ReaderScopedMixin, viewsets.ReadOnlyModelViewSet):
+    def get_queryset(self):
+        queryset = ArchivedProject.objects.filter(reader_id=self.reader_id).order_by('-archived_at')
+        if self.action == 'list':
+            queryset = queryset.defer('items_blob')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return ArchivedProjectDetailSerializer
+        return ArchivedProjectSerializer
+
+    @action(detail=True, methods=['post'])
+    def restore(self, request, pk=None):
+        project = restore_project(self.get_object())
+        return Response(ReadingProjectSerializer(project).data, status=status.HTTP_201_CREATED)
+
+class JobViewSet(ReaderScopedMixin, viewsets.ReadOnlyModelViewSet):
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        return Job.objects.filter(reader_id=self.reader_id).order_by('-id')
+
+class WebhookEndpointViewSet(ReaderScopedMixin, viewsets.ModelViewSet):
+    serializer_class = WebhookEndpointSerializer
+
+    def get_queryset(self):
+        return WebhookEndpoint.objects.filter(reader_id=self.reader_id).order_by('id')
+
+    def perform_create(self, serializer):
+        # A new endpoint only receives events recorded after it was added.
+        cursor = OutboxEvent.objects.filter(reader_id=self.reader_id).aggregate(last=Max('id'))['last'] or 0
+        serializer.save(reader_id=self.reader_id, cursor=cursor)
+
+    def perform_update(self, serializer):
+        # Re-enabling an endpoint resets its failure count and retries now.
+        if serializer.validated_data.get('active') and not serializer.instance.active:
+            serializer.save(failures=0, next_attempt_at=timezone.now())
+        else:
+            serializer.save()
+
+class TagViewSet(ReaderScopedMixin, mixins.ListModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    serializer_class = TagSerializer
+
+    def get_queryset(self):
+        # Counts are stored on the tag, so listing shelves never counts items.
+        return Tag.objects.filter(reader_id=self.reader_id).order_by('name')
+
+class LibraryPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+class ReaderViewSet(ReaderScopedMixin, viewsets.GenericViewSet):
+    pagination_class = LibraryPagination
+
+    @action(detail=True)
+    def items(self, request, pk=None):
+        """Every item across the reader's projects, filtered like the item list, in one query per page."""
+        if pk != str(self.reader_id):
+            raise Http404
+        queryset = filter_items(
+            TextualItem.objects
+            .filter(project__reader_id=self.reader_id, project__deleted_at__isnull=True)
+            .select_related('project')
+            .defer('notes')
+            .order_by('project_id', 'pk'),
+            request.query_params,
+            self.reader_id,
+        )
+        with replica_reads():
+            page = self.paginate_queryset(queryset)
+            return self.get_paginated_response(LibraryItemSerializer(page, many=True).data)
+
+
+class ActivityViewSet(ReaderScopedMixin, viewsets.ViewSet):
+    def list(self, request):
+        try:
+            year = int(request.query_params.get('year', timezone.localdate().year))
+        except ValueError:
+            raise serializers.ValidationError({'year': ["A valid integer is required."]})
+        if not 1 <= year <= 9999:
+            raise serializers.ValidationError({'year': ["Year out of range."]})
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in BUCKETS:
+            raise serializers.ValidationError({'bucket': [f"Choose one of: {', '.join(BUCKETS)}."]})
+        return Response(reader_activity(self.reader_id, year, bucket))
+
+
+async def progress_stream(request):
+    try:
+        reader_id = await sync_to_async(resolve_reader_id)(request)
+    except NotAuthenticated as exc:
+        return HttpResponseForbidden(str(exc.detail))
+
+    subscription = hub.subscribe(reader_id)
+    response = StreamingHttpResponse(
+        event_stream(subscription, getattr(settings, 'PROGRESS_STREAM_HEARTBEAT', 15)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
\ No newline at end of file
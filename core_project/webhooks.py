@@ -0,0 +1,195 @@
+import hashlib
+import hmac
+import http.client
+import json
+import logging
+import threading
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from .models import OutboxEvent, WebhookEndpoint
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Just-Read-Signature'
+
+
+def setting(name, default):
+    return getattr(settings, f'WEBHOOK_{name}', default)
+
+
+def backoff(failures):
+    base = setting('RETRY_BACKOFF', 5)
+    cap = setting('RETRY_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(base * 2 ** (failures - 1), cap))
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, reused per host across deliveries."""
+
+    def __init__(self, timeout=None, max_per_host=4):
+        self.timeout = timeout if timeout is not None else setting('TIMEOUT', 5)
+        self.max_per_host = max_per_host
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, scheme, host, port):
+        with self.lock:
+            connections = self.idle.get((scheme, host, port))
+            if connections:
+                return connections.pop()
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(host, port, timeout=self.timeout)
+
+    def release(self, key, connection):
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.max_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def post(self, url, body, headers):
+        """POST ``body`` and return the response status; raises OSError on network failure."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        connection = self.acquire(*key)
+        try:
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                connection.close()
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self.release(key, connection)
+        return response.status
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+
+def pending_events(endpoint, limit, upto):
+    events = OutboxEvent.objects.filter(reader_id=endpoint.reader_id, id__gt=endpoint.cursor, id__lte=upto)
+    if endpoint.events:
+        events = events.filter(event__in=endpoint.events)
+    return list(events.order_by('id')[:limit])
+
+
+def sign(secret, body):
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def deliver(endpoint, pool, batch_size=None):
+    """Send the endpoint's next batch of events and advance its cursor.
+
+    Returns the number of events delivered. A failed delivery leaves the
+    cursor where it was and schedules a retry with exponential backoff;
+    endpoints that keep failing are deactivated.
+    """
+    # Bound the pass before fetching, so the cursor never jumps past an
+    # event that committed after the fetch.
+    upto = OutboxEvent.objects.filter(reader_id=endpoint.reader_id, id__gt=endpoint.cursor).aggregate(last=models.Max('id'))['last']
+    events = pending_events(endpoint, batch_size or setting('BATCH_SIZE', 100), upto) if upto else []
+    now = timezone.now()
+    if not events:
+        # Only events this endpoint does not subscribe to are pending.
+        WebhookEndpoint.objects.filter(pk=endpoint.pk).update(cursor=upto or endpoint.cursor, next_attempt_at=now)
+        return 0
+
+    body = json.dumps(
+        {'events': [
+            {'id': event.id, 'event': event.event, 'created_at': event.created_at, 'item': event.payload}
+            for event in events
+        ]},
+        cls=DjangoJSONEncoder,
+    ).encode()
+    headers = {'Content-Type': 'application/json'}
+    if endpoint.secret:
+        headers[SIGNATURE_HEADER] = sign(endpoint.secret, body)
+
+    try:
+        status = pool.post(endpoint.url, body, headers)
+        error = None if 200 <= status < 300 else f"HTTP {status}"
+    except (OSError, http.client.HTTPException) as exc:
+        error = f"{type(exc).__name__}: {exc}"
+
+    if error is None:
+        WebhookEndpoint.objects.filter(pk=endpoint.pk).update(
+            cursor=events[-1].id, failures=0, next_attempt_at=now, last_error='',
+        )
+        return len(events)
+
+    failures = endpoint.failures + 1
+    WebhookEndpoint.objects.filter(pk=endpoint.pk).update(
+        failures=failures,
+        next_attempt_at=now + backoff(failures),
+        last_error=error,
+        active=failures < setting('MAX_FAILURES', 10),
+    )
+    logger.warning("Webhook %s delivery failed (%s, attempt %s)", endpoint.pk, error, failures)
+    return 0
+
+
+def claim_endpoint(endpoint_id, next_attempt_at):
+    """Lease an endpoint for one delivery with a conditional UPDATE on its schedule."""
+    lease = timezone.now() + timedelta(seconds=setting('LEASE', 60))
+    return WebhookEndpoint.objects.filter(pk=endpoint_id, next_attempt_at=next_attempt_at, active=True).update(
+        next_attempt_at=lease
+    )
+
+
+def due_endpoints(limit=100):
+    has_events = OutboxEvent.objects.filter(reader_id=models.OuterRef('reader_id'), id__gt=models.OuterRef('cursor'))
+    return (
+        WebhookEndpoint.objects
+        .filter(active=True, next_attempt_at__lte=timezone.now())
+        .filter(models.Exists(has_events))
+        .order_by('next_attempt_at')
+        .values_list('id', 'next_attempt_at')[:limit]
+    )
+
+
+def deliver_pending(pool, batch_size=None):
+    """One pass over every due endpoint; returns the number of events delivered."""
+    delivered = 0
+    for endpoint_id, next_attempt_at in due_endpoints():
+        if claim_endpoint(endpoint_id, next_attempt_at):
+            delivered += deliver(WebhookEndpoint.objects.get(pk=endpoint_id), pool, batch_size)
+    return delivered
+
+
+def purge_outbox(now=None):
+    """Delete events every endpoint has moved past, or older than the retention window.
+
+    Inactive endpoints keep their backlog until the cutoff, so re-enabling
+    one delivers what it missed.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=setting('RETENTION_DAYS', 7))
+    delivered = WebhookEndpoint.objects.filter(
+        reader_id=models.OuterRef('reader_id'), cursor__lt=models.OuterRef('id'),
+    )
+    return OutboxEvent.objects.filter(
+        models.Q(created_at__lt=cutoff) | ~models.Exists(delivered)
+    ).delete()[0]
@@ -3,6 +3,10 @@ ASGI config for just_read project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The reading progress event stream (``/api/events/progress/``) holds its
+connection open, so it must be served through this application by an ASGI
+server rather than through the WSGI entry point.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -51,6 +51,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core_project.middleware.ReplicaRoutingMiddleware',
+    'core_project.middleware.IdentityMapMiddleware',
 ]
 
 ROOT_URLCONF = 'just_read.urls'
@@ -80,9 +82,27 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = [
+    # Must stay first: it sees every write to invalidate the identity map.
+    'core_project.db_routers.IdentityMapRouter',
+    'core_project.db_routers.ReadReplicaRouter',
+]
+
+# List and retrieve reads are sent to this alias when USE_READ_REPLICA is on.
+# Keep the replica file current with `manage.py sync_replica`.
+READ_REPLICA_ALIAS = 'replica'
+USE_READ_REPLICA = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -130,3 +150,74 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
+
+# Readers are resolved from the authenticated user. Anonymous requests share
+# this reader; set to None to require authentication.
+ANONYMOUS_READER_NAME = "Test User"
+
+# Server-Sent Events stream of reading progress (served by the ASGI application)
+PROGRESS_STREAM_QUEUE_SIZE = 100
+PROGRESS_STREAM_MAX_DROPPED = 1000
+PROGRESS_STREAM_HEARTBEAT = 15
+
+# Most items accepted by one POST /api/textual-items/sync-progress/
+PROGRESS_SYNC_MAX_ITEMS = 500
+
+# Seconds a stored Idempotency-Key response is replayed for
+# (`manage.py purge_idempotency_keys` deletes expired ones)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Webhook delivery from the outbox (`manage.py deliver_webhooks`)
+WEBHOOK_BATCH_SIZE = 100
+WEBHOOK_TIMEOUT = 5
+WEBHOOK_RETRY_BACKOFF = 5
+WEBHOOK_RETRY_BACKOFF_MAX = 3600
+WEBHOOK_MAX_FAILURES = 10
+WEBHOOK_LEASE = 60
+WEBHOOK_RETENTION_DAYS = 7
+
+# Background jobs (`manage.py run_workers`)
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF = 2
+JOB_RETRY_BACKOFF_MAX = 300
+JOB_LOCK_TIMEOUT = 600
+# Long handlers renew their lease this often (jobs.heartbeat); keep it well
+# below JOB_LOCK_TIMEOUT.
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_REQUEUE_INTERVAL = 60
+
+# Online SQLite snapshots (`manage.py backup_db`). Each step copies
+# BACKUP_STEP_PAGES pages, then pauses so writers can take the lock.
+BACKUP_DIR = BASE_DIR / 'backups'
+BACKUP_KEEP = 7
+BACKUP_STEP_PAGES = 256
+BACKUP_STEP_PAUSE = 0.01
+BACKUP_MAX_RESTARTS = 10
+
+# Background deletion removes items in chunks of this size, pausing between
+# chunks so other writers can take the SQLite write lock.
+DELETE_CHUNK_SIZE = 1000
+DELETE_CHUNK_PAUSE = 0
+
+# Forecasts, activity calendars and the reader generations that retire
+# session-cached readers are invalidated by whichever process changes the
+# data, so every server and worker process must share one cache; the
+# per-process default (LocMemCache) would keep serving stale entries.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Completion forecasts and activity calendars are cached per reader until
+# their items change.
+FORECAST_CACHE_TIMEOUT = 24 * 60 * 60
+ACTIVITY_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Co-occurrence is quadratic in project size; pairs are only counted among
+# this many books of each project, picked by a stable hash of the book.
+RECOMMENDATION_MAX_PROJECT_BOOKS = 50
@@ -18,13 +18,30 @@ from django.contrib import admin
 from django.urls import path
 from django.urls import include
 from rest_framework.routers import DefaultRouter
-from core_project.views import ReadingProjectViewSet, TextualItemViewSet
+from core_project.views import (
+    ActivityViewSet,
+    ArchivedProjectViewSet,
+    JobViewSet,
+    ReaderViewSet,
+    ReadingProjectViewSet,
+    TagViewSet,
+    TextualItemViewSet,
+    WebhookEndpointViewSet,
+    progress_stream,
+)
 
 router = DefaultRouter()
 router.register(r'reading-projects', ReadingProjectViewSet, basename='readingproject')
 router.register(r'textual-items', TextualItemViewSet, basename='textualitem')
+router.register(r'archived-projects', ArchivedProjectViewSet, basename='archivedproject')
+router.register(r'jobs', JobViewSet, basename='job')
+router.register(r'activity', ActivityViewSet, basename='activity')
+router.register(r'webhooks', WebhookEndpointViewSet, basename='webhook')
+router.register(r'readers', ReaderViewSet, basename='reader')
+router.register(r'tags', TagViewSet, basename='tag')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/events/progress/', progress_stream, name='progress-stream'),
     path('api/', include(router.urls)),
 ]